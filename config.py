@@ -19,14 +19,33 @@ class Config:
     SYSTEM_SHEET_ID = os.getenv("SYSTEM_SHEET_ID")
     
     # 경로 설정
-    ATTACHMENTS_DIR = os.getenv("ATTACHMENTS_DIR")
+    ATTACHMENTS_DIR = os.getenv("ATTACHMENTS_DIR", "attachments")  # 첨부 파일 저장소 (내용 해시 기준)
     INSTRUCTOR_SCAN_DIR = os.getenv("INSTRUCTOR_SCAN_DIR")
+    DOC_CACHE_SIZE = int(os.getenv("DOC_CACHE_SIZE", "128"))  # 렌더링된 결의서 문서 캐시 개수
+    THUMBNAIL_DIR = os.getenv("THUMBNAIL_DIR", "thumbnails")  # 스캔 문서 썸네일 캐시 폴더
+    THUMBNAIL_WORKERS = int(os.getenv("THUMBNAIL_WORKERS", "2"))  # 썸네일 생성 작업 스레드 수
+    TEMPLATE_CACHE_DIR = os.getenv("TEMPLATE_CACHE_DIR")  # Jinja2 바이트코드 캐시 폴더 (비워두면 메모리 캐시만 사용)
+    
+    # 비고 첨부 이미지 설정 (인쇄 크기 기준으로 축소/재인코딩)
+    NOTE_IMAGE_MAX_BYTES = int(os.getenv("NOTE_IMAGE_MAX_MB", "20")) * 1024 * 1024  # 업로드 허용 크기
+    NOTE_IMAGE_DPI = int(os.getenv("NOTE_IMAGE_DPI", "200"))  # 인쇄 해상도
+    NOTE_IMAGE_WIDTH_MM = float(os.getenv("NOTE_IMAGE_WIDTH_MM", "170"))  # 결의서 비고란 최대 너비
+    NOTE_IMAGE_HEIGHT_MM = float(os.getenv("NOTE_IMAGE_HEIGHT_MM", "90"))  # 템플릿 .note-image max-height 와 맞춤
+    NOTE_IMAGE_QUALITY = int(os.getenv("NOTE_IMAGE_QUALITY", "82"))  # JPEG 품질
+    
+    # 강사료 원천징수 (사업소득 3.3% = 소득세 3% + 지방소득세 = 소득세의 10%)
+    PAYROLL_INCOME_TAX_RATE = float(os.getenv("PAYROLL_INCOME_TAX_RATE", "0.03"))  # 소득세율
+    PAYROLL_LOCAL_TAX_RATE = float(os.getenv("PAYROLL_LOCAL_TAX_RATE", "0.1"))  # 지방소득세율 (소득세 대비)
     
     # GCP 프로젝트 정보
     PROJECT_ID = "office-util"  # secrets.json에서 확인됨
     
     # 데이터베이스 설정 (SQLite)
     DATABASE_PATH = os.getenv("DATABASE_PATH", "gsc_app.db")
+    DB_BUSY_TIMEOUT_MS = int(os.getenv("DB_BUSY_TIMEOUT_MS", "5000"))  # 잠금 대기 시간 (밀리초)
+    DB_CACHE_SIZE = int(os.getenv("DB_CACHE_SIZE", "-20000"))  # 음수는 KB 단위 (약 20MB)
+    DB_MAX_WORKERS = int(os.getenv("DB_MAX_WORKERS", "4"))  # 비동기 DB 작업용 스레드 수
+    DB_MMAP_SIZE = int(os.getenv("DB_MMAP_SIZE", str(256 * 1024 * 1024)))  # 메모리 맵 크기 (바이트)
     
     @classmethod
     def validate(cls):
@@ -0,0 +1,99 @@
+"""
+blob_store.py - 첨부 파일(이미지 등) 저장소
+파일 내용의 SHA-256 해시를 이름으로 Config.ATTACHMENTS_DIR 아래에 저장합니다. (내용 주소 방식)
+같은 내용은 한 번만 저장되며, blobs 테이블의 참조 수(ref_count)로 사용 여부를 관리합니다.
+DB 행에는 해시값만 저장하므로 목록 조회 시 이미지 데이터를 읽지 않습니다.
+
+put/add_ref/release 는 호출하는 쪽의 트랜잭션(conn) 안에서 실행됩니다.
+"""
+
+import hashlib
+import os
+import time
+from datetime import datetime
+from config import Config
+
+def guess_mime(data: bytes) -> str:
+    """파일 앞부분(매직 넘버)으로 이미지 형식을 추정합니다."""
+    if data.startswith(b'\x89PNG\r\n\x1a\n'):
+        return 'image/png'
+    if data.startswith(b'\xff\xd8\xff'):
+        return 'image/jpeg'
+    if data[:6] in (b'GIF87a', b'GIF89a'):
+        return 'image/gif'
+    if data[:4] == b'RIFF' and data[8:12] == b'WEBP':
+        return 'image/webp'
+    if data.startswith(b'%PDF'):
+        return 'application/pdf'
+    return 'application/octet-stream'
+
+class BlobStore:
+    def __init__(self, root_dir: str):
+        self.root_dir = root_dir
+
+    def path(self, blob_hash: str) -> str:
+        """해시에 해당하는 파일 경로 (앞 2글자로 하위 폴더를 나눠 한 폴더에 파일이 몰리지 않게 함)"""
+        return os.path.join(self.root_dir, blob_hash[:2], blob_hash)
+
+    def read(self, blob_hash: str) -> bytes:
+        with open(self.path(blob_hash), 'rb') as f:
+            return f.read()
+
+    def exists(self, blob_hash: str) -> bool:
+        return os.path.exists(self.path(blob_hash))
+
+    def _write_file(self, blob_hash: str, data: bytes):
+        dest = self.path(blob_hash)
+        if os.path.exists(dest):
+            return  # 같은 내용이 이미 저장되어 있음 (중복 제거)
+        os.makedirs(os.path.dirname(dest), exist_ok=True)
+        # 임시 파일에 먼저 쓰고 이름을 바꿔, 쓰는 도중의 파일이 노출되지 않게 합니다.
+        tmp = f"{dest}.{os.getpid()}.tmp"
+        with open(tmp, 'wb') as f:
+            f.write(data)
+        os.replace(tmp, dest)
+
+    def put(self, conn, data: bytes, mime: str = None) -> str:
+        """데이터를 저장하고 해시를 반환합니다. 새로 등록된 blob 의 참조 수는 0 입니다."""
+        blob_hash = hashlib.sha256(data).hexdigest()
+        self._write_file(blob_hash, data)
+        conn.execute(
+            "INSERT OR IGNORE INTO blobs (hash, size, mime, ref_count, created_at, updated_at) VALUES (?, ?, ?, 0, ?, ?)",
+            (blob_hash, len(data), mime or guess_mime(data), _now(), _now())
+        )
+        return blob_hash
+
+    def add_ref(self, conn, blob_hash: str):
+        """행이 blob 을 참조하게 될 때 호출합니다."""
+        if blob_hash:
+            conn.execute("UPDATE blobs SET ref_count = ref_count + 1, updated_at = ? WHERE hash = ?", (_now(), blob_hash))
+
+    def release(self, conn, blob_hash: str):
+        """행이 blob 참조를 끊을 때 호출합니다. 참조 수가 0 이 된 파일은 collect_garbage() 에서 정리됩니다."""
+        if blob_hash:
+            conn.execute(
+                "UPDATE blobs SET ref_count = MAX(ref_count - 1, 0), updated_at = ? WHERE hash = ?",
+                (_now(), blob_hash)
+            )
+
+    def collect_garbage(self, db, grace_seconds: int = 24 * 3600) -> int:
+        """
+        참조 수가 0 인 채로 grace_seconds 이상 지난 blob 을 삭제합니다.
+        (업로드 후 저장하지 않은 첨부, 삭제된 문서의 첨부 등) 삭제한 개수를 반환합니다.
+        """
+        cutoff = datetime.fromtimestamp(time.time() - grace_seconds).strftime('%Y-%m-%d %H:%M:%S')
+        with db.transaction() as conn:
+            rows = conn.execute("SELECT hash FROM blobs WHERE ref_count <= 0 AND updated_at < ?", (cutoff,)).fetchall()
+            conn.execute("DELETE FROM blobs WHERE ref_count <= 0 AND updated_at < ?", (cutoff,))
+        for (blob_hash,) in rows:
+            try:
+                os.remove(self.path(blob_hash))
+            except OSError:
+                pass
+        return len(rows)
+
+def _now():
+    return datetime.now().strftime('%Y-%m-%d %H:%M:%S')
+
+# 앱 전체에서 공유하는 첨부 파일 저장소
+blob_store = BlobStore(Config.ATTACHMENTS_DIR)
@@ -4,23 +4,80 @@ Pandas DataFrame을 사용하여 데이터를 읽고 쓰는 기능을 제공하
 향후 다른 데이터베이스로의 마이그레이션이 용이하도록 추상화되어 있습니다.
 """
 
+import asyncio
 import sqlite3
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import contextmanager
+from functools import partial
 import pandas as pd
 import os
 from config import Config
+from core.migrations import run_migrations
 
 class DBManager:
+    # 연결을 새로 만들 때 한 번만 적용하는 SQLite 튜닝 값입니다.
+    # WAL 모드에서는 쓰기 작업 중에도 다른 세션의 읽기가 막히지 않습니다.
+    PRAGMAS = (
+        ('journal_mode', 'WAL'),
+        ('synchronous', 'NORMAL'),
+        ('mmap_size', Config.DB_MMAP_SIZE),
+        ('cache_size', Config.DB_CACHE_SIZE),
+        ('busy_timeout', Config.DB_BUSY_TIMEOUT_MS),
+        ('temp_store', 'MEMORY'),
+        ('foreign_keys', 'ON'),
+    )
+
     def __init__(self, db_path=None):
         self.db_path = db_path or Config.DATABASE_PATH
         # 데이터베이스 파일이 위치할 폴더가 없다면 자동으로 생성합니다.
         db_dir = os.path.dirname(self.db_path)
         if db_dir and not os.path.exists(db_dir):
             os.makedirs(db_dir)
+        # 스레드별 연결 풀 (스레드마다 하나의 연결을 만들어 계속 재사용합니다)
+        self._local = threading.local()
+        self._pool_lock = threading.Lock()
+        self._connections = []
+        # 비동기 API가 사용하는 작업 스레드 풀 (크기를 제한해 연결 수도 함께 제한합니다)
+        self._executor = ThreadPoolExecutor(max_workers=Config.DB_MAX_WORKERS, thread_name_prefix='db-worker')
+
+    def _connect(self):
+        """새 연결을 만들고 PRAGMA 설정을 적용합니다."""
+        conn = sqlite3.connect(
+            self.db_path,
+            timeout=Config.DB_BUSY_TIMEOUT_MS / 1000,
+            check_same_thread=False,  # close_all()에서 다른 스레드가 닫을 수 있도록 허용
+        )
+        for name, value in self.PRAGMAS:
+            conn.execute(f"PRAGMA {name} = {value}")
+        return conn
+
+    def get_connection(self):
+        """현재 스레드 전용 연결을 반환합니다. (없으면 새로 만들어 풀에 등록)"""
+        conn = getattr(self._local, 'conn', None)
+        if conn is None:
+            conn = self._connect()
+            self._local.conn = conn
+            with self._pool_lock:
+                self._connections.append(conn)
+        return conn
+
+    def close_all(self):
+        """풀에 등록된 모든 연결을 닫습니다. (앱 종료 시 호출)"""
+        with self._pool_lock:
+            for conn in self._connections:
+                try:
+                    conn.close()
+                except sqlite3.Error:
+                    pass
+            self._connections.clear()
+        self._local = threading.local()
 
     def get_df(self, table_name):
         """데이터베이스 테이블의 내용을 판다스 데이터프레임으로 읽어옵니다."""
         try:
-            with sqlite3.connect(self.db_path) as conn:
+            conn = self.get_connection()
+            with conn:
                 query = f"SELECT * FROM {table_name}"
                 return pd.read_sql_query(query, conn)
         except Exception as e:
@@ -31,7 +88,8 @@ class DBManager:
     def save_df(self, df, table_name, if_exists='replace'):
         """판다스 데이터프레임을 데이터베이스 테이블로 저장합니다."""
         try:
-            with sqlite3.connect(self.db_path) as conn:
+            conn = self.get_connection()
+            with conn:
                 # if_exists='replace'는 기존 테이블이 있으면 지우고 새로 만든다는 뜻입니다.
                 df.to_sql(table_name, conn, if_exists=if_exists, index=False)
                 return True
@@ -42,7 +100,8 @@ class DBManager:
     def execute(self, query, params=None):
         """데이터 조회 외에 테이블 생성이나 삭제 등 SQL 명령어를 직접 실행합니다."""
         try:
-            with sqlite3.connect(self.db_path) as conn:
+            conn = self.get_connection()
+            with conn:
                 cursor = conn.cursor()
                 if params:
                     cursor.execute(query, params)
@@ -60,7 +119,8 @@ class DBManager:
         placeholders = ', '.join(['?'] * len(data))
         query = f"INSERT INTO {table_name} ({columns}) VALUES ({placeholders})"
         try:
-            with sqlite3.connect(self.db_path) as conn:
+            conn = self.get_connection()
+            with conn:
                 cursor = conn.cursor()
                 cursor.execute(query, tuple(data.values()))
                 conn.commit()
@@ -75,7 +135,8 @@ class DBManager:
         query = f"UPDATE {table_name} SET {set_clause} WHERE {where_clause}"
         params = tuple(data.values()) + where_params
         try:
-            with sqlite3.connect(self.db_path) as conn:
+            conn = self.get_connection()
+            with conn:
                 cursor = conn.cursor()
                 cursor.execute(query, params)
                 conn.commit()
@@ -88,7 +149,8 @@ class DBManager:
         """특정 조건에 맞는 행을 삭제합니다."""
         query = f"DELETE FROM {table_name} WHERE {where_clause}"
         try:
-            with sqlite3.connect(self.db_path) as conn:
+            conn = self.get_connection()
+            with conn:
                 cursor = conn.cursor()
                 cursor.execute(query, where_params)
                 conn.commit()
@@ -100,9 +162,10 @@ class DBManager:
     def fetch_all(self, query: str, params: tuple = None):
         """SELECT 쿼리를 실행하고 결과를 딕셔너리 리스트로 반환합니다. (Pandas 대체용)"""
         try:
-            with sqlite3.connect(self.db_path) as conn:
-                conn.row_factory = sqlite3.Row  # 컬럼명으로 접근 가능하게 설정
+            conn = self.get_connection()
+            with conn:
                 cursor = conn.cursor()
+                cursor.row_factory = sqlite3.Row  # 컬럼명으로 접근 가능하게 설정
                 if params:
                     cursor.execute(query, params)
                 else:
@@ -112,6 +175,83 @@ class DBManager:
             print(f"❌ SELECT 쿼리 오류: {e}")
             return []
 
+    @contextmanager
+    def transaction(self):
+        """
+        여러 SQL 을 하나의 작업 단위(트랜잭션)로 묶습니다.
+        블록이 정상 종료되면 한 번에 COMMIT 하고, 예외가 발생하면 전체를 ROLLBACK 합니다.
+        BEGIN IMMEDIATE 로 시작하므로 동시에 저장하는 다른 세션은 이 작업이 끝날 때까지 대기합니다.
+
+        사용 예)
+            with db.transaction() as conn:
+                conn.execute(...)
+                conn.executemany(...)
+        """
+        conn = self.get_connection()
+        conn.execute('BEGIN IMMEDIATE')
+        try:
+            yield conn
+            conn.commit()
+        except Exception:
+            conn.rollback()
+            raise
+
+    def next_sequence(self, conn, name: str) -> int:
+        """채번 테이블(sequences)에서 다음 번호를 발급합니다. 반드시 transaction() 안에서 호출하세요."""
+        conn.execute(
+            "INSERT INTO sequences (name, value) VALUES (?, 1) "
+            "ON CONFLICT(name) DO UPDATE SET value = value + 1",
+            (name,)
+        )
+        return conn.execute("SELECT value FROM sequences WHERE name = ?", (name,)).fetchone()[0]
+
+    def reserve_sequence(self, conn, name: str, count: int) -> int:
+        """번호 count 개를 한 번에 발급하고 그중 첫 번호를 반환합니다. (대량 등록용, transaction() 안에서 호출)"""
+        conn.execute(
+            "INSERT INTO sequences (name, value) VALUES (?, ?) "
+            "ON CONFLICT(name) DO UPDATE SET value = value + excluded.value",
+            (name, count)
+        )
+        last = conn.execute("SELECT value FROM sequences WHERE name = ?", (name,)).fetchone()[0]
+        return last - count + 1
+
+    # ------------------------------------------------------------------
+    # 비동기 API (NiceGUI 이벤트 핸들러에서 await 로 사용)
+    # SQLite 작업을 DB 전용 스레드 풀에서 실행하여 이벤트 루프가 멈추지 않게 합니다.
+    # ------------------------------------------------------------------
+    async def arun(self, func, *args, **kwargs):
+        """임의의 동기 함수(리포지토리 함수 등)를 DB 스레드 풀에서 실행하고 결과를 기다립니다."""
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(self._executor, partial(func, *args, **kwargs))
+
+    async def aexecute(self, query, params=None):
+        """execute()의 비동기 버전입니다."""
+        return await self.arun(self.execute, query, params)
+
+    async def afetch_all(self, query: str, params: tuple = None):
+        """fetch_all()의 비동기 버전입니다."""
+        return await self.arun(self.fetch_all, query, params)
+
+    async def aget_df(self, table_name):
+        """get_df()의 비동기 버전입니다."""
+        return await self.arun(self.get_df, table_name)
+
+    async def ainsert_row(self, table_name: str, data: dict):
+        """insert_row()의 비동기 버전입니다."""
+        return await self.arun(self.insert_row, table_name, data)
+
+    async def aupdate_row(self, table_name: str, data: dict, where_clause: str, where_params: tuple):
+        """update_row()의 비동기 버전입니다."""
+        return await self.arun(self.update_row, table_name, data, where_clause, where_params)
+
+    async def adelete_row(self, table_name: str, where_clause: str, where_params: tuple):
+        """delete_row()의 비동기 버전입니다."""
+        return await self.arun(self.delete_row, table_name, where_clause, where_params)
+
+    def migrate(self):
+        """스키마 마이그레이션을 적용하고 현재 스키마 버전을 반환합니다. (앱 시작 시 1회)"""
+        return run_migrations(self)
+
     def setup_auth_tables(self):
         """인증 및 권한 관리를 위한 테이블을 생성합니다."""
         # 1. 사용자 테이블 (아이디, 이름, 비밀번호, 권한 레벨)
@@ -147,3 +287,5 @@ class DBManager:
 db = DBManager()
 # 앱 시작 시 필요한 인증용 테이블들을 자동으로 준비합니다.
 db.setup_auth_tables()
+# 업무 테이블 스키마를 최신 버전으로 맞춥니다. (이미 적용된 버전은 건너뜁니다)
+db.migrate()
@@ -0,0 +1,53 @@
+"""
+image_pipeline.py - 업로드 이미지 정규화 모듈
+휴대폰 사진처럼 큰 이미지를 지출품의서(A4) 인쇄에 필요한 만큼만 남기도록 가공합니다.
+- EXIF 방향을 적용한 뒤 EXIF(촬영 위치 등 메타데이터)를 제거
+- 비고란 크기와 인쇄 DPI 기준으로 축소
+- 투명도가 없으면 JPEG, 있으면 PNG 로 다시 인코딩
+
+normalize_image() 는 CPU 를 많이 쓰므로 NiceGUI 의 run.cpu_bound(프로세스 풀)로 호출하세요.
+(프로세스 풀에서 실행되도록 모듈 최상위 함수로 작성되어 있습니다.)
+Pillow 가 설치되어 있지 않으면 크기 제한만 검사하고 원본을 그대로 사용합니다.
+"""
+
+import io
+from config import Config
+
+try:
+    from PIL import Image, ImageOps
+except ImportError:  # Pillow 미설치
+    Image = None
+
+class ImageTooLargeError(ValueError):
+    """업로드 이미지가 허용 크기를 넘은 경우"""
+
+def target_pixels(width_mm: float, height_mm: float, dpi: int):
+    """인쇄 크기(mm)와 DPI 로 필요한 최대 픽셀 크기를 계산합니다."""
+    return (round(width_mm / 25.4 * dpi), round(height_mm / 25.4 * dpi))
+
+def normalize_image(data: bytes,
+                    max_bytes: int = Config.NOTE_IMAGE_MAX_BYTES,
+                    width_mm: float = Config.NOTE_IMAGE_WIDTH_MM,
+                    height_mm: float = Config.NOTE_IMAGE_HEIGHT_MM,
+                    dpi: int = Config.NOTE_IMAGE_DPI,
+                    quality: int = Config.NOTE_IMAGE_QUALITY) -> bytes:
+    """이미지를 디코딩해 EXIF 를 제거하고 인쇄용 크기로 축소한 뒤 다시 인코딩한 바이트를 반환합니다."""
+    if len(data) > max_bytes:
+        raise ImageTooLargeError(f"이미지 크기가 너무 큽니다. (최대 {max_bytes // (1024 * 1024)}MB)")
+    if Image is None:
+        return data
+
+    with Image.open(io.BytesIO(data)) as img:
+        max_size = target_pixels(width_mm, height_mm, dpi)
+        img.draft('RGB', max_size)  # JPEG 는 디코딩 단계에서 바로 축소해 메모리를 아낍니다.
+        img = ImageOps.exif_transpose(img)
+        img.thumbnail(max_size, Image.LANCZOS)
+
+        has_alpha = img.mode in ('RGBA', 'LA') or (img.mode == 'P' and 'transparency' in img.info)
+        out = io.BytesIO()
+        # exif 를 넘기지 않으므로 저장 결과에는 메타데이터가 남지 않습니다.
+        if has_alpha:
+            img.convert('RGBA').save(out, 'PNG', optimize=True)
+        else:
+            img.convert('RGB').save(out, 'JPEG', quality=quality, optimize=True, progressive=True)
+        return out.getvalue()
@@ -0,0 +1,894 @@
+"""
+migrations.py - 데이터베이스 스키마 버전 관리 모듈
+앱 시작 시 한 번 실행되어 아직 적용되지 않은 스키마 변경만 순서대로 적용합니다.
+현재 스키마 버전은 SQLite 파일 헤더의 PRAGMA user_version 에 기록됩니다.
+
+새 스키마 변경이 필요하면 마지막 버전 다음 번호로 @migration 함수를 추가하세요.
+이미 적용된 마이그레이션 함수는 수정하지 않습니다.
+"""
+
+import base64
+import binascii
+import os
+import sqlite3
+from core.blob_store import blob_store
+from core.scan_store import file_checksum
+
+# (버전, 설명, 함수) 목록 - @migration 데코레이터로 등록됩니다.
+MIGRATIONS = []
+
+def migration(version: int, description: str):
+    """마이그레이션 함수를 버전 번호와 함께 등록하는 데코레이터입니다."""
+    def decorator(func):
+        MIGRATIONS.append((version, description, func))
+        return func
+    return decorator
+
+# ==========================================
+# 공통 헬퍼
+# ==========================================
+
+def table_exists(conn, table_name: str) -> bool:
+    row = conn.execute(
+        "SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = ?", (table_name,)
+    ).fetchone()
+    return row is not None
+
+def table_columns(conn, table_name: str) -> list:
+    return [r[1] for r in conn.execute(f'PRAGMA table_info("{table_name}")').fetchall()]
+
+def rebuild_table(conn, table_name: str, create_sql: str, casts: dict = None):
+    """
+    기존 테이블을 새 정의(create_sql)로 다시 만들고 데이터를 옮깁니다.
+    SQLite는 기본키/외래키를 ALTER 로 추가할 수 없으므로 '새로 만들고 복사' 방식을 사용합니다.
+    casts: {'컬럼명': 'CAST(컬럼명 AS INTEGER)'} 처럼 복사 시 변환할 식
+    """
+    if not table_exists(conn, table_name):
+        conn.execute(create_sql)
+        return
+
+    legacy_name = f'_legacy_{table_name}'
+    conn.execute(f'ALTER TABLE "{table_name}" RENAME TO "{legacy_name}"')
+    conn.execute(create_sql)
+
+    new_cols = table_columns(conn, table_name)
+    common = [c for c in table_columns(conn, legacy_name) if c in new_cols]
+    if common:
+        casts = casts or {}
+        target = ', '.join(f'"{c}"' for c in common)
+        source = ', '.join(casts.get(c, f'"{c}"') for c in common)
+        conn.execute(f'INSERT OR IGNORE INTO "{table_name}" ({target}) SELECT {source} FROM "{legacy_name}"')
+    conn.execute(f'DROP TABLE "{legacy_name}"')
+
+# ==========================================
+# 마이그레이션 실행기
+# ==========================================
+
+def get_schema_version(conn) -> int:
+    return conn.execute('PRAGMA user_version').fetchone()[0]
+
+def run_migrations(db):
+    """적용되지 않은 마이그레이션을 버전 순서대로 하나의 트랜잭션씩 적용합니다."""
+    conn = db.get_connection()
+    current = get_schema_version(conn)
+    pending = sorted((m for m in MIGRATIONS if m[0] > current), key=lambda m: m[0])
+    if not pending:
+        return current
+
+    # 테이블 재구성 중에는 외래키 검사를 잠시 끕니다. (트랜잭션 밖에서만 변경 가능)
+    conn.execute('PRAGMA foreign_keys = OFF')
+    try:
+        for version, description, func in pending:
+            try:
+                conn.execute('BEGIN')
+                func(conn)
+                conn.execute(f'PRAGMA user_version = {int(version)}')
+                conn.commit()
+                print(f"🗄️ DB 스키마 v{version} 적용 완료: {description}")
+            except sqlite3.Error as e:
+                conn.rollback()
+                print(f"❌ DB 스키마 v{version} 적용 실패: {e}")
+                raise
+    finally:
+        conn.execute('PRAGMA foreign_keys = ON')
+    return get_schema_version(conn)
+
+# ==========================================
+# 마이그레이션 정의
+# ==========================================
+
+@migration(1, '기본 테이블 키/외래키/인덱스 정리')
+def _v1_initial_schema(conn):
+    # 개발 관리 (기존 dev_page.init_dev_table 을 대체)
+    conn.execute("""
+        CREATE TABLE IF NOT EXISTS dev_tasks (
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            category TEXT,
+            title TEXT,
+            content TEXT,
+            status TEXT DEFAULT '대기중',
+            priority TEXT DEFAULT '보통',
+            created_at TEXT
+        )
+    """)
+
+    # 지출결의서 마스터
+    rebuild_table(conn, 'expense_masters', """
+        CREATE TABLE expense_masters (
+            master_id TEXT PRIMARY KEY,
+            title TEXT,
+            author TEXT,
+            position TEXT,
+            approval_date TEXT,
+            total_amount INTEGER NOT NULL DEFAULT 0,
+            total_amount_kr TEXT,
+            note_text TEXT,
+            note_image_b64 TEXT,
+            scan_file_path TEXT
+        )
+    """, casts={'total_amount': 'CAST(COALESCE(total_amount, 0) AS INTEGER)'})
+    conn.execute('CREATE INDEX IF NOT EXISTS idx_expense_masters_approval_date ON expense_masters(approval_date)')
+
+    # 지출결의서 상세 (금액은 원 단위 정수로 저장)
+    rebuild_table(conn, 'expense_details', """
+        CREATE TABLE expense_details (
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            master_id TEXT NOT NULL REFERENCES expense_masters(master_id) ON DELETE CASCADE,
+            summary TEXT,
+            date TEXT,
+            amount INTEGER NOT NULL DEFAULT 0,
+            method TEXT,
+            note TEXT
+        )
+    """, casts={'amount': 'CAST(COALESCE(amount, 0) AS INTEGER)'})
+    conn.execute('CREATE INDEX IF NOT EXISTS idx_expense_details_master_id ON expense_details(master_id)')
+
+    # 강사 / 강의 / 지급
+    rebuild_table(conn, 'instructors', """
+        CREATE TABLE instructors (
+            id TEXT PRIMARY KEY,
+            "이름" TEXT,
+            "주민번호" TEXT,
+            "전화번호" TEXT,
+            "계좌은행" TEXT,
+            "계좌번호" TEXT,
+            "종류" TEXT,
+            "비고" TEXT,
+            "강사주소" TEXT,
+            "이메일" TEXT
+        )
+    """)
+
+    rebuild_table(conn, 'lectures', """
+        CREATE TABLE lectures (
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            instructor_id TEXT REFERENCES instructors(id),
+            title TEXT,
+            lecture_date TEXT,
+            total_fee INTEGER NOT NULL DEFAULT 0,
+            remarks TEXT
+        )
+    """, casts={'total_fee': 'CAST(COALESCE(total_fee, 0) AS INTEGER)'})
+    conn.execute('CREATE INDEX IF NOT EXISTS idx_lectures_instructor_id ON lectures(instructor_id)')
+
+    rebuild_table(conn, 'payments', """
+        CREATE TABLE payments (
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            lecture_id INTEGER REFERENCES lectures(id) ON DELETE CASCADE,
+            status TEXT DEFAULT '대기',
+            scan_file_path TEXT,
+            updated_at TEXT
+        )
+    """)
+    conn.execute('CREATE INDEX IF NOT EXISTS idx_payments_lecture_id ON payments(lecture_id)')
+
+@migration(2, '채번 테이블(sequences) 및 지출결의서 일련번호 컬럼 추가')
+def _v2_sequences(conn):
+    conn.execute("""
+        CREATE TABLE IF NOT EXISTS sequences (
+            name TEXT PRIMARY KEY,
+            value INTEGER NOT NULL DEFAULT 0
+        )
+    """)
+    # 'EXP-001' 같은 문자열 번호는 EXP-999 이후 정렬이 틀어지므로 숫자 일련번호를 따로 둡니다.
+    if 'seq' not in table_columns(conn, 'expense_masters'):
+        conn.execute('ALTER TABLE expense_masters ADD COLUMN seq INTEGER')
+    conn.execute("""
+        UPDATE expense_masters SET seq = CAST(substr(master_id, 5) AS INTEGER)
+        WHERE master_id LIKE 'EXP-%' AND seq IS NULL
+    """)
+    conn.execute('CREATE UNIQUE INDEX IF NOT EXISTS idx_expense_masters_seq ON expense_masters(seq)')
+    conn.execute("""
+        INSERT OR REPLACE INTO sequences (name, value)
+        SELECT 'expense_master', COALESCE(MAX(seq), 0) FROM expense_masters
+    """)
+
+@migration(3, '지출결의서 검색용 인덱스 추가 (기안자, 금액)')
+def _v3_expense_search_indexes(conn):
+    conn.execute('CREATE INDEX IF NOT EXISTS idx_expense_masters_author ON expense_masters(author)')
+    conn.execute('CREATE INDEX IF NOT EXISTS idx_expense_masters_total_amount ON expense_masters(total_amount)')
+
+@migration(4, '지출결의서 수정 시각(updated_at) 컬럼 추가')
+def _v4_expense_updated_at(conn):
+    if 'updated_at' not in table_columns(conn, 'expense_masters'):
+        conn.execute('ALTER TABLE expense_masters ADD COLUMN updated_at TEXT')
+    conn.execute("UPDATE expense_masters SET updated_at = datetime('now', 'localtime') WHERE updated_at IS NULL")
+
+@migration(5, '지출결의서 행 버전(row_version) 컬럼 추가')
+def _v5_expense_row_version(conn):
+    # 렌더링된 문서 캐시의 키로 사용합니다. 문서 내용이 바뀔 때마다 1씩 증가합니다.
+    if 'row_version' not in table_columns(conn, 'expense_masters'):
+        conn.execute('ALTER TABLE expense_masters ADD COLUMN row_version INTEGER NOT NULL DEFAULT 1')
+
+@migration(6, '첨부 파일 저장소(blobs) 추가 및 비고 이미지를 파일로 이동')
+def _v6_blob_store(conn):
+    conn.execute("""
+        CREATE TABLE IF NOT EXISTS blobs (
+            hash TEXT PRIMARY KEY,
+            size INTEGER NOT NULL,
+            mime TEXT,
+            ref_count INTEGER NOT NULL DEFAULT 0,
+            created_at TEXT,
+            updated_at TEXT
+        )
+    """)
+    conn.execute('CREATE INDEX IF NOT EXISTS idx_blobs_ref_count ON blobs(ref_count)')
+    if 'note_image_hash' not in table_columns(conn, 'expense_masters'):
+        conn.execute('ALTER TABLE expense_masters ADD COLUMN note_image_hash TEXT')
+
+    # 기존에 base64 텍스트로 저장된 비고 이미지를 저장소로 옮기고 행에는 해시만 남깁니다.
+    rows = conn.execute("""
+        SELECT master_id, note_image_b64 FROM expense_masters
+        WHERE note_image_b64 IS NOT NULL AND note_image_b64 != ''
+    """).fetchall()
+    for master_id, b64 in rows:
+        try:
+            data = base64.b64decode(b64, validate=True)
+        except (binascii.Error, ValueError):
+            print(f"⚠️ {master_id} 비고 이미지를 해석할 수 없어 건너뜁니다.")
+            continue
+        blob_hash = blob_store.put(conn, data)
+        blob_store.add_ref(conn, blob_hash)
+        conn.execute(
+            "UPDATE expense_masters SET note_image_hash = ?, note_image_b64 = NULL WHERE master_id = ?",
+            (blob_hash, master_id)
+        )
+
+@migration(7, '스캔 파일 체크섬(scan_checksum) 컬럼 추가')
+def _v7_scan_checksum(conn):
+    if 'scan_checksum' not in table_columns(conn, 'expense_masters'):
+        conn.execute('ALTER TABLE expense_masters ADD COLUMN scan_checksum TEXT')
+    # 이미 첨부된 스캔 파일의 체크섬을 채워 같은 파일 재업로드를 감지할 수 있게 합니다.
+    rows = conn.execute("""
+        SELECT master_id, scan_file_path FROM expense_masters
+        WHERE scan_file_path IS NOT NULL AND scan_file_path != ''
+    """).fetchall()
+    for master_id, path in rows:
+        if os.path.isfile(path):
+            conn.execute("UPDATE expense_masters SET scan_checksum = ? WHERE master_id = ?", (file_checksum(path), master_id))
+
+@migration(8, '과거 내역 검색 인덱스 및 적요/지급방법 빈도 테이블 추가')
+def _v8_expense_history(conn):
+    # 과거 내역 불러오기의 앞글자 검색(범위 조건)에 사용하는 인덱스
+    conn.execute('CREATE INDEX IF NOT EXISTS idx_expense_masters_title ON expense_masters(title)')
+    conn.execute('CREATE INDEX IF NOT EXISTS idx_expense_details_summary ON expense_details(summary)')
+
+    # 자동완성용 빈도 테이블: 상세 내역이 추가/삭제될 때 트리거가 같은 트랜잭션 안에서 갱신합니다.
+    conn.execute("""
+        CREATE TABLE IF NOT EXISTS expense_value_freq (
+            field TEXT NOT NULL,
+            value TEXT NOT NULL,
+            use_count INTEGER NOT NULL DEFAULT 0,
+            PRIMARY KEY (field, value)
+        ) WITHOUT ROWID
+    """)
+    conn.execute('CREATE INDEX IF NOT EXISTS idx_expense_value_freq_rank ON expense_value_freq(field, use_count DESC)')
+
+    for field in ('summary', 'method'):
+        conn.execute(f"""
+            CREATE TRIGGER IF NOT EXISTS trg_expense_details_{field}_freq_ins AFTER INSERT ON expense_details
+            WHEN trim(coalesce(NEW.{field}, '')) != ''
+            BEGIN
+                INSERT OR IGNORE INTO expense_value_freq (field, value, use_count) VALUES ('{field}', trim(NEW.{field}), 0);
+                UPDATE expense_value_freq SET use_count = use_count + 1 WHERE field = '{field}' AND value = trim(NEW.{field});
+            END
+        """)
+        conn.execute(f"""
+            CREATE TRIGGER IF NOT EXISTS trg_expense_details_{field}_freq_del AFTER DELETE ON expense_details
+            WHEN trim(coalesce(OLD.{field}, '')) != ''
+            BEGIN
+                UPDATE expense_value_freq SET use_count = use_count - 1 WHERE field = '{field}' AND value = trim(OLD.{field});
+                DELETE FROM expense_value_freq WHERE field = '{field}' AND value = trim(OLD.{field}) AND use_count <= 0;
+            END
+        """)
+        conn.execute(f"""
+            CREATE TRIGGER IF NOT EXISTS trg_expense_details_{field}_freq_upd AFTER UPDATE OF {field} ON expense_details
+            BEGIN
+                UPDATE expense_value_freq SET use_count = use_count - 1 WHERE field = '{field}' AND value = trim(OLD.{field});
+                DELETE FROM expense_value_freq WHERE field = '{field}' AND value = trim(OLD.{field}) AND use_count <= 0;
+                INSERT OR IGNORE INTO expense_value_freq (field, value, use_count)
+                    SELECT '{field}', trim(NEW.{field}), 0 WHERE trim(coalesce(NEW.{field}, '')) != '';
+                UPDATE expense_value_freq SET use_count = use_count + 1 WHERE field = '{field}' AND value = trim(NEW.{field});
+            END
+        """)
+        # 기존 상세 내역으로 빈도를 채웁니다.
+        conn.execute(f"""
+            INSERT OR REPLACE INTO expense_value_freq (field, value, use_count)
+            SELECT '{field}', trim({field}), COUNT(*) FROM expense_details
+            WHERE trim(coalesce({field}, '')) != ''
+            GROUP BY trim({field})
+        """)
+
+# 결의서 1건의 상세 내역(적요 + 비고)을 전문 검색용 텍스트 하나로 합치는 식
+_FTS_DETAILS_SQL = """(SELECT group_concat(coalesce(summary, '') || ' ' || coalesce(note, ''), ' ')
+                       FROM expense_details WHERE master_id = {})"""
+
+@migration(9, '지출결의서 전문 검색(FTS5) 인덱스 추가')
+def _v9_expense_fulltext(conn):
+    # 결의서 1건당 1행, rowid 는 expense_masters.seq 와 같습니다.
+    # unicode61 토크나이저 + 앞글자(2,3글자) 인덱스로 '토너*' 처럼 조사가 붙은 한글 단어도 찾습니다.
+    conn.execute("""
+        CREATE VIRTUAL TABLE IF NOT EXISTS expense_fts USING fts5(
+            title, author, note_text, details, approval_date,
+            tokenize = 'unicode61', prefix = '2 3'
+        )
+    """)
+    # 순위(rank) 계산 시 컬럼별 가중치: 제목 > 기안자 > 상세 내역 > 비고 > 결재일자
+    conn.execute("INSERT INTO expense_fts (expense_fts, rank) VALUES ('rank', 'bm25(10.0, 5.0, 2.0, 3.0, 1.0)')")
+
+    insert_sql = f"""
+        INSERT INTO expense_fts (rowid, title, author, note_text, details, approval_date)
+        VALUES (NEW.seq, NEW.title, NEW.author, NEW.note_text, {_FTS_DETAILS_SQL.format('NEW.master_id')}, NEW.approval_date);
+    """
+    conn.execute(f"""
+        CREATE TRIGGER IF NOT EXISTS trg_expense_fts_master_ins AFTER INSERT ON expense_masters
+        WHEN NEW.seq IS NOT NULL
+        BEGIN {insert_sql} END
+    """)
+    conn.execute(f"""
+        CREATE TRIGGER IF NOT EXISTS trg_expense_fts_master_upd
+        AFTER UPDATE OF seq, title, author, note_text, approval_date ON expense_masters
+        BEGIN
+            DELETE FROM expense_fts WHERE rowid = OLD.seq;
+            INSERT INTO expense_fts (rowid, title, author, note_text, details, approval_date)
+            SELECT NEW.seq, NEW.title, NEW.author, NEW.note_text, {_FTS_DETAILS_SQL.format('NEW.master_id')}, NEW.approval_date
+            WHERE NEW.seq IS NOT NULL;
+        END
+    """)
+    conn.execute("""
+        CREATE TRIGGER IF NOT EXISTS trg_expense_fts_master_del AFTER DELETE ON expense_masters
+        BEGIN
+            DELETE FROM expense_fts WHERE rowid = OLD.seq;
+        END
+    """)
+    # 상세 내역이 바뀌면 해당 결의서의 details 컬럼만 다시 만듭니다.
+    for event, ref in (('INSERT', 'NEW'), ('DELETE', 'OLD'), ('UPDATE OF summary, note', 'NEW')):
+        name = event.split()[0].lower()[:3]
+        conn.execute(f"""
+            CREATE TRIGGER IF NOT EXISTS trg_expense_fts_details_{name} AFTER {event} ON expense_details
+            BEGIN
+                UPDATE expense_fts SET details = {_FTS_DETAILS_SQL.format(f'{ref}.master_id')}
+                WHERE rowid = (SELECT seq FROM expense_masters WHERE master_id = {ref}.master_id);
+            END
+        """)
+
+    # 기존 결의서를 색인합니다.
+    conn.execute(f"""
+        INSERT INTO expense_fts (rowid, title, author, note_text, details, approval_date)
+        SELECT m.seq, m.title, m.author, m.note_text, {_FTS_DETAILS_SQL.format('m.master_id')}, m.approval_date
+        FROM expense_masters m WHERE m.seq IS NOT NULL
+    """)
+
+def _summary_delta_sql(dimension: str, period: str, key: str, count: str, amount: str) -> str:
+    """(트리거 본문용) expense_summary 한 칸에 건수/금액 변화량을 더하는 SQL. 0건이 된 칸은 지웁니다."""
+    where = f"period = {period} AND dimension = '{dimension}' AND key = {key}"
+    return f"""
+        INSERT OR IGNORE INTO expense_summary (period, dimension, key, item_count, amount) VALUES ({period}, '{dimension}', {key}, 0, 0);
+        UPDATE expense_summary SET item_count = item_count + ({count}), amount = amount + ({amount}) WHERE {where};
+        DELETE FROM expense_summary WHERE {where} AND item_count <= 0;
+    """
+
+def _method_move_sql(master_id: str, period: str, sign: str) -> str:
+    """(트리거 본문용) 결의서 1건의 상세 내역을 지급방법별로 묶어 해당 월 집계에 더하거나(+) 뺍니다(-)."""
+    details = f"FROM expense_details d WHERE d.master_id = {master_id} AND coalesce(trim(d.method), '') = expense_summary.key"
+    return f"""
+        INSERT OR IGNORE INTO expense_summary (period, dimension, key, item_count, amount)
+            SELECT {period}, 'method', coalesce(trim(method), ''), 0, 0 FROM expense_details WHERE master_id = {master_id};
+        UPDATE expense_summary SET
+            item_count = item_count {sign} (SELECT count(*) {details}),
+            amount = amount {sign} (SELECT coalesce(sum(d.amount), 0) {details})
+        WHERE period = {period} AND dimension = 'method';
+        DELETE FROM expense_summary WHERE period = {period} AND dimension = 'method' AND item_count <= 0;
+    """
+
+def _counter_delta_sql(name: str, period: str, delta: str) -> str:
+    """(트리거 본문용) stat_counters 한 칸에 변화량을 더하는 SQL"""
+    return f"""
+        INSERT OR IGNORE INTO stat_counters (name, period, value) VALUES ('{name}', {period}, 0);
+        UPDATE stat_counters SET value = value + ({delta}) WHERE name = '{name}' AND period = {period};
+    """
+
+@migration(10, '대시보드/회계 집계 테이블(expense_summary, stat_counters) 추가')
+def _v10_summary_tables(conn):
+    # 월(YYYY-MM) x 구분(month/author/method) x 값 별 건수와 금액
+    # month: 결의서 건수/총액, author: 기안자별 결의서 건수/총액, method: 지급방법별 상세 줄 수/금액
+    conn.execute("""
+        CREATE TABLE IF NOT EXISTS expense_summary (
+            period TEXT NOT NULL,
+            dimension TEXT NOT NULL,
+            key TEXT NOT NULL,
+            item_count INTEGER NOT NULL DEFAULT 0,
+            amount INTEGER NOT NULL DEFAULT 0,
+            PRIMARY KEY (period, dimension, key)
+        ) WITHOUT ROWID
+    """)
+    # 이름 x 기간 별 카운터 (기간이 없는 전체 합계는 period = '')
+    conn.execute("""
+        CREATE TABLE IF NOT EXISTS stat_counters (
+            name TEXT NOT NULL,
+            period TEXT NOT NULL DEFAULT '',
+            value INTEGER NOT NULL DEFAULT 0,
+            PRIMARY KEY (name, period)
+        ) WITHOUT ROWID
+    """)
+
+    # --- 지출결의서 마스터: 월별/기안자별 ---
+    new_p, old_p = "coalesce(substr(NEW.approval_date, 1, 7), '')", "coalesce(substr(OLD.approval_date, 1, 7), '')"
+    new_a, old_a = "coalesce(trim(NEW.author), '')", "coalesce(trim(OLD.author), '')"
+    conn.execute(f"""
+        CREATE TRIGGER IF NOT EXISTS trg_expense_summary_master_ins AFTER INSERT ON expense_masters
+        BEGIN
+            {_summary_delta_sql('month', new_p, "''", '1', 'NEW.total_amount')}
+            {_summary_delta_sql('author', new_p, new_a, '1', 'NEW.total_amount')}
+        END
+    """)
+    conn.execute(f"""
+        CREATE TRIGGER IF NOT EXISTS trg_expense_summary_master_upd
+        AFTER UPDATE OF approval_date, author, total_amount ON expense_masters
+        BEGIN
+            {_summary_delta_sql('month', old_p, "''", '-1', '-OLD.total_amount')}
+            {_summary_delta_sql('author', old_p, old_a, '-1', '-OLD.total_amount')}
+            {_summary_delta_sql('month', new_p, "''", '1', 'NEW.total_amount')}
+            {_summary_delta_sql('author', new_p, new_a, '1', 'NEW.total_amount')}
+        END
+    """)
+    # 결재일자의 월이 바뀌면 상세 내역의 지급방법별 집계도 새 월로 옮깁니다.
+    conn.execute(f"""
+        CREATE TRIGGER IF NOT EXISTS trg_expense_summary_master_move AFTER UPDATE OF approval_date ON expense_masters
+        WHEN {old_p} != {new_p}
+        BEGIN
+            {_method_move_sql('OLD.master_id', old_p, '-')}
+            {_method_move_sql('NEW.master_id', new_p, '+')}
+        END
+    """)
+    # 상세 내역이 CASCADE 로 지워질 때는 마스터를 찾을 수 없으므로, 지우기 전에 지급방법별 집계를 먼저 뺍니다.
+    conn.execute(f"""
+        CREATE TRIGGER IF NOT EXISTS trg_expense_summary_master_del BEFORE DELETE ON expense_masters
+        BEGIN
+            {_summary_delta_sql('month', old_p, "''", '-1', '-OLD.total_amount')}
+            {_summary_delta_sql('author', old_p, old_a, '-1', '-OLD.total_amount')}
+            {_method_move_sql('OLD.master_id', old_p, '-')}
+        END
+    """)
+
+    # --- 지출결의서 상세: 지급방법별 (월은 마스터의 결재일자 기준) ---
+    def master_period(ref):
+        return f"(SELECT coalesce(substr(approval_date, 1, 7), '') FROM expense_masters WHERE master_id = {ref}.master_id)"
+    def master_exists(ref):
+        return f"EXISTS (SELECT 1 FROM expense_masters WHERE master_id = {ref}.master_id)"
+    new_m, old_m = "coalesce(trim(NEW.method), '')", "coalesce(trim(OLD.method), '')"
+    conn.execute(f"""
+        CREATE TRIGGER IF NOT EXISTS trg_expense_summary_details_ins AFTER INSERT ON expense_details
+        WHEN {master_exists('NEW')}
+        BEGIN {_summary_delta_sql('method', master_period('NEW'), new_m, '1', 'NEW.amount')} END
+    """)
+    conn.execute(f"""
+        CREATE TRIGGER IF NOT EXISTS trg_expense_summary_details_del AFTER DELETE ON expense_details
+        WHEN {master_exists('OLD')}
+        BEGIN {_summary_delta_sql('method', master_period('OLD'), old_m, '-1', '-OLD.amount')} END
+    """)
+    conn.execute(f"""
+        CREATE TRIGGER IF NOT EXISTS trg_expense_summary_details_upd AFTER UPDATE OF master_id, method, amount ON expense_details
+        BEGIN
+            {_summary_delta_sql('method', master_period('OLD'), old_m, '-1', '-OLD.amount')}
+            {_summary_delta_sql('method', master_period('NEW'), new_m, '1', 'NEW.amount')}
+        END
+    """)
+
+    # --- 강사 / 강의 / 지급 카운터 ---
+    conn.execute(f"""
+        CREATE TRIGGER IF NOT EXISTS trg_stat_instructors_ins AFTER INSERT ON instructors
+        BEGIN {_counter_delta_sql('instructors', "''", '1')} END
+    """)
+    conn.execute(f"""
+        CREATE TRIGGER IF NOT EXISTS trg_stat_instructors_del AFTER DELETE ON instructors
+        BEGIN {_counter_delta_sql('instructors', "''", '-1')} END
+    """)
+    new_lp, old_lp = "coalesce(substr(NEW.lecture_date, 1, 7), '')", "coalesce(substr(OLD.lecture_date, 1, 7), '')"
+    conn.execute(f"""
+        CREATE TRIGGER IF NOT EXISTS trg_stat_lectures_ins AFTER INSERT ON lectures
+        BEGIN
+            {_counter_delta_sql('lectures', "''", '1')}
+            {_counter_delta_sql('lectures_month', new_lp, '1')}
+        END
+    """)
+    conn.execute(f"""
+        CREATE TRIGGER IF NOT EXISTS trg_stat_lectures_del AFTER DELETE ON lectures
+        BEGIN
+            {_counter_delta_sql('lectures', "''", '-1')}
+            {_counter_delta_sql('lectures_month', old_lp, '-1')}
+        END
+    """)
+    conn.execute(f"""
+        CREATE TRIGGER IF NOT EXISTS trg_stat_lectures_upd AFTER UPDATE OF lecture_date ON lectures
+        BEGIN
+            {_counter_delta_sql('lectures_month', old_lp, '-1')}
+            {_counter_delta_sql('lectures_month', new_lp, '1')}
+        END
+    """)
+    # 지급 완료 건수 (미지급/처리 대기 = 전체 강의 수 - 지급 완료 건수)
+    done = "'완료'"
+    conn.execute(f"""
+        CREATE TRIGGER IF NOT EXISTS trg_stat_payments_ins AFTER INSERT ON payments
+        WHEN NEW.status = {done}
+        BEGIN {_counter_delta_sql('payments_done', "''", '1')} END
+    """)
+    conn.execute(f"""
+        CREATE TRIGGER IF NOT EXISTS trg_stat_payments_del AFTER DELETE ON payments
+        WHEN OLD.status = {done}
+        BEGIN {_counter_delta_sql('payments_done', "''", '-1')} END
+    """)
+    conn.execute(f"""
+        CREATE TRIGGER IF NOT EXISTS trg_stat_payments_upd AFTER UPDATE OF status ON payments
+        BEGIN {_counter_delta_sql('payments_done', "''", f"(NEW.status = {done}) - (OLD.status = {done})")} END
+    """)
+
+    # 기존 데이터로 집계를 채웁니다.
+    conn.execute("DELETE FROM expense_summary")
+    conn.execute("""
+        INSERT INTO expense_summary (period, dimension, key, item_count, amount)
+        SELECT coalesce(substr(approval_date, 1, 7), ''), 'month', '', count(*), coalesce(sum(total_amount), 0)
+        FROM expense_masters GROUP BY 1
+    """)
+    conn.execute("""
+        INSERT INTO expense_summary (period, dimension, key, item_count, amount)
+        SELECT coalesce(substr(approval_date, 1, 7), ''), 'author', coalesce(trim(author), ''), count(*), coalesce(sum(total_amount), 0)
+        FROM expense_masters GROUP BY 1, 3
+    """)
+    conn.execute("""
+        INSERT INTO expense_summary (period, dimension, key, item_count, amount)
+        SELECT coalesce(substr(m.approval_date, 1, 7), ''), 'method', coalesce(trim(d.method), ''), count(*), coalesce(sum(d.amount), 0)
+        FROM expense_details d JOIN expense_masters m ON m.master_id = d.master_id GROUP BY 1, 3
+    """)
+    conn.execute("DELETE FROM stat_counters")
+    conn.execute("INSERT INTO stat_counters (name, period, value) SELECT 'instructors', '', count(*) FROM instructors")
+    conn.execute("INSERT INTO stat_counters (name, period, value) SELECT 'lectures', '', count(*) FROM lectures")
+    conn.execute("""
+        INSERT INTO stat_counters (name, period, value)
+        SELECT 'lectures_month', coalesce(substr(lecture_date, 1, 7), ''), count(*) FROM lectures GROUP BY 2
+    """)
+    conn.execute("INSERT INTO stat_counters (name, period, value) SELECT 'payments_done', '', count(*) FROM payments WHERE status = '완료'")
+
+@migration(11, '분석 스냅샷 갱신용 테이블 변경 카운터 추가')
+def _v11_change_counters(conn):
+    # 행이 바뀔 때마다 stat_counters('changes:<테이블>') 값이 1씩 올라갑니다.
+    # 분석 화면의 메모리 스냅샷은 이 값이 바뀐 테이블만 다시 읽습니다.
+    for table in ('expense_masters', 'expense_details', 'lectures', 'instructors'):
+        for event in ('INSERT', 'UPDATE', 'DELETE'):
+            conn.execute(f"""
+                CREATE TRIGGER IF NOT EXISTS trg_changes_{table}_{event.lower()[:3]} AFTER {event} ON {table}
+                BEGIN {_counter_delta_sql(f'changes:{table}', "''", '1')} END
+            """)
+
+@migration(12, '지출결의서 일괄 가져오기 기록(expense_import_log) 추가')
+def _v12_expense_import_log(conn):
+    # 원본 파일(내용 해시)의 어느 묶음이 어떤 결의서로 등록됐는지 기록해 중단된 가져오기를 이어서 진행합니다.
+    conn.execute("""
+        CREATE TABLE IF NOT EXISTS expense_import_log (
+            source TEXT NOT NULL,
+            group_key TEXT NOT NULL,
+            master_id TEXT REFERENCES expense_masters(master_id) ON DELETE SET NULL,
+            imported_at TEXT,
+            PRIMARY KEY (source, group_key)
+        ) WITHOUT ROWID
+    """)
+
+@migration(13, '강사별 강의 조회 인덱스(instructor_id, lecture_date) 추가')
+def _v13_lecture_instructor_date_index(conn):
+    # 강사 상세 화면의 강의 목록(강사 조건 + 날짜 역순)을 정렬 없이 인덱스 순서대로 읽습니다.
+    conn.execute('CREATE INDEX IF NOT EXISTS idx_lectures_instructor_date ON lectures(instructor_id, lecture_date)')
+    conn.execute('DROP INDEX IF EXISTS idx_lectures_instructor_id')
+
+# --- v14 에서 다시 만드는 집계 트리거용 헬퍼 ---
+# 트리거 안의 INSERT OR IGNORE 는 바깥 문장의 충돌 정책(UPSERT, INSERT OR REPLACE 등)에 덮어써집니다.
+# (UPSERT 면 UNIQUE 오류, OR REPLACE 면 카운터 행이 0 으로 교체) 그래서 행이 없을 때만 NOT EXISTS 로 넣습니다.
+
+def _insert_missing_sql(table: str, columns: str, values: str, key_where: str, condition: str = None) -> str:
+    """(트리거 본문용) 키에 해당하는 행이 없을 때만 0으로 초기화된 행을 넣는 SQL"""
+    where = f"NOT EXISTS (SELECT 1 FROM {table} WHERE {key_where})"
+    if condition:
+        where = f"{condition} AND {where}"
+    return f"INSERT INTO {table} ({columns}) SELECT {values} WHERE {where};"
+
+def _v14_summary_delta_sql(dimension: str, period: str, key: str, count: str, amount: str) -> str:
+    """_summary_delta_sql 과 같고, 칸 초기화만 NOT EXISTS 방식입니다."""
+    where = f"period = {period} AND dimension = '{dimension}' AND key = {key}"
+    return f"""
+        {_insert_missing_sql('expense_summary', 'period, dimension, key, item_count, amount', f"{period}, '{dimension}', {key}, 0, 0", where)}
+        UPDATE expense_summary SET item_count = item_count + ({count}), amount = amount + ({amount}) WHERE {where};
+        DELETE FROM expense_summary WHERE {where} AND item_count <= 0;
+    """
+
+def _v14_method_move_sql(master_id: str, period: str, sign: str) -> str:
+    """_method_move_sql 과 같고, 칸 초기화만 NOT EXISTS 방식입니다."""
+    details = f"FROM expense_details d WHERE d.master_id = {master_id} AND coalesce(trim(d.method), '') = expense_summary.key"
+    return f"""
+        INSERT INTO expense_summary (period, dimension, key, item_count, amount)
+            SELECT DISTINCT {period}, 'method', coalesce(trim(n.method), ''), 0, 0 FROM expense_details n
+            WHERE n.master_id = {master_id} AND NOT EXISTS (
+                SELECT 1 FROM expense_summary s
+                WHERE s.period = {period} AND s.dimension = 'method' AND s.key = coalesce(trim(n.method), ''));
+        UPDATE expense_summary SET
+            item_count = item_count {sign} (SELECT count(*) {details}),
+            amount = amount {sign} (SELECT coalesce(sum(d.amount), 0) {details})
+        WHERE period = {period} AND dimension = 'method';
+        DELETE FROM expense_summary WHERE period = {period} AND dimension = 'method' AND item_count <= 0;
+    """
+
+def _v14_counter_delta_sql(name: str, period: str, delta: str) -> str:
+    """_counter_delta_sql 과 같고, 칸 초기화만 NOT EXISTS 방식입니다."""
+    where = f"name = '{name}' AND period = {period}"
+    return f"""
+        {_insert_missing_sql('stat_counters', 'name, period, value', f"'{name}', {period}, 0", where)}
+        UPDATE stat_counters SET value = value + ({delta}) WHERE {where};
+    """
+
+def _v14_rebuild_aggregate_triggers(conn):
+    """v8(빈도), v10(집계/카운터), v11(변경 카운터) 트리거를 지우고 같은 동작의 NOT EXISTS 버전으로 다시 만듭니다."""
+    stale = conn.execute("""
+        SELECT name FROM sqlite_master WHERE type = 'trigger' AND (
+            name LIKE 'trg_expense_details_%_freq_%' OR name LIKE 'trg_expense_summary_%'
+            OR name LIKE 'trg_stat_%' OR name LIKE 'trg_changes_%')
+    """).fetchall()
+    for (name,) in stale:
+        conn.execute(f'DROP TRIGGER IF EXISTS "{name}"')
+
+    # --- 적요/지급방법 사용 빈도 (v8) ---
+    for field in ('summary', 'method'):
+        new_key = f"field = '{field}' AND value = trim(NEW.{field})"
+        init_new = _insert_missing_sql('expense_value_freq', 'field, value, use_count', f"'{field}', trim(NEW.{field}), 0",
+                                       new_key, f"trim(coalesce(NEW.{field}, '')) != ''")
+        conn.execute(f"""
+            CREATE TRIGGER trg_expense_details_{field}_freq_ins AFTER INSERT ON expense_details
+            WHEN trim(coalesce(NEW.{field}, '')) != ''
+            BEGIN
+                {init_new}
+                UPDATE expense_value_freq SET use_count = use_count + 1 WHERE {new_key};
+            END
+        """)
+        conn.execute(f"""
+            CREATE TRIGGER trg_expense_details_{field}_freq_del AFTER DELETE ON expense_details
+            WHEN trim(coalesce(OLD.{field}, '')) != ''
+            BEGIN
+                UPDATE expense_value_freq SET use_count = use_count - 1 WHERE field = '{field}' AND value = trim(OLD.{field});
+                DELETE FROM expense_value_freq WHERE field = '{field}' AND value = trim(OLD.{field}) AND use_count <= 0;
+            END
+        """)
+        conn.execute(f"""
+            CREATE TRIGGER trg_expense_details_{field}_freq_upd AFTER UPDATE OF {field} ON expense_details
+            BEGIN
+                UPDATE expense_value_freq SET use_count = use_count - 1 WHERE field = '{field}' AND value = trim(OLD.{field});
+                DELETE FROM expense_value_freq WHERE field = '{field}' AND value = trim(OLD.{field}) AND use_count <= 0;
+                {init_new}
+                UPDATE expense_value_freq SET use_count = use_count + 1 WHERE {new_key};
+            END
+        """)
+
+    # --- 지출결의서 마스터: 월별/기안자별 (v10) ---
+    new_p, old_p = "coalesce(substr(NEW.approval_date, 1, 7), '')", "coalesce(substr(OLD.approval_date, 1, 7), '')"
+    new_a, old_a = "coalesce(trim(NEW.author), '')", "coalesce(trim(OLD.author), '')"
+    conn.execute(f"""
+        CREATE TRIGGER trg_expense_summary_master_ins AFTER INSERT ON expense_masters
+        BEGIN
+            {_v14_summary_delta_sql('month', new_p, "''", '1', 'NEW.total_amount')}
+            {_v14_summary_delta_sql('author', new_p, new_a, '1', 'NEW.total_amount')}
+        END
+    """)
+    conn.execute(f"""
+        CREATE TRIGGER trg_expense_summary_master_upd
+        AFTER UPDATE OF approval_date, author, total_amount ON expense_masters
+        BEGIN
+            {_v14_summary_delta_sql('month', old_p, "''", '-1', '-OLD.total_amount')}
+            {_v14_summary_delta_sql('author', old_p, old_a, '-1', '-OLD.total_amount')}
+            {_v14_summary_delta_sql('month', new_p, "''", '1', 'NEW.total_amount')}
+            {_v14_summary_delta_sql('author', new_p, new_a, '1', 'NEW.total_amount')}
+        END
+    """)
+    conn.execute(f"""
+        CREATE TRIGGER trg_expense_summary_master_move AFTER UPDATE OF approval_date ON expense_masters
+        WHEN {old_p} != {new_p}
+        BEGIN
+            {_v14_method_move_sql('OLD.master_id', old_p, '-')}
+            {_v14_method_move_sql('NEW.master_id', new_p, '+')}
+        END
+    """)
+    conn.execute(f"""
+        CREATE TRIGGER trg_expense_summary_master_del BEFORE DELETE ON expense_masters
+        BEGIN
+            {_v14_summary_delta_sql('month', old_p, "''", '-1', '-OLD.total_amount')}
+            {_v14_summary_delta_sql('author', old_p, old_a, '-1', '-OLD.total_amount')}
+            {_v14_method_move_sql('OLD.master_id', old_p, '-')}
+        END
+    """)
+
+    # --- 지출결의서 상세: 지급방법별 (v10) ---
+    def master_period(ref):
+        return f"(SELECT coalesce(substr(approval_date, 1, 7), '') FROM expense_masters WHERE master_id = {ref}.master_id)"
+    def master_exists(ref):
+        return f"EXISTS (SELECT 1 FROM expense_masters WHERE master_id = {ref}.master_id)"
+    new_m, old_m = "coalesce(trim(NEW.method), '')", "coalesce(trim(OLD.method), '')"
+    conn.execute(f"""
+        CREATE TRIGGER trg_expense_summary_details_ins AFTER INSERT ON expense_details
+        WHEN {master_exists('NEW')}
+        BEGIN {_v14_summary_delta_sql('method', master_period('NEW'), new_m, '1', 'NEW.amount')} END
+    """)
+    conn.execute(f"""
+        CREATE TRIGGER trg_expense_summary_details_del AFTER DELETE ON expense_details
+        WHEN {master_exists('OLD')}
+        BEGIN {_v14_summary_delta_sql('method', master_period('OLD'), old_m, '-1', '-OLD.amount')} END
+    """)
+    conn.execute(f"""
+        CREATE TRIGGER trg_expense_summary_details_upd AFTER UPDATE OF master_id, method, amount ON expense_details
+        BEGIN
+            {_v14_summary_delta_sql('method', master_period('OLD'), old_m, '-1', '-OLD.amount')}
+            {_v14_summary_delta_sql('method', master_period('NEW'), new_m, '1', 'NEW.amount')}
+        END
+    """)
+
+    # --- 강사 / 강의 / 지급 카운터 (v10) ---
+    conn.execute(f"""
+        CREATE TRIGGER trg_stat_instructors_ins AFTER INSERT ON instructors
+        BEGIN {_v14_counter_delta_sql('instructors', "''", '1')} END
+    """)
+    conn.execute(f"""
+        CREATE TRIGGER trg_stat_instructors_del AFTER DELETE ON instructors
+        BEGIN {_v14_counter_delta_sql('instructors', "''", '-1')} END
+    """)
+    new_lp, old_lp = "coalesce(substr(NEW.lecture_date, 1, 7), '')", "coalesce(substr(OLD.lecture_date, 1, 7), '')"
+    conn.execute(f"""
+        CREATE TRIGGER trg_stat_lectures_ins AFTER INSERT ON lectures
+        BEGIN
+            {_v14_counter_delta_sql('lectures', "''", '1')}
+            {_v14_counter_delta_sql('lectures_month', new_lp, '1')}
+        END
+    """)
+    conn.execute(f"""
+        CREATE TRIGGER trg_stat_lectures_del AFTER DELETE ON lectures
+        BEGIN
+            {_v14_counter_delta_sql('lectures', "''", '-1')}
+            {_v14_counter_delta_sql('lectures_month', old_lp, '-1')}
+        END
+    """)
+    conn.execute(f"""
+        CREATE TRIGGER trg_stat_lectures_upd AFTER UPDATE OF lecture_date ON lectures
+        BEGIN
+            {_v14_counter_delta_sql('lectures_month', old_lp, '-1')}
+            {_v14_counter_delta_sql('lectures_month', new_lp, '1')}
+        END
+    """)
+    done = "'완료'"
+    conn.execute(f"""
+        CREATE TRIGGER trg_stat_payments_ins AFTER INSERT ON payments
+        WHEN NEW.status = {done}
+        BEGIN {_v14_counter_delta_sql('payments_done', "''", '1')} END
+    """)
+    conn.execute(f"""
+        CREATE TRIGGER trg_stat_payments_del AFTER DELETE ON payments
+        WHEN OLD.status = {done}
+        BEGIN {_v14_counter_delta_sql('payments_done', "''", '-1')} END
+    """)
+    conn.execute(f"""
+        CREATE TRIGGER trg_stat_payments_upd AFTER UPDATE OF status ON payments
+        BEGIN {_v14_counter_delta_sql('payments_done', "''", f"(NEW.status = {done}) - (OLD.status = {done})")} END
+    """)
+
+    # --- 테이블 변경 카운터 (v11) ---
+    for table in ('expense_masters', 'expense_details', 'lectures', 'instructors'):
+        for event in ('INSERT', 'UPDATE', 'DELETE'):
+            conn.execute(f"""
+                CREATE TRIGGER trg_changes_{table}_{event.lower()[:3]} AFTER {event} ON {table}
+                BEGIN {_v14_counter_delta_sql(f'changes:{table}', "''", '1')} END
+            """)
+
+def _v14_recompute_aggregates(conn):
+    """원본 테이블로 빈도/집계/카운터를 다시 계산합니다. (변경 카운터 'changes:%' 는 버전 값이므로 그대로 둠)"""
+    conn.execute("DELETE FROM expense_value_freq")
+    for field in ('summary', 'method'):
+        conn.execute(f"""
+            INSERT INTO expense_value_freq (field, value, use_count)
+            SELECT '{field}', trim({field}), COUNT(*) FROM expense_details
+            WHERE trim(coalesce({field}, '')) != ''
+            GROUP BY trim({field})
+        """)
+    conn.execute("DELETE FROM expense_summary")
+    conn.execute("""
+        INSERT INTO expense_summary (period, dimension, key, item_count, amount)
+        SELECT coalesce(substr(approval_date, 1, 7), ''), 'month', '', count(*), coalesce(sum(total_amount), 0)
+        FROM expense_masters GROUP BY 1
+    """)
+    conn.execute("""
+        INSERT INTO expense_summary (period, dimension, key, item_count, amount)
+        SELECT coalesce(substr(approval_date, 1, 7), ''), 'author', coalesce(trim(author), ''), count(*), coalesce(sum(total_amount), 0)
+        FROM expense_masters GROUP BY 1, 3
+    """)
+    conn.execute("""
+        INSERT INTO expense_summary (period, dimension, key, item_count, amount)
+        SELECT coalesce(substr(m.approval_date, 1, 7), ''), 'method', coalesce(trim(d.method), ''), count(*), coalesce(sum(d.amount), 0)
+        FROM expense_details d JOIN expense_masters m ON m.master_id = d.master_id GROUP BY 1, 3
+    """)
+    conn.execute("DELETE FROM stat_counters WHERE name NOT LIKE 'changes:%'")
+    conn.execute("INSERT INTO stat_counters (name, period, value) SELECT 'instructors', '', count(*) FROM instructors")
+    conn.execute("INSERT INTO stat_counters (name, period, value) SELECT 'lectures', '', count(*) FROM lectures")
+    conn.execute("""
+        INSERT INTO stat_counters (name, period, value)
+        SELECT 'lectures_month', coalesce(substr(lecture_date, 1, 7), ''), count(*) FROM lectures GROUP BY 2
+    """)
+    conn.execute("INSERT INTO stat_counters (name, period, value) SELECT 'payments_done', '', count(*) FROM payments WHERE status = '완료'")
+
+@migration(14, '지급 상태를 강의당 1행으로 정리하고 상태 변경 이력(payment_history) 추가')
+def _v14_payment_state(conn):
+    # 지급 상태 저장을 UPSERT 로 바꾸기 전에, 충돌 정책에 영향받지 않는 집계 트리거로 교체합니다.
+    # (v10~v13 에서는 INSERT OR REPLACE 로 지급 상태를 저장할 때마다 payments_done 카운터가 0 으로 교체됐음)
+    _v14_rebuild_aggregate_triggers(conn)
+
+    # 상태가 바뀔 때마다 한 줄씩 쌓이는 이력 (추가만 하고 수정/삭제하지 않음)
+    conn.execute("""
+        CREATE TABLE IF NOT EXISTS payment_history (
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            lecture_id INTEGER NOT NULL REFERENCES lectures(id) ON DELETE CASCADE,
+            from_status TEXT,
+            to_status TEXT NOT NULL,
+            changed_at TEXT
+        )
+    """)
+    conn.execute('CREATE INDEX IF NOT EXISTS idx_payment_history_lecture ON payment_history(lecture_id, id)')
+
+    # 지금까지 INSERT OR REPLACE 로 쌓인 행들을 이력으로 옮기고, 강의별로 가장 최근 행만 남깁니다.
+    conn.execute("""
+        INSERT INTO payment_history (lecture_id, from_status, to_status, changed_at)
+        SELECT lecture_id, NULL, COALESCE(status, '대기'), updated_at FROM payments
+        WHERE lecture_id IN (SELECT id FROM lectures)
+        ORDER BY id
+    """)
+    conn.execute("DELETE FROM payments WHERE lecture_id IS NULL OR id NOT IN (SELECT MAX(id) FROM payments GROUP BY lecture_id)")
+    conn.execute('DROP INDEX IF EXISTS idx_payments_lecture_id')
+    conn.execute('CREATE UNIQUE INDEX IF NOT EXISTS idx_payments_lecture_id ON payments(lecture_id)')
+
+    conn.execute("""
+        CREATE TRIGGER IF NOT EXISTS trg_payment_history_ins AFTER INSERT ON payments
+        BEGIN
+            INSERT INTO payment_history (lecture_id, from_status, to_status, changed_at)
+            VALUES (NEW.lecture_id, NULL, NEW.status, NEW.updated_at);
+        END
+    """)
+    conn.execute("""
+        CREATE TRIGGER IF NOT EXISTS trg_payment_history_upd AFTER UPDATE OF status ON payments
+        WHEN OLD.status IS NOT NEW.status
+        BEGIN
+            INSERT INTO payment_history (lecture_id, from_status, to_status, changed_at)
+            VALUES (NEW.lecture_id, OLD.status, NEW.status, NEW.updated_at);
+        END
+    """)
+
+    # 잘못 쌓였을 수 있는 집계를 원본 테이블 기준으로 다시 맞춥니다. (위의 중복 행 삭제분 포함)
+    _v14_recompute_aggregates(conn)
+
+@migration(15, '강사 목록 정렬/검색용 이름 인덱스 추가')
+def _v15_instructor_name_index(conn):
+    # 강사 목록의 이름순 페이지 조회(ORDER BY + LIMIT/OFFSET)와 이름 앞글자 검색이 인덱스를 사용합니다.
+    conn.execute('CREATE INDEX IF NOT EXISTS idx_instructors_name ON instructors("이름")')
+
+@migration(16, '월별 강사료 계산용 강의 날짜 인덱스 추가')
+def _v16_lecture_date_index(conn):
+    # 지급 확인 화면의 월별 강의 조회(lecture_date 범위 조건)가 전체 강의를 훑지 않도록 합니다.
+    conn.execute('CREATE INDEX IF NOT EXISTS idx_lectures_date ON lectures(lecture_date)')
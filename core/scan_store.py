@@ -0,0 +1,142 @@
+"""
+scan_store.py - 스캔 문서(결재본, 지급 서류 등) 저장 및 전송 모듈
+업로드 파일을 작은 단위(chunk)로 나눠 디스크에 쓰면서 동시에 SHA-256 체크섬을 계산합니다.
+이전에 올린 파일과 내용이 같으면 저장을 건너뛰고, 저장된 파일은 HTTP Range 요청을 지원하는
+응답으로 브라우저에 전송합니다. (os.startfile 같은 OS 전용 기능을 사용하지 않음)
+
+ingest()/ingest_saved() 는 파일 I/O 를 수행하므로 이벤트 루프가 아닌 작업 스레드(run.io_bound)에서 호출하세요.
+"""
+
+import hashlib
+import mimetypes
+import os
+import re
+from dataclasses import dataclass
+from urllib.parse import quote
+
+from fastapi import Request
+from fastapi.responses import FileResponse, Response, StreamingResponse
+
+CHUNK_SIZE = 1024 * 1024  # 1MB
+
+@dataclass
+class ScanResult:
+    path: str
+    checksum: str
+    size: int
+    duplicate: bool  # 이전 파일과 내용이 같아 저장을 건너뛴 경우 True
+
+def safe_filename(text: str) -> str:
+    """파일 이름에 쓸 수 없는 문자를 제거합니다."""
+    return "".join(x for x in str(text) if x.isalnum() or x in " -_").strip()
+
+def file_checksum(path: str) -> str:
+    sha = hashlib.sha256()
+    with open(path, 'rb') as f:
+        for chunk in iter(lambda: f.read(CHUNK_SIZE), b''):
+            sha.update(chunk)
+    return sha.hexdigest()
+
+def upload_temp_path(save_dir: str, base_name: str) -> str:
+    """업로드를 받는 동안 쓰는 임시 경로. save_dir 안에 두어 완료 시 같은 디스크에서 이름만 바꿉니다."""
+    os.makedirs(save_dir, exist_ok=True)
+    return os.path.join(save_dir, f".{base_name}.{os.getpid()}.uploading")
+
+def _store(tmp_path: str, checksum: str, size: int, save_dir: str, base_name: str, ext: str,
+           previous_checksum: str = None, previous_path: str = None) -> ScanResult:
+    if previous_checksum == checksum and previous_path and os.path.exists(previous_path):
+        os.remove(tmp_path)
+        return ScanResult(previous_path, checksum, size, duplicate=True)
+
+    dest_path = os.path.join(save_dir, f"{base_name}_{checksum[:8]}{ext.lower()}")
+    os.replace(tmp_path, dest_path)
+    return ScanResult(dest_path, checksum, size, duplicate=False)
+
+def ingest(src, save_dir: str, base_name: str, ext: str, previous_checksum: str = None, previous_path: str = None) -> ScanResult:
+    """
+    업로드 스트림(src)을 save_dir 에 저장합니다.
+    - 임시 파일에 chunk 단위로 쓰면서 체크섬을 계산하므로 파일 전체를 메모리에 올리지 않습니다.
+    - 이전 파일과 체크섬이 같으면 임시 파일을 지우고 duplicate=True 를 반환합니다.
+    - 파일 이름에 체크섬 앞자리를 붙여 다른 내용의 파일이 같은 이름으로 덮어써지지 않게 합니다.
+    """
+    tmp_path = upload_temp_path(save_dir, base_name)
+    sha = hashlib.sha256()
+    size = 0
+    try:
+        with open(tmp_path, 'wb') as out:
+            for chunk in iter(lambda: src.read(CHUNK_SIZE), b''):
+                sha.update(chunk)
+                out.write(chunk)
+                size += len(chunk)
+    except Exception:
+        if os.path.exists(tmp_path):
+            os.remove(tmp_path)
+        raise
+    return _store(tmp_path, sha.hexdigest(), size, save_dir, base_name, ext, previous_checksum, previous_path)
+
+def ingest_saved(tmp_path: str, save_dir: str, base_name: str, ext: str, previous_checksum: str = None, previous_path: str = None) -> ScanResult:
+    """
+    upload_temp_path() 에 이미 받아 둔 업로드 파일을 ingest() 와 같은 규칙으로 저장합니다.
+    (NiceGUI 업로드 파일은 비동기로만 읽을 수 있으므로 e.file.save() 로 받은 뒤 작업 스레드에서 호출)
+    """
+    try:
+        checksum, size = file_checksum(tmp_path), os.path.getsize(tmp_path)
+    except Exception:
+        if os.path.exists(tmp_path):
+            os.remove(tmp_path)
+        raise
+    return _store(tmp_path, checksum, size, save_dir, base_name, ext, previous_checksum, previous_path)
+
+# ==========================================
+# HTTP 전송 (Range 지원)
+# ==========================================
+
+_RANGE_RE = re.compile(r'bytes=(\d*)-(\d*)$')
+
+def _iter_file(path: str, start: int, length: int):
+    with open(path, 'rb') as f:
+        f.seek(start)
+        remaining = length
+        while remaining > 0:
+            chunk = f.read(min(CHUNK_SIZE, remaining))
+            if not chunk:
+                break
+            remaining -= len(chunk)
+            yield chunk
+
+def ranged_file_response(request: Request, path: str) -> Response:
+    """
+    파일을 브라우저에 스트리밍합니다. Range 헤더(단일 구간)가 있으면 206 부분 응답을 보내
+    큰 PDF 도 필요한 부분부터 열리고, 중단된 다운로드를 이어받을 수 있습니다.
+    """
+    if not path or not os.path.isfile(path):
+        return Response('파일을 찾을 수 없습니다.', status_code=404, media_type='text/plain; charset=utf-8')
+
+    size = os.path.getsize(path)
+    media_type = mimetypes.guess_type(path)[0] or 'application/octet-stream'
+    headers = {
+        'Accept-Ranges': 'bytes',
+        'Content-Disposition': f"inline; filename*=UTF-8''{quote(os.path.basename(path))}",
+    }
+
+    range_header = request.headers.get('range')
+    if not range_header:
+        return FileResponse(path, media_type=media_type, headers=headers)
+
+    match = _RANGE_RE.match(range_header.strip())
+    if not match or (not match.group(1) and not match.group(2)):
+        return Response(status_code=416, headers={'Content-Range': f'bytes */{size}'})
+    if match.group(1):
+        start = int(match.group(1))
+        end = int(match.group(2)) if match.group(2) else size - 1
+    else:
+        # 'bytes=-500' 형태: 마지막 500바이트
+        start = max(size - int(match.group(2)), 0)
+        end = size - 1
+    end = min(end, size - 1)
+    if start > end:
+        return Response(status_code=416, headers={'Content-Range': f'bytes */{size}'})
+
+    length = end - start + 1
+    headers.update({'Content-Range': f'bytes {start}-{end}/{size}', 'Content-Length': str(length)})
+    return StreamingResponse(_iter_file(path, start, length), status_code=206, media_type=media_type, headers=headers)
@@ -0,0 +1,47 @@
+"""
+summary_repo.py - 대시보드/회계 화면용 집계 조회 계층
+expense_summary, stat_counters 테이블은 원본 테이블의 트리거가 같은 트랜잭션 안에서 갱신하므로
+화면에서는 원본 테이블을 훑지 않고 기본키 조회만으로 합계와 건수를 읽습니다.
+"""
+
+from datetime import datetime
+from core.db_manager import db
+
+def current_period() -> str:
+    """집계 기간 키 (YYYY-MM)"""
+    return datetime.now().strftime('%Y-%m')
+
+def get_counter(name: str, period: str = '') -> int:
+    rows = db.fetch_all("SELECT value FROM stat_counters WHERE name = ? AND period = ?", (name, period))
+    return rows[0]['value'] if rows else 0
+
+def get_dashboard_stats() -> dict:
+    """대시보드 카드에 표시할 강사 수, 이번 달 강의 수, 미지급/처리 대기 건수를 반환합니다."""
+    lectures = get_counter('lectures')
+    return {
+        'instructors': get_counter('instructors'),
+        'lectures_this_month': get_counter('lectures_month', current_period()),
+        'pending_payments': max(lectures - get_counter('payments_done'), 0),
+    }
+
+def get_expense_total(period: str = None) -> dict:
+    """해당 월의 결의서 건수와 총액을 반환합니다. (기본값: 이번 달)"""
+    rows = db.fetch_all(
+        "SELECT item_count, amount FROM expense_summary WHERE period = ? AND dimension = 'month' AND key = ''",
+        (period or current_period(),)
+    )
+    return rows[0] if rows else {'item_count': 0, 'amount': 0}
+
+def get_monthly_totals(limit: int = 12):
+    """최근 limit 개월의 월별 결의서 건수/총액을 최신 월부터 반환합니다."""
+    return db.fetch_all(
+        "SELECT period, item_count, amount FROM expense_summary WHERE dimension = 'month' ORDER BY period DESC LIMIT ?",
+        (limit,)
+    )
+
+def get_expense_breakdown(dimension: str, period: str = None):
+    """해당 월의 기안자별(author) 또는 지급방법별(method) 건수/금액을 금액이 큰 순서로 반환합니다."""
+    return db.fetch_all(
+        "SELECT key, item_count, amount FROM expense_summary WHERE period = ? AND dimension = ? ORDER BY amount DESC",
+        (period or current_period(), dimension)
+    )
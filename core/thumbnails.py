@@ -0,0 +1,103 @@
+"""
+thumbnails.py - 스캔 문서 썸네일 생성 모듈
+스캔 파일이 첨부되면 작업 스레드 풀에서 작은 미리보기 이미지(JPEG)를 미리 만들어 둡니다.
+- PDF: 첫 페이지를 렌더링 (PyMuPDF 필요)
+- JPG/PNG 등 이미지: 비율을 유지해 축소 (Pillow 필요)
+두 라이브러리는 선택 사항이며, 설치되어 있지 않으면 해당 형식의 썸네일만 생략됩니다.
+
+썸네일 파일 이름은 원본 경로/크기/수정 시각으로 정해지므로 원본이 바뀌면 자동으로 새로 만들어집니다.
+"""
+
+import hashlib
+import os
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from config import Config
+
+try:
+    from PIL import Image, ImageOps
+except ImportError:  # Pillow 미설치
+    Image = None
+
+try:
+    import pymupdf as fitz  # PyMuPDF (1.24 이상)
+except ImportError:
+    try:
+        import fitz  # 구버전 PyMuPDF
+    except ImportError:  # PyMuPDF 미설치
+        fitz = None
+
+# A4 비율에 맞춘 최대 크기 (픽셀)
+THUMBNAIL_SIZE = (240, 340)
+IMAGE_EXTENSIONS = {'.jpg', '.jpeg', '.png', '.gif', '.bmp', '.webp', '.tif', '.tiff'}
+
+_executor = ThreadPoolExecutor(max_workers=Config.THUMBNAIL_WORKERS, thread_name_prefix='thumbnail')
+_pending = set()
+_pending_lock = threading.Lock()
+
+def thumbnail_path(src_path: str):
+    """원본 파일에 대응하는 썸네일 경로를 반환합니다. (원본이 없으면 None)"""
+    try:
+        stat = os.stat(src_path)
+    except (OSError, TypeError):
+        return None
+    key = f"{os.path.abspath(src_path)}|{stat.st_size}|{stat.st_mtime_ns}"
+    return os.path.join(Config.THUMBNAIL_DIR, hashlib.sha1(key.encode('utf-8')).hexdigest() + '.jpg')
+
+def is_supported(src_path: str) -> bool:
+    ext = os.path.splitext(str(src_path))[1].lower()
+    if ext == '.pdf':
+        return fitz is not None and Image is not None
+    return ext in IMAGE_EXTENSIONS and Image is not None
+
+def _open_first_page(src_path: str):
+    """PDF 첫 페이지를 썸네일 크기에 가깝게 렌더링한 PIL 이미지를 반환합니다."""
+    with fitz.open(src_path) as doc:
+        page = doc.load_page(0)
+        zoom = THUMBNAIL_SIZE[1] / max(page.rect.height, 1)
+        pix = page.get_pixmap(matrix=fitz.Matrix(zoom, zoom), alpha=False)
+        return Image.frombytes('RGB', (pix.width, pix.height), pix.samples)
+
+def generate_thumbnail(src_path: str):
+    """썸네일을 만들고 경로를 반환합니다. 이미 있으면 그대로 반환하고, 만들 수 없으면 None."""
+    dest = thumbnail_path(src_path)
+    if dest is None or not is_supported(src_path):
+        return None
+    if os.path.exists(dest):
+        return dest
+
+    try:
+        if src_path.lower().endswith('.pdf'):
+            img = _open_first_page(src_path)
+        else:
+            img = Image.open(src_path)
+            img.draft('RGB', THUMBNAIL_SIZE)  # JPEG 는 디코딩 단계에서 바로 축소
+            img = ImageOps.exif_transpose(img)
+        img = img.convert('RGB')
+        img.thumbnail(THUMBNAIL_SIZE)
+
+        os.makedirs(Config.THUMBNAIL_DIR, exist_ok=True)
+        tmp = f"{dest}.{threading.get_ident()}.tmp"
+        img.save(tmp, 'JPEG', quality=80, optimize=True)
+        os.replace(tmp, dest)
+        return dest
+    except Exception as e:
+        print(f"⚠️ 썸네일 생성 실패 ({os.path.basename(src_path)}): {e}")
+        return None
+
+def _run(src_path: str):
+    try:
+        return generate_thumbnail(src_path)
+    finally:
+        with _pending_lock:
+            _pending.discard(src_path)
+
+def schedule_thumbnail(src_path: str):
+    """썸네일 생성을 백그라운드 작업 풀에 등록합니다. (같은 파일의 중복 요청은 무시)"""
+    if not src_path or not is_supported(src_path):
+        return None
+    with _pending_lock:
+        if src_path in _pending:
+            return None
+        _pending.add(src_path)
+    return _executor.submit(_run, src_path)
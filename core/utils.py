@@ -54,18 +54,11 @@ def format_date_str(date_str: str) -> str:
     return d_val
 
 def get_print_javascript(iframe_id: str) -> str:
-    """지정된 iframe ID의 콘텐츠를 새 창에 띄워 인쇄하는 JavaScript 템플릿을 반환합니다."""
+    """지정된 iframe ID가 불러온 문서 URL을 새 창에 띄워 인쇄하는 JavaScript 템플릿을 반환합니다."""
     return f"""
     var iframe = document.getElementById('{iframe_id}');
-    if (iframe && iframe.src.startsWith('data:')) {{
-        var printWindow = window.open('', '', 'width=1000,height=1200');
-        var b64 = iframe.src.split(',')[1];
-        var bin = atob(b64);
-        var u8 = new Uint8Array(bin.length);
-        for (var i=0; i<bin.length; i++) u8[i] = bin.charCodeAt(i);
-        var html = new TextDecoder('utf-8').decode(u8);
-        printWindow.document.write(html);
-        printWindow.document.close();
+    if (iframe && iframe.src) {{
+        var printWindow = window.open(iframe.src, '', 'width=1000,height=1200');
         printWindow.onload = function() {{ 
             setTimeout(function() {{ 
                 printWindow.print(); 
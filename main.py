@@ -11,7 +11,13 @@ from config import Config
 from core.ui_components import apply_global_css
 from core.router import PageRouter
 from core.auth import is_authenticated, logout, has_permission
+from core.db_manager import db
+from core.blob_store import blob_store
 from modules.auth.login_page import render_login_page
+# 지출품의서 미리보기 HTTP 라우트 등록 (/expense/preview/..., /expense/draft/...)
+import modules.accounting_group.expense.preview_routes  # noqa: F401
+# 지출 장부 내보내기 다운로드 라우트 등록 (/expense/export/...)
+import modules.accounting_group.expense.export  # noqa: F401
 
 # 🛠️ 각 모듈의 페이지 렌더링 함수 동적 임포트로 대체됨 (core.router.PageRouter 사용)
 
@@ -30,6 +36,11 @@ def load_menu_data():
 # --- 상태 관리 (현재 어떤 메뉴를 보고 있는지) ---
 from nicegui import app
 
+# 앱 종료 시 스레드별로 열어둔 DB 연결을 모두 닫습니다.
+app.on_shutdown(db.close_all)
+# 앱 시작 시 더 이상 참조되지 않는 첨부 파일을 정리합니다.
+app.on_startup(lambda: db.arun(blob_store.collect_garbage, db))
+
 # --- 인터페이스 구성 ---
 
 @ui.refreshable
@@ -1,15 +1,15 @@
-from nicegui import ui
-from core.db_manager import db # 로컬 DB 매니저 사용
+from nicegui import run, ui
+from core.summary_repo import get_expense_total, get_monthly_totals, get_expense_breakdown
+from modules.accounting_group.accounting.analytics import AGGREGATIONS, DATASETS, pivot
+
+# 예산 잔액 계산용 월 예산 (예시)
+MONTHLY_BUDGET = 12500000
 
 def render_accounting_page():
     """회계 관리 페이지를 렌더링합니다."""
-    # 데이터 불러오기
-    df = db.get_df('accounting')
-    
-    # 총 지출액 계산 (간단한 예시)
-    total_expense = 0
-    if not df.empty and '금액' in df.columns:
-        total_expense = df['금액'].sum()
+    # 데이터 불러오기 (지출결의서 저장 시 트리거가 갱신하는 집계 테이블에서 조회)
+    this_month = get_expense_total()
+    total_expense = this_month['amount']
 
     ui.label('💰 회계 관리 시스템 (로컬 DB)').classes('text-3xl font-bold mb-4')
     
@@ -17,17 +17,75 @@ def render_accounting_page():
         with ui.card().classes('flex-1 p-6 border-l-8 border-red-500 shadow-lg'):
             ui.label('이번 달 지출 현황').classes('text-lg font-semibold mb-2')
             ui.label(f'{total_expense:,}원').classes('text-4xl font-black text-red-600')
+            ui.label(f"결의서 {this_month['item_count']:,}건").classes('text-gray-500')
             ui.button('지출 결의서 작성', icon='edit_note').classes('mt-4 w-full bg-red-600 text-white')
 
         with ui.card().classes('flex-1 p-6 border-l-8 border-blue-500 shadow-lg'):
             ui.label('예산 잔액 (예시)').classes('text-lg font-semibold mb-2')
-            remaining = 12500000 - total_expense
+            remaining = MONTHLY_BUDGET - total_expense
             ui.label(f'{remaining:,}원').classes('text-4xl font-black text-blue-600')
             ui.button('상세 장부 보기', icon='visibility').classes('mt-4 w-full bg-blue-600 text-white')
 
-    # 데이터 테이블 표시
-    if not df.empty:
-        with ui.card().classes('w-full mt-6 p-4'):
-            ui.label('최근 지출 내역').classes('text-xl font-bold mb-4')
-            ui.table(columns=[{'name': col, 'label': col, 'field': col} for col in df.columns],
-                     rows=df.to_dict('records')).classes('w-full')
+    def summary_table(title, key_label, rows):
+        with ui.card().classes('flex-1 p-4'):
+            ui.label(title).classes('text-xl font-bold mb-4')
+            columns = [
+                {'name': 'key', 'label': key_label, 'field': 'key', 'align': 'left'},
+                {'name': 'item_count', 'label': '건수', 'field': 'item_count', 'align': 'right'},
+                {'name': 'amount', 'label': '금액', 'field': 'amount', 'align': 'right'},
+            ]
+            ui.table(columns=columns, rows=[{
+                'key': r['key'] or '(미지정)',
+                'item_count': f"{r['item_count']:,}",
+                'amount': f"{r['amount']:,}원"
+            } for r in rows], row_key='key').classes('w-full').props('dense flat')
+
+    # 집계 테이블 표시
+    with ui.row().classes('w-full gap-6 mt-6 items-start'):
+        summary_table('월별 지출 추이', '월', [dict(r, key=r['period']) for r in get_monthly_totals()])
+        summary_table('이번 달 기안자별', '기안자', get_expense_breakdown('author'))
+        summary_table('이번 달 지급방법별', '지급방법', get_expense_breakdown('method'))
+
+    render_pivot_explorer()
+
+def render_pivot_explorer():
+    """지출/강의료를 원하는 기준(월, 지급방법, 기안자, 강사)으로 교차 집계하는 분석 카드"""
+    pivot_state = {'dataset': 'expense', 'row_dim': 'month', 'col_dim': 'method', 'agg': 'sum'}
+
+    def dimension_options():
+        return DATASETS[pivot_state['dataset']]['dimensions']
+
+    async def refresh_pivot():
+        # 스냅샷이 최신이면 DB 를 읽지 않고 메모리에서 groupby 만 수행합니다.
+        result = await run.io_bound(pivot, pivot_state['dataset'], pivot_state['row_dim'], pivot_state['col_dim'], pivot_state['agg'])
+        pivot_table.columns = [{'name': c, 'label': c, 'field': c, 'align': 'left' if i == 0 else 'right', 'sortable': True}
+                               for i, c in enumerate(result.columns)]
+        pivot_table.rows = [
+            {c: (v if i == 0 else f"{round(v):,}") for i, (c, v) in enumerate(row.items())}
+            for row in result.to_dict('records')
+        ]
+
+    async def on_dataset_change():
+        # 데이터셋마다 사용할 수 있는 기준이 다르므로 선택지를 바꿔 줍니다.
+        options = dimension_options()
+        dims = list(options)
+        pivot_state['row_dim'] = dims[0]
+        pivot_state['col_dim'] = dims[1] if len(dims) > 1 else ''
+        row_select.set_options(options, value=pivot_state['row_dim'])
+        col_select.set_options({'': '(없음)', **options}, value=pivot_state['col_dim'])
+        await refresh_pivot()
+
+    with ui.card().classes('w-full mt-6 p-4'):
+        ui.label('📊 피벗 분석').classes('text-xl font-bold mb-4')
+        with ui.row().classes('w-full gap-4 items-center'):
+            ui.select({k: v['label'] for k, v in DATASETS.items()}, label='데이터', on_change=on_dataset_change) \
+                .bind_value(pivot_state, 'dataset').classes('w-40').props('dense outlined')
+            row_select = ui.select(dimension_options(), label='행 기준', on_change=refresh_pivot) \
+                .bind_value(pivot_state, 'row_dim').classes('w-40').props('dense outlined')
+            col_select = ui.select({'': '(없음)', **dimension_options()}, label='열 기준', on_change=refresh_pivot) \
+                .bind_value(pivot_state, 'col_dim').classes('w-40').props('dense outlined')
+            ui.select(AGGREGATIONS, label='집계', on_change=refresh_pivot) \
+                .bind_value(pivot_state, 'agg').classes('w-32').props('dense outlined')
+        pivot_table = ui.table(columns=[], rows=[]).classes('w-full mt-4').props('dense flat')
+
+    ui.timer(0.1, refresh_pivot, once=True)
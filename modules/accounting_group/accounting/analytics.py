@@ -0,0 +1,167 @@
+"""
+analytics.py - 회계 분석(피벗) 데이터 계층
+지출 상세와 강의료를 열 지향(pandas/NumPy) 스냅샷으로 메모리에 보관하고, 피벗은 이 스냅샷에서
+벡터화된 groupby 로 계산합니다. 클릭할 때마다 SQLite 를 다시 읽지 않습니다.
+
+스냅샷은 원본 테이블의 변경 카운터(stat_counters 'changes:<테이블>')를 기준으로 갱신됩니다.
+- 카운터가 그대로면 메모리의 스냅샷을 그대로 씁니다.
+- 마지막 스냅샷 이후 새 행 추가만 있었다면(카운터 증가분 = 증가 키가 더 큰 행 수) 새 행만 읽어 이어 붙입니다.
+- 수정/삭제가 섞여 있으면 해당 데이터셋 전체를 다시 읽습니다.
+"""
+
+import threading
+import pandas as pd
+from pandas.api.types import union_categoricals
+from core.db_manager import db
+from core.summary_repo import get_counter
+
+# 데이터셋 정의: 표시 이름, 원본 테이블(변경 카운터), 조회 SQL, 차원 컬럼, 값 컬럼,
+# cursors: 테이블별 계속 증가하는 키 컬럼 (없는 테이블은 추가만 있어도 전체를 다시 읽음)
+# append_key: 새 행만 읽을 때 조건을 거는 조회 SQL 안의 키 식 (cursors 의 첫 테이블)
+DATASETS = {
+    'expense': {
+        'label': '지출 내역',
+        'tables': ('expense_masters', 'expense_details'),
+        'sql': """
+            SELECT coalesce(substr(m.approval_date, 1, 7), '') AS month,
+                   coalesce(trim(d.method), '') AS method,
+                   coalesce(trim(m.author), '') AS author,
+                   d.amount AS amount
+            FROM expense_details d JOIN expense_masters m ON m.master_id = d.master_id
+        """,
+        'dimensions': {'month': '월', 'method': '지급방법', 'author': '기안자'},
+        'value': ('amount', '금액'),
+        'cursors': {'expense_details': 'id', 'expense_masters': 'seq'},
+        'append_key': 'd.id',
+    },
+    'lecture': {
+        'label': '강의료',
+        'tables': ('lectures', 'instructors'),
+        'sql': """
+            SELECT coalesce(substr(l.lecture_date, 1, 7), '') AS month,
+                   coalesce(i."이름", '') AS instructor,
+                   l.total_fee AS fee
+            FROM lectures l LEFT JOIN instructors i ON i.id = l.instructor_id
+        """,
+        'dimensions': {'instructor': '강사', 'month': '월'},
+        'value': ('fee', '강의료'),
+        'cursors': {'lectures': 'id'},
+        'append_key': 'l.id',
+    },
+}
+
+AGGREGATIONS = {'sum': '합계', 'count': '건수', 'mean': '평균'}
+
+class SnapshotCache:
+    """
+    데이터셋별 열 지향 스냅샷. 변경 카운터가 그대로면 메모리의 DataFrame 을 그대로 돌려주고,
+    추가만 있었으면 새 행만 읽어 이어 붙입니다. (수정/삭제가 있으면 전체 재조회)
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._frames = {}    # 데이터셋 -> DataFrame
+        self._versions = {}  # 데이터셋 -> 원본 테이블 변경 카운터 튜플
+        self._cursors = {}   # 데이터셋 -> {테이블: 스냅샷에 반영된 최대 키}
+        self.stats = {'hits': 0, 'appends': 0, 'reloads': 0}
+
+    def _current_version(self, name):
+        return tuple(get_counter(f'changes:{table}') for table in DATASETS[name]['tables'])
+
+    def _current_cursors(self, name):
+        return {
+            table: db.fetch_all(f"SELECT coalesce(max({key}), 0) AS k FROM {table}")[0]['k']
+            for table, key in DATASETS[name]['cursors'].items()
+        }
+
+    def _only_appended(self, name, version):
+        """마지막 스냅샷 이후 변경이 모두 새 행 추가인지 확인합니다. (테이블별 카운터 증가분 == 키가 더 큰 행 수)"""
+        spec = DATASETS[name]
+        for table, old, new in zip(spec['tables'], self._versions[name], version):
+            key = spec['cursors'].get(table)
+            added = 0
+            if key is not None:
+                added = db.fetch_all(f"SELECT count(*) AS cnt FROM {table} WHERE {key} > ?",
+                                     (self._cursors[name][table],))[0]['cnt']
+            if new - old != added:
+                return False
+        return True
+
+    def _load(self, name, upto, after=0) -> pd.DataFrame:
+        """증가 키가 (after, upto] 범위인 행을 읽습니다. (조회 SQL 에는 WHERE 절이 없으므로 범위 조건만 덧붙임)"""
+        spec = DATASETS[name]
+        sql = f"{spec['sql']} WHERE {spec['append_key']} > ? AND {spec['append_key']} <= ?"
+        params = (after, upto)
+        df = pd.DataFrame(db.fetch_all(sql, params), columns=list(spec['dimensions']) + [spec['value'][0]])
+        # 차원 컬럼은 범주형(정수 코드 배열)으로 바꿔 groupby 를 빠르게 하고 메모리를 줄입니다.
+        for col in spec['dimensions']:
+            df[col] = df[col].astype('category')
+        value_col = spec['value'][0]
+        df[value_col] = pd.to_numeric(df[value_col], errors='coerce').fillna(0).astype('int64')
+        return df
+
+    @staticmethod
+    def _append(df, new_rows):
+        if new_rows.empty:
+            return df
+        merged = {}
+        for col in df.columns:
+            if isinstance(df[col].dtype, pd.CategoricalDtype):
+                # 범주 목록을 합쳐 두 프레임의 정수 코드를 그대로 이어 붙입니다.
+                merged[col] = union_categoricals([df[col], new_rows[col]], ignore_order=True)
+            else:
+                merged[col] = pd.concat([df[col], new_rows[col]], ignore_index=True)
+        return pd.DataFrame(merged)
+
+    def get(self, name) -> pd.DataFrame:
+        version = self._current_version(name)
+        with self._lock:
+            if self._versions.get(name) == version:
+                self.stats['hits'] += 1
+                return self._frames[name]
+            cached = name in self._frames
+        # 카운터를 먼저 읽은 뒤 키 상한을 정하고 그 상한까지만 읽습니다.
+        # 그 사이에 추가된 행은 다음 조회 때 카운터 증가분과 새 행 수가 맞지 않아 전체 재조회로 처리됩니다.
+        cursors = self._current_cursors(name)
+        append_table = next(iter(DATASETS[name]['cursors']))
+        if cached and self._only_appended(name, version):
+            new_rows = self._load(name, cursors[append_table], after=self._cursors[name][append_table])
+            df = self._append(self._frames[name], new_rows)
+            stat = 'appends'
+        else:
+            df = self._load(name, cursors[append_table])
+            stat = 'reloads'
+        with self._lock:
+            self._frames[name] = df
+            self._versions[name] = version
+            self._cursors[name] = cursors
+            self.stats[stat] += 1
+        return df
+
+    def clear(self):
+        with self._lock:
+            self._frames.clear()
+            self._versions.clear()
+            self._cursors.clear()
+
+# 앱 전체에서 공유하는 분석 스냅샷
+snapshot_cache = SnapshotCache()
+
+def pivot(dataset: str, row_dim: str, col_dim: str = None, agg: str = 'sum') -> pd.DataFrame:
+    """
+    스냅샷에서 row_dim(x col_dim) 기준 피벗을 계산합니다.
+    반환: row_dim 을 첫 컬럼으로, col_dim 값들을 나머지 컬럼으로 하는 DataFrame ('합계' 컬럼 포함)
+    """
+    spec = DATASETS[dataset]
+    value_col = spec['value'][0]
+    df = snapshot_cache.get(dataset)
+    keys = [row_dim] + ([col_dim] if col_dim and col_dim != row_dim else [])
+
+    grouped = df.groupby(keys, observed=True)[value_col].agg(agg)
+    table = grouped.unstack(col_dim, fill_value=0) if len(keys) == 2 else grouped.to_frame(AGGREGATIONS[agg])
+    table.columns = [str(c) or '(미지정)' for c in table.columns]
+    if len(keys) == 2 and agg != 'mean':
+        table['합계'] = table.sum(axis=1)
+    table = table.sort_index(ascending=(row_dim != 'month'))
+    table.index = [str(i) or '(미지정)' for i in table.index]
+    return table.rename_axis(spec['dimensions'][row_dim]).reset_index()
@@ -0,0 +1,60 @@
+"""
+doc_cache.py - 렌더링된 지출결의서 문서 캐시 (LRU)
+저장된 결의서는 거의 바뀌지 않으므로 한 번 만든 HTML(또는 PDF)을 메모리에 보관해 재사용합니다.
+키는 (master_id, row_version, 작성일) 이며, 문서가 저장/삭제/수정되면 expense_repo 에서 무효화합니다.
+"""
+
+import threading
+from collections import OrderedDict
+from datetime import date
+from config import Config
+
+class RenderedDocumentCache:
+    def __init__(self, max_entries: int = 128):
+        self.max_entries = max_entries
+        self._entries = OrderedDict()  # (master_id, version, 작성일, kind) -> 값
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    @staticmethod
+    def _key(master_id, version, kind):
+        # 문서 하단의 작성일이 '오늘' 기준이므로 날짜가 바뀌면 자연히 다른 키가 됩니다.
+        return (master_id, version, date.today().isoformat(), kind)
+
+    def get(self, master_id, version, kind='html'):
+        """캐시된 값을 반환합니다. 없으면 None."""
+        key = self._key(master_id, version, kind)
+        with self._lock:
+            value = self._entries.get(key)
+            if value is None:
+                self.misses += 1
+                return None
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return value
+
+    def put(self, master_id, version, value, kind='html'):
+        key = self._key(master_id, version, kind)
+        with self._lock:
+            self._entries[key] = value
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+    def invalidate(self, master_id):
+        """해당 문서의 모든 버전/형식(HTML, PDF) 캐시를 제거합니다."""
+        with self._lock:
+            for key in [k for k in self._entries if k[0] == master_id]:
+                del self._entries[key]
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+
+    def stats(self):
+        with self._lock:
+            return {'entries': len(self._entries), 'hits': self.hits, 'misses': self.misses}
+
+# 앱 전체에서 공유하는 문서 캐시
+document_cache = RenderedDocumentCache(Config.DOC_CACHE_SIZE)
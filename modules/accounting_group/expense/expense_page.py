@@ -1,22 +1,36 @@
 """
 expense_page.py - 지출품의서 앱 (NiceGUI + SQLite 기반)
 """
-import base64
+import asyncio
+import hashlib
+import json
 import pandas as pd
 import os
 import shutil
+import tempfile
 from datetime import datetime
-from nicegui import ui
+from nicegui import background_tasks, run, ui
 
 # 공통 모듈 및 로컬 작성 모듈
 from core.db_manager import db
 from core.ui_components import page_title, primary_button, error_button, card_container
 from core.utils import to_korean_amount, format_date_str, get_print_javascript
+from core import scan_store
+from core.scan_store import safe_filename
+from core.thumbnails import is_supported as thumbnail_supported
+from core.image_pipeline import normalize_image
+from config import Config
 from modules.accounting_group.expense.template import generate_print_html
+from modules.accounting_group.expense.export import available_formats, export_url, get_export_job, start_export
+from modules.accounting_group.expense.importer import import_file, is_supported_file
+from modules.accounting_group.expense.preview_routes import new_draft_token, publish_draft, report_preview_url, scan_url, scan_thumbnail_url
 from modules.accounting_group.expense.expense_repo import (
-    load_all_reports, get_new_master_id, save_expense_report, delete_expense_report, update_scan_path
+    search_reports, search_history, get_value_suggestions, load_report, store_note_image, get_new_master_id, REPORT_COUNT_LIMIT, REPORT_SEARCH_LIMIT, save_expense_report, delete_expense_report, update_scan_path
 )
 
+# 입력이 멈춘 뒤 미리보기를 갱신하기까지 기다리는 시간 (초)
+PREVIEW_DEBOUNCE_SEC = 0.3
+
 # ==========================================
 # UI 렌더링 함수
 # ==========================================
@@ -48,12 +62,16 @@ def render_new_report_tab():
         'title': '',
         'approval_date': datetime.now().strftime('%Y-%m-%d'),
         'note_text': '',
-        'note_image_b64': '',
+        'note_image_hash': '',  # 첨부 저장소에 저장된 비고 이미지의 해시
         'details': [{'summary': '', 'date': '', 'amount': None, 'method': '', 'note': ''} for _ in range(5)],
-        'iframe': None  # 미리보기 iframe 참조 보관용
+        'iframe': None,  # 미리보기 iframe 참조 보관용
+        'draft_token': new_draft_token()  # 작성 중 미리보기 URL(/expense/draft/<token>) 용 토큰
     }
     
-    def update_preview():
+    # 미리보기 파이프라인 상태 (대기 중인 갱신 작업, 마지막으로 렌더링한 입력값의 해시)
+    preview = {'task': None, 'hash': None}
+
+    def collect_preview_data():
         # 상세 내역 날짜 형식 자동 변환 (M-D -> M월 D일)
         for row in state['details']:
             d_val = str(row.get('date', '')).strip()
@@ -71,7 +89,7 @@ def render_new_report_tab():
             'total_amount': total,
             'total_amount_kr': to_korean_amount(total),
             'note_text': state['note_text'],
-            'note_image_b64': state['note_image_b64']
+            'note_image_hash': state['note_image_hash']
         }
         
         d_list = []
@@ -84,20 +102,112 @@ def render_new_report_tab():
                     'method': d.get('method', ''),
                     'note': d.get('note', '')
                 })
-        
+        return m_data, d_list
+
+    def preview_hash(m_data, d_list):
+        """미리보기에 영향을 주는 입력값의 해시 (이미지는 내용 해시로 포함됨)"""
+        payload = json.dumps([m_data, d_list], ensure_ascii=False, sort_keys=True, default=str)
+        return hashlib.sha1(payload.encode('utf-8')).hexdigest()
+
+    def render_preview_src(m_data, d_list):
+        """(작업 스레드에서 실행) HTML 을 만들어 초안 미리보기 엔드포인트에 올리고 iframe 용 URL 을 반환합니다."""
         html_content = generate_print_html(m_data, d_list, hide_btn=True)
-        # 줄바꿈 문자가 JS 전송 시 오류를 유발할 수 있으므로 제거 후 base64 인코딩
-        b64_html = base64.b64encode(html_content.encode('utf-8')).decode('utf-8')
-        
+        return publish_draft(state['draft_token'], html_content)
+
+    async def update_preview():
+        m_data, d_list = collect_preview_data()
+        total_label.set_text(f"총 금액: {m_data['total_amount']:,}원")
+
+        # 화면에 보이는 내용이 바뀌지 않았다면 렌더링과 전송을 모두 건너뜁니다.
+        new_hash = preview_hash(m_data, d_list)
+        if new_hash == preview['hash']:
+            return
+        preview['hash'] = new_hash
+
+        try:
+            src = await run.io_bound(render_preview_src, m_data, d_list)
+        except asyncio.CancelledError:
+            # 렌더링 도중 취소되면 다음 갱신에서 다시 그리도록 해시를 비웁니다.
+            preview['hash'] = None
+            raise
+        except Exception as ex:
+            # 템플릿 오류 등으로 실패해도 같은 내용을 다시 그릴 수 있도록 해시를 비웁니다. (새 입력이 해시를 바꿨다면 그대로 둠)
+            if preview['hash'] == new_hash:
+                preview['hash'] = None
+            ui.notify(f'미리보기를 만들 수 없습니다: {ex}', type='negative')
+            return
+        # 렌더링 중에 새 입력이 들어와 해시가 바뀌었다면 오래된 결과는 버립니다.
         # iframe이 생성된 후에만 속성 업데이트 (NameError 방지)
-        if state['iframe']:
-            state['iframe'].props(f'src="data:text/html;base64,{b64_html}"')
-        
-        total_label.set_text(f"총 금액: {total:,}원")
+        if preview['hash'] == new_hash and state['iframe']:
+            state['iframe'].props(f'src="{src}"')
+
+    async def debounced_preview():
+        await asyncio.sleep(PREVIEW_DEBOUNCE_SEC)
+        await update_preview()
+
+    def schedule_preview():
+        """연속된 입력 이벤트를 짧은 시간 동안 모아 미리보기를 한 번만 갱신합니다."""
+        if preview['task'] and not preview['task'].done():
+            preview['task'].cancel()
+        preview['task'] = background_tasks.create(debounced_preview())
+
+    # 적요/지급방법 자동완성 후보 (빈도 테이블에서 사용 빈도순으로 불러옴)
+    suggestions = {'summary': [], 'method': []}
+
+    async def load_suggestions():
+        for field in suggestions:
+            suggestions[field] = await db.arun(get_value_suggestions, field)
+        grid.refresh()
+
+    async def search_history_reports(e):
+        """입력이 멈춘 뒤(debounce) 제목/기안자/적요 앞글자로 과거 결의서를 검색합니다."""
+        reports = await db.arun(search_history, e.value or '')
+        history_table.rows = [{
+            'master_id': r.get('master_id'),
+            'approval_date': r.get('approval_date'),
+            'title': r.get('title'),
+            'author': r.get('author'),
+            'total_amount': f"{int(r.get('total_amount') or 0):,}원"
+        } for r in reports]
+
+    async def copy_report(e):
+        """선택한 결의서의 기본 정보와 상세 내역을 작성 화면으로 복사합니다. (일자/결재일자는 새로 입력)"""
+        report = await db.arun(load_report, e.args[1]['master_id'])
+        if not report:
+            ui.notify('해당 문서를 찾을 수 없습니다.', type='negative')
+            return
+        for key in ('author', 'position', 'title'):
+            state[key] = report.get(key) or ''
+        state['note_text'] = report.get('note_text') or ''
+        state['note_image_hash'] = report.get('note_image_hash') or ''
+        state['details'] = [{
+            'summary': d.get('summary') or '',
+            'date': '',
+            'amount': d.get('amount'),
+            'method': d.get('method') or '',
+            'note': d.get('note') or ''
+        } for d in report['details']]
+        # 최소 5줄을 유지해 입력 칸이 부족하지 않게 합니다.
+        state['details'] += [{'summary': '', 'date': '', 'amount': None, 'method': '', 'note': ''}
+                             for _ in range(5 - len(state['details']))]
+        # 상세 내역은 한 번만 다시 그리고 미리보기도 한 번만 갱신합니다.
+        grid.refresh()
+        schedule_preview()
+        history_expansion.close()
+        ui.notify(f"{report['master_id']} 내용을 불러왔습니다. 일자를 확인하세요.", type='positive')
 
     # 상단에 "과거 내역 불러오기" 버튼 배치 (더 작게 조정)
-    with ui.expansion('📑 과거 내역 불러오기 (복사)', icon='history').classes('w-full mb-2 bg-blue-50 rounded-lg shadow-sm font-sm').props('dense'):
-        ui.label('준비 중인 기능입니다. (DB에서 이전 내역을 선택하여 채우는 기능)').classes('text-xs p-2')
+    with ui.expansion('📑 과거 내역 불러오기 (복사)', icon='history').classes('w-full mb-2 bg-blue-50 rounded-lg shadow-sm font-sm').props('dense') as history_expansion:
+        ui.input('품의제목 / 기안자 / 적요 앞글자로 검색', on_change=search_history_reports).classes('w-full').props('dense outlined clearable bg-color=white debounce=300')
+        history_columns = [
+            {'name': 'master_id', 'label': '문서번호', 'field': 'master_id', 'align': 'center'},
+            {'name': 'approval_date', 'label': '결재일자', 'field': 'approval_date', 'align': 'center'},
+            {'name': 'title', 'label': '품의제목', 'field': 'title', 'align': 'left'},
+            {'name': 'author', 'label': '기안자', 'field': 'author', 'align': 'center'},
+            {'name': 'total_amount', 'label': '총 금액', 'field': 'total_amount', 'align': 'right'},
+        ]
+        history_table = ui.table(columns=history_columns, rows=[], row_key='master_id').classes('w-full cursor-pointer').props('dense flat')
+        history_table.on('rowClick', copy_report)
 
     # 좌우 분할 레이아웃 (높이 균형 조정: items-stretch)
     with ui.row().classes('w-full items-stretch gap-2 no-wrap'):
@@ -107,7 +217,7 @@ def render_new_report_tab():
                 with ui.row().classes('w-full justify-between items-center mb-2'):
                     ui.label('1. 기본 정보 및 상세 내역').classes('text-lg font-bold text-gray-800')
                     
-                    def do_save():
+                    async def do_save():
                         if not state['title'] or not state['author']:
                             ui.notify('오류: 품의제목과 기안자를 입력하세요.', type='negative')
                             return
@@ -125,11 +235,11 @@ def render_new_report_tab():
                             'total_amount': total,
                             'total_amount_kr': to_korean_amount(total),
                             'note_text': state['note_text'],
-                            'note_image_b64': state['note_image_b64'],
+                            'note_image_hash': state['note_image_hash'],
                             'scan_file_path': ''
                         }
                         
-                        res = save_expense_report(m_data, state['details'])
+                        res = await db.arun(save_expense_report, m_data, state['details'])
                         if '오류' in res:
                             ui.notify(res, type='negative')
                         else:
@@ -151,11 +261,11 @@ def render_new_report_tab():
                     with ui.column().classes('w-full gap-2 border rounded-lg bg-gray-50/50 p-2'):
                         for i, row in enumerate(state['details']):
                             with ui.row().classes('w-full items-center gap-1 p-0.5 bg-white rounded-md shadow-sm border border-gray-100'):
-                                ui.input('적요').bind_value(row, 'summary').classes('flex-1').props('dense borderless').on('change', update_preview)
-                                ui.input('일자').bind_value(row, 'date').classes('w-16').props('dense borderless placeholder="M-D"').on('change', update_preview)
-                                ui.input('금액').props('type="number" dense borderless').bind_value(row, 'amount').classes('w-20').on('change', update_preview)
-                                ui.input('지급방법').bind_value(row, 'method').classes('w-16').props('dense borderless').on('change', update_preview)
-                                ui.input('비고').bind_value(row, 'note').classes('w-16').props('dense borderless').on('change', update_preview)
+                                ui.input('적요', autocomplete=suggestions['summary']).bind_value(row, 'summary').classes('flex-1').props('dense borderless').on('change', schedule_preview)
+                                ui.input('일자').bind_value(row, 'date').classes('w-16').props('dense borderless placeholder="M-D"').on('change', schedule_preview)
+                                ui.input('금액').props('type="number" dense borderless').bind_value(row, 'amount').classes('w-20').on('change', schedule_preview)
+                                ui.input('지급방법', autocomplete=suggestions['method']).bind_value(row, 'method').classes('w-16').props('dense borderless').on('change', schedule_preview)
+                                ui.input('비고').bind_value(row, 'note').classes('w-16').props('dense borderless').on('change', schedule_preview)
                     
                     with ui.row().classes('w-full justify-center mt-2'):
                         def add_row():
@@ -166,21 +276,28 @@ def render_new_report_tab():
                 grid()
                 
                 ui.label('3. 비고란').classes('text-md font-bold mt-4 mb-1 text-gray-700')
-                note_input = ui.textarea('텍스트 본문').bind_value(state, 'note_text').classes('w-full').props('rows=2 dense').on('change', update_preview)
+                note_input = ui.textarea('텍스트 본문').bind_value(state, 'note_text').classes('w-full').props('rows=2 dense').on('change', schedule_preview)
                 
-                def handle_upload(e):
-                    b64 = base64.b64encode(e.content.read()).decode()
-                    state['note_image_b64'] = b64
-                    update_preview()
+                async def handle_upload(e):
+                    # 원본 사진은 프로세스 풀에서 EXIF 제거 + 인쇄 크기로 축소한 뒤
+                    # DB 행이 아닌 첨부 저장소에 저장하고 해시만 보관합니다.
+                    try:
+                        data = await run.cpu_bound(normalize_image, await e.file.read())
+                    except Exception as ex:
+                        ui.notify(f'이미지를 처리할 수 없습니다: {ex}', type='negative')
+                        return
+                    state['note_image_hash'] = await db.arun(store_note_image, data)
+                    schedule_preview()
                     ui.notify('이미지가 첨부되었습니다.')
                     
-                ui.upload(label='이미지 첨부 (*.PNG, JPG)', on_upload=handle_upload, auto_upload=True).classes('w-full mt-4').props('accept="image/*"')
+                ui.upload(label='이미지 첨부 (*.PNG, JPG)', on_upload=handle_upload, auto_upload=True,
+                          max_file_size=Config.NOTE_IMAGE_MAX_BYTES).classes('w-full mt-4').props('accept="image/*"')
                 
                 # 입력 바인딩으로 미리보기 자동 갱신
-                author_input.on('change', update_preview)
-                pos_input.on('change', update_preview)
-                title_input.on('change', update_preview)
-                date_input.on('change', update_preview)
+                author_input.on('change', schedule_preview)
+                pos_input.on('change', schedule_preview)
+                title_input.on('change', schedule_preview)
+                date_input.on('change', schedule_preview)
 
         # 2. 우측 영역: A4 미리보기
         with ui.column().classes('w-full md:w-[58%] sticky top-2 gap-2'):
@@ -200,14 +317,14 @@ def render_new_report_tab():
                     state['iframe'].props('id="new-preview-iframe" scrolling="no"')
                 
     # 초기 실행 및 프리뷰 로드
-    update_preview()
+    ui.timer(0.1, update_preview, once=True)
+    ui.timer(0.1, load_suggestions, once=True)
 
 @ui.refreshable
 def render_manage_reports_tab():
-    all_reports = load_all_reports()
-    
     # 검색 필터 상태
     search_state = {
+        'keyword': '',  # 통합 검색어 (제목/기안자/비고/상세 적요 전문 검색, 관련도순)
         'title': '',
         'author': '',
         'date_start': '',
@@ -215,56 +332,183 @@ def render_manage_reports_tab():
         'min_amount': None,
         'max_amount': None
     }
+
+    # 목록은 가벼운 컬럼만 DB에서 걸러 가져오고, 상세 내역은 문서를 선택할 때 조회합니다.
+    initial_reports, initial_count = search_reports(search_state)
     
     # 현재 선택된 문서 상태 (딕셔너리로 관리하여 클로저 이슈 방지)
     state = {
-        'selected_id': all_reports[0]['master_id'] if all_reports else None,
+        'selected_id': initial_reports[0]['master_id'] if initial_reports else None,
+        'report': None,  # 선택된 문서의 전체 데이터 (update_view 에서 채움)
         'iframe': None,
         'scan_folder': './scans/expenses/'
     }
 
-    def get_filtered_reports():
-        filtered = all_reports
-        if search_state['title']:
-            filtered = [r for r in filtered if search_state['title'].lower() in r.get('title', '').lower()]
-        if search_state['author']:
-            filtered = [r for r in filtered if search_state['author'].lower() in r.get('author', '').lower()]
-        if search_state['date_start']:
-            filtered = [r for r in filtered if r.get('approval_date', '') >= search_state['date_start']]
-        if search_state['date_end']:
-            filtered = [r for r in filtered if r.get('approval_date', '') <= search_state['date_end']]
-        if search_state['min_amount'] is not None:
-            filtered = [r for r in filtered if int(r.get('total_amount', 0)) >= search_state['min_amount']]
-        if search_state['max_amount'] is not None:
-            filtered = [r for r in filtered if int(r.get('total_amount', 0)) <= search_state['max_amount']]
-        return filtered
-
-    def get_filtered_rows():
-        f = get_filtered_reports()
+    def to_table_rows(reports):
         return [{
             'master_id': r.get('master_id'),
             'approval_date': r.get('approval_date'),
             'title': r.get('title'),
             'author': r.get('author'),
-            'total_amount': f"{int(r.get('total_amount', 0)):,}원"
-        } for r in f]
+            'total_amount': f"{int(r.get('total_amount') or 0):,}원"
+        } for r in reports]
+
+    def count_text(count):
+        shown = min(count, REPORT_SEARCH_LIMIT)
+        total = f'{count:,}건 이상' if count >= REPORT_COUNT_LIMIT else f'{count:,}건'
+        return f'검색 결과 {total}' + (f' (최근 {shown}건 표시)' if count > shown else '')
 
-    def update_view():
+    async def apply_filters():
+        """입력이 멈춘 뒤(debounce) 검색 조건을 SQL 로 DB 에서 직접 조회합니다."""
+        reports, count = await db.arun(search_reports, dict(search_state))
+        table.rows = to_table_rows(reports)
+        count_label.set_text(count_text(count))
+
+    async def update_view():
         if not state['selected_id'] or not state['iframe']: return
         
-        target = next((x for x in all_reports if x['master_id'] == state['selected_id']), None)
+        target = await db.arun(load_report, state['selected_id'])
+        state['report'] = target
         if target:
-            html_content = generate_print_html(target, target.get('details', []), hide_btn=True)
-            b64_html = base64.b64encode(html_content.encode('utf-8')).decode('utf-8')
-            state['iframe'].props(f'src="data:text/html;base64,{b64_html}"')
+            # 문서는 /expense/preview/<master_id> 에서 렌더링되며, 다시 선택하면 브라우저가 304 로 재사용합니다.
+            state['iframe'].props(f'src="{report_preview_url(state["selected_id"])}"')
             
             # 스캔 관리 UI 상태 업데이트
             scan_path = target.get('scan_file_path')
             scan_info_label.set_text(f"📁 현재 파일: {os.path.basename(scan_path) if scan_path else '없음'}")
-            open_scan_btn.set_visibility(bool(scan_path and os.path.exists(scan_path)))
+            has_scan = bool(scan_path and os.path.exists(scan_path))
+            open_scan_btn.set_visibility(has_scan)
+            # 원본을 내려받지 않고도 확인할 수 있도록 썸네일을 표시합니다.
+            show_thumb = has_scan and thumbnail_supported(scan_path)
+            if show_thumb:
+                scan_thumb.set_source(scan_thumbnail_url(state['selected_id'], target.get('scan_checksum')))
+            scan_thumb.set_visibility(show_thumb)
         else:
             ui.notify('해당 문서를 찾을 수 없습니다.', type='negative')
 
+    def open_export_dialog():
+        """현재 검색 조건 + 기간으로 장부를 내보냅니다. 파일은 작업 스레드에서 만들고 진행률만 화면에 표시합니다."""
+        export_state = {
+            'date_start': search_state['date_start'],
+            'date_end': search_state['date_end'],
+            'format': 'csv',
+            'token': None
+        }
+        with ui.dialog() as dialog, ui.card().classes('p-6 w-[420px]'):
+            ui.label('📤 지출 장부 내보내기').classes('text-lg font-bold')
+            ui.label('현재 검색 조건이 함께 적용됩니다. (상세 내역 1줄당 1행)').classes('text-xs text-gray-500 mb-2')
+            with ui.row().classes('w-full gap-2'):
+                ui.input('시작일').props('type=date dense outlined').bind_value(export_state, 'date_start').classes('flex-1')
+                ui.input('종료일').props('type=date dense outlined').bind_value(export_state, 'date_end').classes('flex-1')
+            ui.select(available_formats(), label='파일 형식').bind_value(export_state, 'format').classes('w-full').props('dense outlined')
+            progress = ui.linear_progress(value=0, show_value=False).classes('mt-4')
+            progress_label = ui.label('').classes('text-sm text-gray-600')
+            progress.set_visibility(False)
+
+            def poll():
+                job = get_export_job(export_state['token'])
+                if job is None:
+                    timer.deactivate()
+                    return
+                total = job['total'] or 0
+                progress.set_value(job['done'] / total if total else 0)
+                progress_label.set_text(f"{job['done']:,} / {total:,}행" if job['total'] is not None else '준비 중...')
+                if job['status'] == 'done':
+                    timer.deactivate()
+                    ui.download(export_url(export_state['token']), job['filename'])
+                    ui.notify(f"✅ {job['done']:,}행을 내보냈습니다.", type='positive')
+                    dialog.close()
+                elif job['status'] == 'error':
+                    timer.deactivate()
+                    ui.notify(f"내보내기 실패: {job['error']}", type='negative')
+                    start_btn.enable()
+
+            timer = ui.timer(0.5, poll, active=False)
+
+            def do_start():
+                filters = dict(search_state, date_start=export_state['date_start'], date_end=export_state['date_end'])
+                export_state['token'] = start_export(filters, export_state['format'])
+                start_btn.disable()
+                progress.set_visibility(True)
+                timer.activate()
+
+            with ui.row().classes('w-full justify-end mt-4'):
+                ui.button('닫기', on_click=dialog.close).props('flat')
+                start_btn = ui.button('내보내기 시작', on_click=do_start, icon='download')
+        dialog.open()
+
+    def open_import_dialog():
+        """엑셀/CSV 로 관리하던 과거 결의서를 일괄 등록합니다. (같은 파일을 다시 올리면 이어서 진행)"""
+        import_state = {'processed': 0, 'running': False, 'imported': False}
+
+        async def save_upload(upload):
+            # 업로드 파일을 임시 파일로 chunk 단위로 옮겨 가져오기 작업이 파일을 행 단위로 읽게 합니다.
+            fd, path = tempfile.mkstemp(prefix='expense_import_', suffix=os.path.splitext(upload.name)[1].lower())
+            os.close(fd)
+            try:
+                await upload.save(path)
+            except Exception:
+                os.remove(path)
+                raise
+            return path
+
+        async def handle_import(e):
+            if import_state['running']:
+                ui.notify('가져오기가 진행 중입니다.', type='warning')
+                return
+            if not is_supported_file(e.file.name):
+                ui.notify('CSV 또는 XLSX 파일만 가져올 수 있습니다.', type='negative')
+                return
+            import_state.update(processed=0, running=True)
+            progress_label.set_text('가져오는 중...')
+            timer.activate()
+            path = None
+            try:
+                path = await save_upload(e.file)
+                result = await db.arun(import_file, path, lambda n: import_state.update(processed=n))
+            except Exception as ex:
+                ui.notify(f'가져오기 실패: {ex}', type='negative')
+                progress_label.set_text('')
+                return
+            finally:
+                # 업로드 저장에 실패해도 진행 중 상태가 남아 다음 가져오기를 막지 않도록 여기서 정리합니다.
+                import_state['running'] = False
+                timer.deactivate()
+                if path and os.path.exists(path):
+                    os.remove(path)
+
+            import_state['imported'] = import_state['imported'] or result.reports > 0
+            progress_label.set_text(
+                f"등록 {result.reports:,}건 (상세 {result.rows:,}줄) · 이미 등록됨 {result.skipped:,}건 · 오류로 제외 {result.failed:,}건"
+            )
+            error_table.rows = [{'id': i, 'row': r, 'message': m} for i, (r, m) in enumerate(result.errors)]
+            error_table.set_visibility(bool(result.errors))
+            if result.error_count > len(result.errors):
+                ui.notify(f'오류 {result.error_count:,}건 중 {len(result.errors):,}건만 표시합니다.', type='warning')
+            ui.notify('가져오기가 끝났습니다.', type='positive' if not result.failed else 'warning')
+
+        def close_dialog():
+            dialog.close()
+            if import_state['imported']:
+                render_manage_reports_tab.refresh()
+
+        with ui.dialog().props('persistent') as dialog, ui.card().classes('p-6 w-[560px]'):
+            ui.label('📥 과거 결의서 가져오기').classes('text-lg font-bold')
+            ui.label('머리글: 문서번호, 결재일자, 품의제목, 기안자, 직급, 적요, 일자, 금액, 지급방법, 비고 (내보내기 파일과 같은 형식)') \
+                .classes('text-xs text-gray-500')
+            ui.label('같은 문서번호(없으면 결재일자·품의제목·기안자)가 이어진 행을 결의서 1건으로 등록합니다.').classes('text-xs text-gray-500 mb-2')
+            ui.upload(label='CSV / XLSX 파일 선택', on_upload=handle_import, auto_upload=True).classes('w-full').props('accept=".csv,.xlsx,.xlsm"')
+            progress_label = ui.label('').classes('text-sm text-gray-700 mt-2')
+            timer = ui.timer(0.5, lambda: progress_label.set_text(f"{import_state['processed']:,}행 처리 중..."), active=False)
+            error_table = ui.table(columns=[
+                {'name': 'row', 'label': '행', 'field': 'row', 'align': 'right'},
+                {'name': 'message', 'label': '오류 내용', 'field': 'message', 'align': 'left'},
+            ], rows=[], row_key='id').classes('w-full max-h-60').props('dense flat virtual-scroll')
+            error_table.set_visibility(False)
+            with ui.row().classes('w-full justify-end mt-4'):
+                ui.button('닫기', on_click=close_dialog).props('flat')
+        dialog.open()
+
     with ui.row().classes('w-full no-wrap items-stretch gap-2'):
         # ==========================================
         # 1. 좌측 영역: 목록 및 검색 (약 40%)
@@ -272,15 +516,18 @@ def render_manage_reports_tab():
         with ui.column().classes('w-full md:w-[40%] gap-4'):
             with ui.card().classes('w-full h-full p-4 shadow-md bg-gray-50 border-none'):
                 ui.label('🔍 내역 필터링').classes('text-lg font-bold mb-2 text-gray-700')
+                # debounce: 글자마다가 아니라 입력이 300ms 멈춘 뒤에 한 번만 서버로 전송합니다.
+                ui.input('통합 검색 (적요·비고 포함)', on_change=apply_filters).bind_value(search_state, 'keyword').classes('w-full').props('dense outlined clearable bg-color=white debounce=300')
                 with ui.row().classes('w-full gap-2 items-center'):
-                    ui.input('품의제목', on_change=lambda: table.set_rows(get_filtered_rows())).bind_value(search_state, 'title').classes('flex-1').props('dense outlined bg-color=white')
-                    ui.input('기안자', on_change=lambda: table.set_rows(get_filtered_rows())).bind_value(search_state, 'author').classes('flex-1').props('dense outlined bg-color=white')
+                    ui.input('품의제목', on_change=apply_filters).bind_value(search_state, 'title').classes('flex-1').props('dense outlined bg-color=white debounce=300') \
+                        .tooltip('단어 앞글자로 찾고, 맞는 제목이 없으면 제목 중간의 글자로 찾습니다.')
+                    ui.input('기안자', on_change=apply_filters).bind_value(search_state, 'author').classes('flex-1').props('dense outlined bg-color=white debounce=300')
                 with ui.row().classes('w-full gap-2 items-center'):
-                    ui.input('시작일', on_change=lambda: table.set_rows(get_filtered_rows())).props('type=date dense outlined bg-color=white').bind_value(search_state, 'date_start').classes('flex-1')
-                    ui.input('종료일', on_change=lambda: table.set_rows(get_filtered_rows())).props('type=date dense outlined bg-color=white').bind_value(search_state, 'date_end').classes('flex-1')
+                    ui.input('시작일', on_change=apply_filters).props('type=date dense outlined bg-color=white').bind_value(search_state, 'date_start').classes('flex-1')
+                    ui.input('종료일', on_change=apply_filters).props('type=date dense outlined bg-color=white').bind_value(search_state, 'date_end').classes('flex-1')
                 with ui.row().classes('w-full gap-2 items-center mb-4'):
-                    ui.number('최소 금액', on_change=lambda: table.set_rows(get_filtered_rows())).bind_value(search_state, 'min_amount').classes('flex-1').props('dense outlined bg-color=white')
-                    ui.number('최대 금액', on_change=lambda: table.set_rows(get_filtered_rows())).bind_value(search_state, 'max_amount').classes('flex-1').props('dense outlined bg-color=white')
+                    ui.number('최소 금액', on_change=apply_filters).bind_value(search_state, 'min_amount').classes('flex-1').props('dense outlined bg-color=white debounce=300')
+                    ui.number('최대 금액', on_change=apply_filters).bind_value(search_state, 'max_amount').classes('flex-1').props('dense outlined bg-color=white debounce=300')
 
                 columns = [
                     {'name': 'master_id', 'label': '번호', 'field': 'master_id', 'sortable': True, 'align': 'left'},
@@ -290,22 +537,34 @@ def render_manage_reports_tab():
                     {'name': 'total_amount', 'label': '금액', 'field': 'total_amount', 'align': 'right'}
                 ]
                 
-                table = ui.table(columns=columns, rows=get_filtered_rows(), row_key='master_id').classes('w-full shadow-sm sticky top-0')
+                table = ui.table(columns=columns, rows=to_table_rows(initial_reports), row_key='master_id').classes('w-full shadow-sm sticky top-0')
                 # 행 클릭 시 해당 문서로 미리보기 업데이트
-                table.on('rowClick', lambda e: (state.update({'selected_id': e.args[1]['master_id']}), update_view()))
+                async def on_row_click(e):
+                    state['selected_id'] = e.args[1]['master_id']
+                    await update_view()
+                table.on('rowClick', on_row_click)
                 
                 with ui.row().classes('w-full justify-between items-center mt-2 px-1'):
-                    ui.label(f'총 {len(all_reports)}건 중 필터링됨').classes('text-gray-500 text-sm')
+                    count_label = ui.label(count_text(initial_count)).classes('text-gray-500 text-sm')
                     
-                    def do_delete():
-                        if state['selected_id']:
-                            delete_expense_report(state['selected_id'])
-                            ui.notify(f'{state["selected_id"]} 삭제 완료', type='positive')
-                            render_manage_reports_tab.refresh()
-                        else:
+                    async def do_delete():
+                        master_id = state['selected_id']
+                        if not master_id:
                             ui.notify('삭제할 문서를 선택하세요.', type='warning')
+                            return
+                        # 삭제 트랜잭션(BEGIN IMMEDIATE)이 잠금을 기다려도 화면이 멈추지 않도록 작업 스레드에서 실행합니다.
+                        try:
+                            await db.arun(delete_expense_report, master_id)
+                        except Exception as ex:
+                            ui.notify(f'❌ 삭제 실패: {ex}', type='negative')
+                            return
+                        ui.notify(f'{master_id} 삭제 완료', type='positive')
+                        render_manage_reports_tab.refresh()
                     
-                    error_button('선택 문서 삭제', on_click=do_delete, icon='delete').props('flat')
+                    with ui.row().classes('gap-1'):
+                        ui.button('가져오기', on_click=lambda: open_import_dialog(), icon='upload_file').props('flat color="primary"')
+                        ui.button('내보내기', on_click=lambda: open_export_dialog(), icon='download').props('flat color="primary"')
+                        error_button('선택 문서 삭제', on_click=do_delete, icon='delete').props('flat')
 
         # ==========================================
         # 2. 우측 영역: 미리보기 및 스캔 관리 (약 60%)
@@ -329,42 +588,50 @@ def render_manage_reports_tab():
                             scan_info_label = ui.label('현재 파일: 없음').classes('text-blue-900 font-medium')
                             
                             def open_file():
-                                target = next((x for x in all_reports if x['master_id'] == state['selected_id']), None)
+                                target = state['report'] or {}
                                 path = target.get('scan_file_path')
                                 if path and os.path.exists(path):
+                                    # 서버의 스캔 파일을 HTTP(Range 지원)로 새 탭에서 엽니다.
                                     ui.notify(f'파일을 엽니다: {os.path.basename(path)}')
-                                    os.startfile(os.path.abspath(path)) # Windows 전용
+                                    ui.navigate.to(scan_url(state['selected_id']), new_tab=True)
                                 else:
                                     ui.notify('파일이 없거나 경로가 잘못되었습니다.', type='negative')
                             
                             open_scan_btn = ui.button('파일 열기', on_click=open_file, icon='open_in_new').classes('bg-blue-600 text-white')
 
-                        def handle_upload(e):
-                            if not state['selected_id']:
+                        scan_thumb = ui.image().classes('w-40 border rounded shadow-sm cursor-pointer').on('click', open_file)
+                        scan_thumb.set_visibility(False)
+
+                        async def handle_upload(e):
+                            if not state['selected_id'] or not state['report']:
                                 ui.notify('먼저 문서를 선택하세요.', type='warning')
                                 return
                             
-                            # 저장 디렉토리 생성
-                            save_dir = state['scan_folder']
-                            if not os.path.exists(save_dir):
-                                os.makedirs(save_dir)
-                            
-                            # 파일명 생성: EXP-001_기안자_제목.ext
-                            target = next((x for x in all_reports if x['master_id'] == state['selected_id']), None)
-                            safe_title = "".join(x for x in target['title'] if x.isalnum() or x in " -_").strip()
-                            ext = os.path.splitext(e.name)[1]
-                            filename = f"{state['selected_id']}_{target['author']}_{safe_title}{ext}"
-                            dest_path = os.path.join(save_dir, filename)
+                            # 파일명 생성: EXP-001_기안자_제목_체크섬.ext
+                            target = state['report']
+                            base_name = f"{state['selected_id']}_{target['author']}_{safe_filename(target['title'])}"
+                            ext = os.path.splitext(e.file.name)[1]
+                            tmp_path = scan_store.upload_temp_path(state['scan_folder'], base_name)
                             
                             try:
-                                with open(dest_path, 'wb') as f:
-                                    f.write(e.content.read())
+                                # 업로드 파일을 chunk 단위로 임시 경로에 비동기로 받은 뒤,
+                                # 체크섬 계산과 이름 변경은 작업 스레드에서 합니다. (이벤트 루프 차단 없음)
+                                await e.file.save(tmp_path)
+                                result = await run.io_bound(
+                                    scan_store.ingest_saved, tmp_path, state['scan_folder'], base_name, ext,
+                                    target.get('scan_checksum'), target.get('scan_file_path')
+                                )
+                                if result.duplicate:
+                                    ui.notify('이미 첨부된 파일과 내용이 같아 저장을 건너뛰었습니다.', type='info')
+                                    return
                                 
                                 # DB 정보 업데이트
-                                update_scan_path(state['selected_id'], dest_path)
-                                ui.notify(f'✅ 스캔본이 저장되었습니다: {filename}', type='positive')
+                                await db.arun(update_scan_path, state['selected_id'], result.path, result.checksum)
+                                ui.notify(f'✅ 스캔본이 저장되었습니다: {os.path.basename(result.path)}', type='positive')
                                 render_manage_reports_tab.refresh()
                             except Exception as ex:
+                                if os.path.exists(tmp_path):
+                                    os.remove(tmp_path)
                                 ui.notify(f'❌ 저장 실패: {ex}', type='negative')
 
                         ui.upload(label='스캔된 파일 업로드 (*.pdf, *.jpg, *.png)', on_upload=handle_upload, auto_upload=True).classes('w-full').props('outlined dense')
@@ -375,4 +642,4 @@ def render_manage_reports_tab():
                     state['iframe'].props('id="manage-preview-iframe" scrolling="no"')
 
     # 초기 데이터 로드 시 미리보기 실행
-    update_view()
+    ui.timer(0.1, update_view, once=True)
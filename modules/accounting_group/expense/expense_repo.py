@@ -3,113 +3,236 @@ expense_repo.py - 지출품의서 데이터베이스 처리 계층 (Repository)
 UI 계층과 데이터 계층을 분리하고, 행 단위 최적화 쿼리를 사용합니다.
 """
 
+from datetime import datetime
+from core.blob_store import blob_store
 from core.db_manager import db
-import pandas as pd
-
-def load_all_reports():
-    """모든 지출결의서 데이터와 상세 내역을 로드합니다."""
-    # 향후 완전한 SQL JOIN으로 변경 가능하나 현재는 get_df(Pandas) 활용 유지
-    masters_df = db.get_df('expense_masters')
-    details_df = db.get_df('expense_details')
-    
-    if masters_df.empty:
+from core.thumbnails import schedule_thumbnail
+from modules.accounting_group.expense.doc_cache import document_cache
+
+# 목록 화면에 필요한 컬럼만 조회합니다. (비고 이미지 등 큰 컬럼 제외)
+REPORT_LIST_COLUMNS = 'master_id, approval_date, title, author, total_amount, scan_file_path'
+
+def get_scan_path(master_id):
+    """문서에 첨부된 스캔 파일 경로를 반환합니다. (없으면 None)"""
+    rows = db.fetch_all("SELECT scan_file_path FROM expense_masters WHERE master_id = ?", (master_id,))
+    return rows[0]['scan_file_path'] if rows else None
+
+# 한 번에 화면으로 보내는 최대 검색 결과 수
+REPORT_SEARCH_LIMIT = 200
+# 검색 결과 건수는 이 수까지만 셉니다. (넘으면 'N건 이상'으로 표시)
+REPORT_COUNT_LIMIT = 10000
+
+def _build_report_filter(filters: dict, title_substring: bool = False):
+    """
+    검색 조건(dict)을 파라미터 바인딩된 WHERE 절로 변환합니다. (품의제목/통합 검색어는 report_query_parts 에서 전문 검색으로 처리)
+    title_substring 이면 품의제목을 전문 검색 대신 부분 일치(instr)로 거릅니다.
+    """
+    where, params = [], []
+    if title_substring:
+        where.append("instr(title, ?) > 0")
+        params.append(filters['title'].strip())
+    if filters.get('author'):
+        # 기안자는 앞글자 일치 검색으로 범위 조건을 만들어 인덱스를 사용합니다.
+        where.append("author >= ? AND author < ?")
+        params.extend([filters['author'], filters['author'] + '\uffff'])
+    if filters.get('date_start'):
+        where.append("approval_date >= ?")
+        params.append(filters['date_start'])
+    if filters.get('date_end'):
+        where.append("approval_date <= ?")
+        params.append(filters['date_end'])
+    if filters.get('min_amount') is not None:
+        where.append("total_amount >= ?")
+        params.append(int(filters['min_amount']))
+    if filters.get('max_amount') is not None:
+        where.append("total_amount <= ?")
+        params.append(int(filters['max_amount']))
+    clause = f" WHERE {' AND '.join(where)}" if where else ""
+    return clause, params
+
+def build_fulltext_query(text: str, column: str = None) -> str:
+    """
+    사용자가 입력한 검색어를 FTS5 MATCH 식으로 변환합니다.
+    단어마다 따옴표로 감싸 특수문자를 무력화하고 '*' 를 붙여 앞글자 일치로 찾습니다. (모든 단어 AND)
+    column 을 주면 해당 컬럼에서만 찾습니다.
+    예: '2024 프린터 토너' -> '"2024"* "프린터"* "토너"*', ('토너', 'title') -> 'title : ("토너"*)'
+    """
+    terms = (text or '').split()
+    query = ' '.join('"' + t.replace('"', '""') + '"*' for t in terms)
+    return f"{column} : ({query})" if column and query else query
+
+def _has_fulltext_hit(query: str) -> bool:
+    """전문 검색 식에 맞는 결의서가 하나라도 있는지 인덱스로 확인합니다."""
+    return bool(db.fetch_all("SELECT 1 FROM expense_fts WHERE expense_fts MATCH ? LIMIT 1", (query,)))
+
+def report_query_parts(filters: dict):
+    """
+    검색 조건을 (FROM 대상, WHERE 절, 바인딩 값, ORDER BY) 로 변환합니다.
+    목록 조회와 내보내기가 같은 조건/정렬을 쓰도록 공유합니다.
+    filters['keyword'] 가 있으면 전문 검색(expense_fts) 관련도순, 없으면 최신순입니다.
+    품의제목(filters['title'])도 LIKE '%..%' 전체 스캔 대신 전문 검색 인덱스의 title 컬럼에서 단어 앞글자로 찾습니다.
+    단어 중간에 있는 글자(예: '토너' -> '프린터토너구매')는 인덱스로 찾을 수 없으므로, 앞글자 일치가 한 건도 없을 때만 부분 일치로 찾습니다.
+    """
+    title_query = build_fulltext_query(filters.get('title'), 'title')
+    title_substring = bool(title_query) and not _has_fulltext_hit(title_query)
+    if title_substring:
+        title_query = ''
+    clause, params = _build_report_filter(filters, title_substring)
+    source, order = "expense_masters", "seq DESC"
+    keyword_query = build_fulltext_query(filters.get('keyword'))
+    fts_query = ' AND '.join(f"({q})" for q in (keyword_query, title_query) if q)
+    if fts_query:
+        source = ("expense_masters JOIN (SELECT rowid AS hit_seq, rank AS hit_rank FROM expense_fts WHERE expense_fts MATCH ?) AS hits "
+                  "ON hits.hit_seq = expense_masters.seq")
+        if keyword_query:
+            order = "hits.hit_rank, seq DESC"
+        params = [fts_query] + params
+    return source, clause, params, order
+
+def search_reports(filters: dict, limit: int = REPORT_SEARCH_LIMIT):
+    """
+    검색 조건에 맞는 결의서 목록을 DB에서 직접 걸러 최대 limit 건 반환합니다.
+    filters['keyword'] 가 있으면 전문 검색(expense_fts) 관련도순, 없으면 최신순으로 정렬합니다.
+    반환값: (목록 행 리스트, 일치 건수 - 최대 REPORT_COUNT_LIMIT 까지만 셈)
+    """
+    source, clause, params, order = report_query_parts(filters)
+    rows = db.fetch_all(
+        f"SELECT {REPORT_LIST_COLUMNS} FROM {source}{clause} ORDER BY {order} LIMIT ?",
+        tuple(params) + (limit,)
+    )
+    # 입력할 때마다 실행되므로 전체 건수를 끝까지 세지 않고 상한에서 멈춥니다.
+    count = db.fetch_all(f"SELECT COUNT(*) AS cnt FROM (SELECT 1 FROM {source}{clause} LIMIT ?)", tuple(params) + (REPORT_COUNT_LIMIT,))
+    return rows, (count[0]['cnt'] if count else 0)
+
+def search_fulltext(text: str, limit: int = REPORT_SEARCH_LIMIT):
+    """제목/기안자/비고/상세 적요·비고/결재일자 전체에서 검색어를 찾아 관련도순으로 반환합니다."""
+    if not build_fulltext_query(text):
         return []
-    
-    reports = []
-    for _, master_row in masters_df.iterrows():
-        master_dict = master_row.to_dict()
-        if not details_df.empty and 'master_id' in details_df.columns:
-            m_id = master_dict.get('master_id')
-            master_details = details_df[details_df['master_id'] == m_id].to_dict('records')
-            master_dict['details'] = master_details
-        else:
-            master_dict['details'] = []
-        reports.append(master_dict)
-    
-    # 내림차순 정렬 (최신 번호 상단)
-    reports.sort(key=lambda x: str(x.get('master_id', '')), reverse=True)
-    return reports
+    return search_reports({'keyword': text}, limit)[0]
 
-def get_new_master_id():
-    """새로운 결의서 ID를 채번합니다."""
-    # SQLite 직접 쿼리로 최대값 조회로 최적화 가능
-    query = "SELECT master_id FROM expense_masters ORDER BY master_id DESC LIMIT 1"
-    rows = db.fetch_all(query)
-    
+def get_report_version(master_id):
+    """문서의 현재 행 버전을 기본키 조회로 가져옵니다. (문서가 없으면 None)"""
+    rows = db.fetch_all("SELECT row_version FROM expense_masters WHERE master_id = ?", (master_id,))
+    return rows[0]['row_version'] if rows else None
+
+def load_report(master_id):
+    """선택된 결의서 1건의 전체 데이터와 상세 내역을 master_id 인덱스로 조회합니다."""
+    rows = db.fetch_all("SELECT * FROM expense_masters WHERE master_id = ?", (master_id,))
     if not rows:
-        return "EXP-001"
-        
-    last_id = rows[0]['master_id']
-    try:
-        num = int(str(last_id).split('-')[1])
-        return f"EXP-{num + 1:03d}"
-    except:
-        return "EXP-001"
+        return None
+    report = rows[0]
+    report['details'] = db.fetch_all(
+        "SELECT summary, date, amount, method, note FROM expense_details WHERE master_id = ? ORDER BY id",
+        (master_id,)
+    )
+    return report
+
+# 과거 내역 불러오기 검색 결과 수
+HISTORY_SEARCH_LIMIT = 20
+
+def search_history(keyword: str, limit: int = HISTORY_SEARCH_LIMIT):
+    """
+    품의제목/기안자/상세 적요가 keyword 로 시작하는 과거 결의서를 최신순으로 반환합니다.
+    앞글자 일치를 범위 조건(>= keyword, < keyword + '\\uffff')으로 바꿔 각 컬럼의 인덱스를 사용합니다.
+    """
+    keyword = (keyword or '').strip()
+    if not keyword:
+        return []
+    bounds = (keyword, keyword + '\uffff')
+    return db.fetch_all(f"""
+        SELECT {REPORT_LIST_COLUMNS} FROM expense_masters
+        WHERE master_id IN (
+            SELECT master_id FROM expense_masters WHERE title >= ? AND title < ?
+            UNION SELECT master_id FROM expense_masters WHERE author >= ? AND author < ?
+            UNION SELECT master_id FROM expense_details WHERE summary >= ? AND summary < ?
+        )
+        ORDER BY seq DESC LIMIT ?
+    """, bounds * 3 + (limit,))
+
+# 자동완성 후보 수 (사용 빈도 상위)
+SUGGESTION_LIMIT = 50
+
+def get_value_suggestions(field: str, limit: int = SUGGESTION_LIMIT):
+    """적요(summary)/지급방법(method) 입력 자동완성 후보를 사용 빈도순으로 반환합니다. (빈도 테이블은 트리거가 갱신)"""
+    rows = db.fetch_all(
+        "SELECT value FROM expense_value_freq WHERE field = ? ORDER BY use_count DESC LIMIT ?",
+        (field, limit)
+    )
+    return [r['value'] for r in rows]
+
+def _now():
+    return datetime.now().strftime('%Y-%m-%d %H:%M:%S')
+
+EXPENSE_SEQUENCE = 'expense_master'
+
+def format_master_id(seq: int) -> str:
+    """일련번호를 결의서 문서번호 형식으로 변환합니다. (예: 7 -> EXP-007)"""
+    return f"EXP-{seq:03d}"
+
+def get_new_master_id():
+    """다음에 발급될 결의서 ID를 미리 확인합니다. (실제 발급은 저장 트랜잭션 안에서 이루어집니다)"""
+    rows = db.fetch_all("SELECT value FROM sequences WHERE name = ?", (EXPENSE_SEQUENCE,))
+    last = rows[0]['value'] if rows else 0
+    return format_master_id(last + 1)
 
 def save_expense_report(master_data, details_data):
-    """지출 결의서를 저장합니다. (Memory/Speed 최적화를 위해 행 단위 SQL 사용)"""
+    """
+    지출 결의서를 하나의 트랜잭션으로 저장합니다.
+    채번 -> 마스터 INSERT -> 상세 executemany 가 모두 성공해야 COMMIT 되므로
+    동시에 저장해도 번호가 겹치지 않고, 중간에 실패하면 아무것도 남지 않습니다.
+    """
     try:
-        # 1. 마스터 데이터 저장 (만약 테이블이 없으면 자동 생성이 안 되므로 기존 방식과 호환성 체크 필요)
-        # SQLite 테이블 자동 생성 기능이 db_manager.py의 SQLite에는 없으므로,
-        # 기존처럼 Pandas를 사용하되 전체 덮어쓰기가 아닌 1회 생성용으로 확인.
-        # 현행 유지 관점을 반영해 여기서는 최초 1회 빈 테이블 처리를 우회함.
-        
-        # 임시 방편: 테이블이 있는지 확인 (fetch_all 시도로 에러나면 없는 것)
-        if db.execute("SELECT 1 FROM expense_masters LIMIT 1") == -1:
-             # 테이블이 없으면 pandas를 이용해 더미 구조 생성
-             db.save_df(pd.DataFrame([master_data]), 'expense_masters')
-             # 초기 생성 완료
-             new_id = "EXP-001"
-             master_data['master_id'] = new_id
-             valid_details = []
-             for d in details_data:
-                 summary = d.get('summary', '').strip()
-                 amount = int(d.get('amount', 0) or 0)
-                 if summary or amount > 0:
-                     d_copy = d.copy()
-                     d_copy['master_id'] = new_id
-                     valid_details.append(d_copy)
-             if valid_details:
-                 db.save_df(pd.DataFrame(valid_details), 'expense_details')
-             return new_id
-             
-        # 이미 테이블이 있는 경우 (최적화 모드)
-        new_id = get_new_master_id()
-        master_data['master_id'] = new_id
-        
-        # Master INSERT
-        if not db.insert_row('expense_masters', master_data):
-            return "오류: 마스터 저장 실패"
-            
-        # Details INSERT
+        detail_rows = []
         for d in details_data:
-            summary = d.get('summary', '').strip()
+            summary = str(d.get('summary', '') or '').strip()
             amount = int(d.get('amount', 0) or 0)
             if summary or amount > 0:
-                d_copy = d.copy()
-                d_copy['master_id'] = new_id
-                
-                # 테이블이 없는 경우 대비
-                if db.execute("SELECT 1 FROM expense_details LIMIT 1") == -1:
-                    db.save_df(pd.DataFrame([d_copy]), 'expense_details')
-                else:
-                    db.insert_row('expense_details', d_copy)
-                    
+                detail_rows.append((summary, d.get('date', ''), amount, d.get('method', ''), d.get('note', '')))
+
+        with db.transaction() as conn:
+            seq = db.next_sequence(conn, EXPENSE_SEQUENCE)
+            new_id = format_master_id(seq)
+            master_row = dict(master_data, master_id=new_id, seq=seq, updated_at=_now())
+
+            columns = ', '.join(master_row.keys())
+            placeholders = ', '.join(['?'] * len(master_row))
+            conn.execute(f"INSERT INTO expense_masters ({columns}) VALUES ({placeholders})", tuple(master_row.values()))
+            blob_store.add_ref(conn, master_row.get('note_image_hash'))
+            conn.executemany(
+                "INSERT INTO expense_details (master_id, summary, date, amount, method, note) VALUES (?, ?, ?, ?, ?, ?)",
+                [(new_id,) + row for row in detail_rows]
+            )
+        master_data['master_id'] = new_id
+        document_cache.invalidate(new_id)
         return new_id
     except Exception as e:
         return f"오류: {e}"
 
+def store_note_image(data: bytes) -> str:
+    """비고 첨부 이미지를 첨부 저장소에 저장하고 해시를 반환합니다. (참조는 결의서 저장 시 등록)"""
+    with db.transaction() as conn:
+        return blob_store.put(conn, data)
+
 def delete_expense_report(master_id):
     """문서 번호를 기준으로 결의서와 상세 내용을 삭제합니다."""
-    db.delete_row('expense_masters', 'master_id = ?', (master_id,))
-    db.delete_row('expense_details', 'master_id = ?', (master_id,))
+    with db.transaction() as conn:
+        row = conn.execute("SELECT note_image_hash FROM expense_masters WHERE master_id = ?", (master_id,)).fetchone()
+        conn.execute("DELETE FROM expense_details WHERE master_id = ?", (master_id,))
+        conn.execute("DELETE FROM expense_masters WHERE master_id = ?", (master_id,))
+        if row:
+            blob_store.release(conn, row[0])
+    document_cache.invalidate(master_id)
     return True
 
-def update_scan_path(master_id, path):
-    """특정 문서의 스캔 파일 저장 경로를 업데이트합니다."""
-    # 컬럼이 있는지 한 번 더 확인 (방어적 프로그래밍)
-    cols = [r['name'] for r in db.fetch_all('PRAGMA table_info(expense_masters)')]
-    if 'scan_file_path' not in cols:
-        db.execute('ALTER TABLE expense_masters ADD COLUMN scan_file_path TEXT')
-    
-    return db.update_row('expense_masters', {'scan_file_path': path}, 'master_id = ?', (master_id,))
+def update_scan_path(master_id, path, checksum=None):
+    """특정 문서의 스캔 파일 저장 경로(와 내용 체크섬)를 업데이트합니다."""
+    updated = db.execute(
+        "UPDATE expense_masters SET scan_file_path = ?, scan_checksum = ?, updated_at = ?, row_version = row_version + 1 "
+        "WHERE master_id = ?",
+        (path, checksum, _now(), master_id)
+    )
+    document_cache.invalidate(master_id)
+    if updated > 0:
+        # 목록에서 바로 볼 수 있도록 썸네일을 백그라운드에서 미리 만들어 둡니다.
+        schedule_thumbnail(path)
+    return updated > 0
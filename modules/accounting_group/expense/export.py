@@ -0,0 +1,186 @@
+"""
+export.py - 지출결의서 장부 내보내기 (CSV / XLSX)
+검색 조건에 맞는 결의서를 상세 내역 1줄당 1행으로 펼쳐 파일로 만듭니다.
+- DB 에서는 fetchmany 로 EXPORT_CHUNK_SIZE 행씩만 읽고 바로 파일에 써서 메모리 사용량이 일정합니다.
+- 파일 생성은 별도 작업 스레드에서 진행되며, 화면은 진행률만 조회합니다.
+- 완성된 파일은 /expense/export/<token> 에서 Content-Length 가 있는 스트리밍 응답으로 내려받습니다.
+
+XLSX 는 openpyxl(선택 사항)의 write_only 모드를 사용하며, 설치되어 있지 않으면 CSV 만 제공합니다.
+"""
+
+import csv
+import os
+import secrets
+import tempfile
+import threading
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime
+from urllib.parse import quote
+
+from fastapi.responses import FileResponse, Response
+from nicegui import app
+from starlette.background import BackgroundTask
+
+from core.auth import is_authenticated
+from core.db_manager import db
+from modules.accounting_group.expense.expense_repo import report_query_parts
+
+try:
+    from openpyxl import Workbook
+except ImportError:  # openpyxl 미설치
+    Workbook = None
+
+EXPORT_CHUNK_SIZE = 1000
+# 보관하는 내보내기 작업 수 (끝난 작업 중 오래된 것의 파일부터 삭제)
+EXPORT_JOB_LIMIT = 20
+
+# (SELECT 식, 머리글)
+EXPORT_COLUMNS = [
+    ('expense_masters.master_id', '문서번호'),
+    ('expense_masters.approval_date', '결재일자'),
+    ('expense_masters.title', '품의제목'),
+    ('expense_masters.author', '기안자'),
+    ('expense_masters.position', '직급'),
+    ('expense_masters.total_amount', '총 금액'),
+    ('d.summary', '적요'),
+    ('d.date', '일자'),
+    ('d.amount', '금액'),
+    ('d.method', '지급방법'),
+    ('d.note', '비고'),
+]
+
+FORMATS = {'csv': 'CSV', 'xlsx': 'Excel (XLSX)'}
+MEDIA_TYPES = {
+    'csv': 'text/csv; charset=utf-8',
+    'xlsx': 'application/vnd.openxmlformats-officedocument.spreadsheetml.sheet',
+}
+
+_executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix='export')
+_jobs = OrderedDict()  # token -> 작업 상태 dict
+_jobs_lock = threading.Lock()
+
+def available_formats() -> dict:
+    return FORMATS if Workbook is not None else {'csv': FORMATS['csv']}
+
+def _ledger_query(filters: dict):
+    source, clause, params, order = report_query_parts(filters)
+    select = ', '.join(expr for expr, _ in EXPORT_COLUMNS)
+    joined = f"{source} LEFT JOIN expense_details d ON d.master_id = expense_masters.master_id"
+    return (
+        f"SELECT {select} FROM {joined}{clause} ORDER BY {order}, d.id",
+        f"SELECT COUNT(*) FROM {joined}{clause}",
+        tuple(params),
+    )
+
+def iter_ledger_chunks(filters: dict, chunk_size: int = EXPORT_CHUNK_SIZE):
+    """검색 조건에 맞는 장부 행을 chunk_size 개씩 묶어 차례로 돌려줍니다. (작업 스레드에서 호출)"""
+    sql, _, params = _ledger_query(filters)
+    cursor = db.get_connection().execute(sql, params)
+    try:
+        while True:
+            rows = cursor.fetchmany(chunk_size)
+            if not rows:
+                break
+            yield rows
+    finally:
+        cursor.close()
+
+def count_ledger_rows(filters: dict) -> int:
+    _, count_sql, params = _ledger_query(filters)
+    return db.get_connection().execute(count_sql, params).fetchone()[0]
+
+def _write_csv(path, filters, on_progress):
+    # utf-8-sig: 엑셀에서 열어도 한글이 깨지지 않도록 BOM 을 붙입니다.
+    with open(path, 'w', encoding='utf-8-sig', newline='') as f:
+        writer = csv.writer(f)
+        writer.writerow([label for _, label in EXPORT_COLUMNS])
+        for rows in iter_ledger_chunks(filters):
+            writer.writerows(rows)
+            on_progress(len(rows))
+
+def _write_xlsx(path, filters, on_progress):
+    # write_only 워크북은 행을 임시 파일로 바로 흘려보내므로 행 수와 관계없이 메모리가 일정합니다.
+    wb = Workbook(write_only=True)
+    ws = wb.create_sheet('지출내역')
+    ws.append([label for _, label in EXPORT_COLUMNS])
+    for rows in iter_ledger_chunks(filters):
+        for row in rows:
+            ws.append(list(row))
+        on_progress(len(rows))
+    wb.save(path)
+
+def _remove_file(path):
+    try:
+        os.remove(path)
+    except (OSError, TypeError):
+        pass
+
+def _run_export(token):
+    with _jobs_lock:
+        job = _jobs[token]
+
+    def on_progress(n):
+        job['done'] += n
+
+    try:
+        job['total'] = count_ledger_rows(job['filters'])
+        writer = _write_xlsx if job['format'] == 'xlsx' else _write_csv
+        writer(job['path'], job['filters'], on_progress)
+        job['status'] = 'done'
+    except Exception as e:
+        print(f"⚠️ 내보내기 실패: {e}")
+        job['status'] = 'error'
+        job['error'] = str(e)
+        _remove_file(job['path'])
+
+def start_export(filters: dict, fmt: str = 'csv') -> str:
+    """내보내기 작업을 등록하고 진행률 조회/다운로드에 쓰는 토큰을 반환합니다."""
+    if fmt not in available_formats():
+        raise ValueError(f"지원하지 않는 형식입니다: {fmt}")
+    token = secrets.token_urlsafe(16)
+    fd, path = tempfile.mkstemp(prefix='expense_export_', suffix=f'.{fmt}')
+    os.close(fd)
+    job = {
+        'filters': dict(filters),
+        'format': fmt,
+        'path': path,
+        'filename': f"지출내역_{datetime.now().strftime('%Y%m%d_%H%M%S')}.{fmt}",
+        'status': 'running',  # running / done / error
+        'total': None,
+        'done': 0,
+        'error': None,
+    }
+    with _jobs_lock:
+        _jobs[token] = job
+        # 끝난 작업만 오래된 순서로 정리합니다. 진행 중인 작업은 파일을 쓰는 중이므로 한도를 넘어도 남겨 둡니다.
+        finished = [t for t, j in _jobs.items() if j['status'] != 'running']
+        for old_token in finished[:max(len(_jobs) - EXPORT_JOB_LIMIT, 0)]:
+            _remove_file(_jobs.pop(old_token)['path'])
+    _executor.submit(_run_export, token)
+    return token
+
+def get_export_job(token: str):
+    with _jobs_lock:
+        job = _jobs.get(token)
+    return dict(job) if job else None
+
+def export_url(token: str) -> str:
+    return f"/expense/export/{token}"
+
+@app.get('/expense/export/{token}')
+def expense_export_download(token: str):
+    """완성된 내보내기 파일을 스트리밍으로 내려보내고, 전송이 끝나면 임시 파일을 지웁니다."""
+    if not is_authenticated():
+        return Response(status_code=401)
+    with _jobs_lock:
+        job = _jobs.get(token)
+        if job is None or job['status'] != 'done':
+            return Response('내보내기 파일이 없거나 아직 준비되지 않았습니다.', status_code=404, media_type='text/plain; charset=utf-8')
+        _jobs.pop(token)
+    return FileResponse(
+        job['path'],
+        media_type=MEDIA_TYPES[job['format']],
+        headers={'Content-Disposition': f"attachment; filename*=UTF-8''{quote(job['filename'])}"},
+        background=BackgroundTask(_remove_file, job['path']),
+    )
@@ -0,0 +1,321 @@
+"""
+importer.py - 과거 지출결의서 일괄 가져오기 (Excel / CSV)
+엑셀로 관리하던 지출품의서를 DB 로 옮깁니다. 파일 형식은 내보내기(export.py)와 같이 상세 내역 1줄당 1행이며,
+문서번호(원본 번호)가 같은 연속된 행, 번호가 없으면 결재일자/품의제목/기안자가 같은 연속된 행을 결의서 1건으로 묶습니다.
+
+- 파일은 한 행씩 읽어(CSV 스트리밍, openpyxl read_only) 전체를 메모리에 올리지 않습니다.
+- 날짜/금액을 검사하고 정규화하며, 잘못된 행이 있는 결의서는 건너뛰고 행 번호별 오류를 돌려줍니다.
+- IMPORT_BATCH_SIZE 건마다 한 트랜잭션으로 번호를 한꺼번에 발급하고 executemany 로 저장합니다.
+- 등록한 결의서는 expense_import_log 에 같은 트랜잭션으로 기록됩니다. 기록 키는 파일이 아니라 결의서 자체로 정하므로
+  (문서번호가 있으면 문서번호, 없으면 정규화한 결의서 내용의 해시) 중단된 파일이나 오류 행을 고친 파일을 다시 올려도
+  이미 등록된 결의서는 건너뛰고 나머지만 등록합니다.
+
+import_file() 은 파일/DB 작업을 하므로 작업 스레드(db.arun)에서 호출하세요.
+"""
+
+import codecs
+import csv
+import hashlib
+import json
+import os
+import re
+from dataclasses import dataclass, field
+from datetime import date, datetime, timedelta
+
+from core.db_manager import db
+from core.utils import format_date_str, to_korean_amount
+from modules.accounting_group.expense.expense_repo import EXPENSE_SEQUENCE, format_master_id
+
+try:
+    from openpyxl import load_workbook
+except ImportError:  # openpyxl 미설치
+    load_workbook = None
+
+# 한 트랜잭션으로 저장하는 결의서 수
+IMPORT_BATCH_SIZE = 500
+# 화면에 보여줄 최대 오류 수 (전체 건수는 따로 집계)
+MAX_REPORTED_ERRORS = 200
+
+# 머리글 -> 내부 필드 (내보내기 파일의 머리글과 자주 쓰는 별칭)
+HEADER_ALIASES = {
+    '문서번호': 'source_id', '번호': 'source_id',
+    '결재일자': 'approval_date', '결재일': 'approval_date',
+    '품의제목': 'title', '제목': 'title',
+    '기안자': 'author',
+    '직급': 'position',
+    '문서비고': 'note_text',
+    '적요': 'summary',
+    '일자': 'date',
+    '금액': 'amount',
+    '지급방법': 'method',
+    '비고': 'note',
+}
+REQUIRED_FIELDS = ('approval_date', 'title', 'author', 'amount')
+
+# expense_import_log.source 값 (group_key 의 종류)
+SOURCE_DOC_NUMBER = 'doc'   # group_key = 원본 문서번호
+SOURCE_CONTENT = 'content'  # group_key = 결의서 내용 해시 (문서번호가 없는 파일)
+
+@dataclass
+class ImportResult:
+    reports: int = 0          # 새로 등록한 결의서 수
+    rows: int = 0             # 새로 등록한 상세 내역 수
+    skipped: int = 0          # 이전 가져오기에서 이미 등록되어 건너뛴 결의서 수 (문서번호/내용 기준)
+    failed: int = 0           # 오류로 건너뛴 결의서 수
+    error_count: int = 0      # 전체 오류 행 수
+    errors: list = field(default_factory=list)  # (행 번호, 오류 내용) - 최대 MAX_REPORTED_ERRORS 개
+
+    def add_error(self, row_no: int, message: str):
+        self.error_count += 1
+        if len(self.errors) < MAX_REPORTED_ERRORS:
+            self.errors.append((row_no, message))
+
+# ==========================================
+# 값 정규화
+# ==========================================
+
+_DATE_RE = re.compile(r'^(\d{4})\s*[-./년]\s*(\d{1,2})\s*[-./월]\s*(\d{1,2})\s*일?$')
+
+def normalize_date(value):
+    """여러 형식의 날짜를 'YYYY-MM-DD' 로 바꿉니다. (해석할 수 없으면 ValueError)"""
+    if isinstance(value, datetime):
+        return value.strftime('%Y-%m-%d')
+    if isinstance(value, date):
+        return value.isoformat()
+    if isinstance(value, (int, float)) and 20000 < value < 80000:
+        # 엑셀 날짜 일련번호 (1900 날짜 체계)
+        return (datetime(1899, 12, 30) + timedelta(days=int(value))).strftime('%Y-%m-%d')
+    text = str(value or '').strip()
+    if re.fullmatch(r'\d{8}', text):
+        text = f"{text[:4]}-{text[4:6]}-{text[6:]}"
+    if ':' in text:
+        text = text.split(' ')[0]  # '2024-03-05 00:00:00' 처럼 시각이 붙은 경우
+    match = _DATE_RE.match(text)
+    if not match:
+        raise ValueError(f"날짜 형식을 알 수 없습니다: {text!r}")
+    try:
+        return date(*(int(g) for g in match.groups())).isoformat()
+    except ValueError:
+        raise ValueError(f"존재하지 않는 날짜입니다: {text!r}") from None
+
+def normalize_amount(value) -> int:
+    """'1,234원', '₩ 1234', 1234.0 같은 금액을 원 단위 정수로 바꿉니다. (음수/해석 불가 시 ValueError)"""
+    if isinstance(value, (int, float)):
+        amount = value
+    else:
+        text = re.sub(r'[\s,원₩]', '', str(value or ''))
+        if not text:
+            return 0
+        try:
+            amount = float(text)
+        except ValueError:
+            raise ValueError(f"금액을 숫자로 읽을 수 없습니다: {value!r}") from None
+    if amount < 0 or amount != int(amount):
+        raise ValueError(f"금액은 0 이상의 원 단위 정수여야 합니다: {value!r}")
+    return int(amount)
+
+def normalize_detail_date(value) -> str:
+    """상세 내역 일자는 화면과 같은 'M월 D일' 형식으로 저장합니다."""
+    if value in (None, ''):
+        return ''
+    try:
+        d = datetime.strptime(normalize_date(value), '%Y-%m-%d')
+        return f"{d.month}월 {d.day}일"
+    except ValueError:
+        return format_date_str(value)
+
+def _text(value) -> str:
+    return '' if value is None else str(value).strip()
+
+# ==========================================
+# 파일 읽기 (행 단위 스트리밍)
+# ==========================================
+
+def _detect_encoding(path: str) -> str:
+    """UTF-8(BOM 포함) 이 아니면 한글 엑셀의 기본 CSV 인코딩(cp949)으로 읽습니다."""
+    decoder = codecs.getincrementaldecoder('utf-8')()
+    with open(path, 'rb') as f:
+        try:
+            decoder.decode(f.read(64 * 1024), final=False)
+            return 'utf-8-sig'
+        except UnicodeDecodeError:
+            return 'cp949'
+
+def iter_sheet_rows(path: str):
+    """CSV / XLSX 파일의 행을 값 튜플로 하나씩 돌려줍니다. (첫 행은 머리글)"""
+    if path.lower().endswith(('.xlsx', '.xlsm')):
+        if load_workbook is None:
+            raise RuntimeError("엑셀 파일을 읽으려면 openpyxl 이 필요합니다. CSV 로 저장해서 올려 주세요.")
+        wb = load_workbook(path, read_only=True, data_only=True)
+        try:
+            yield from wb.worksheets[0].iter_rows(values_only=True)
+        finally:
+            wb.close()
+    else:
+        with open(path, encoding=_detect_encoding(path), newline='') as f:
+            yield from csv.reader(f)
+
+def iter_report_groups(path: str):
+    """
+    행들을 결의서 단위로 묶어 (시작 행 번호, [(행 번호, 행 dict), ...]) 로 돌려줍니다.
+    연속된 행만 같은 결의서로 묶으므로 한 번에 결의서 1건 분량만 메모리에 둡니다.
+    """
+    rows = iter_sheet_rows(path)
+    header = next(rows, None)
+    if header is None:
+        return
+    fields = [HEADER_ALIASES.get(_text(h).replace(' ', '')) for h in header]
+    missing = [f for f in REQUIRED_FIELDS if f not in fields]
+    if missing:
+        labels = {}
+        for label, name in HEADER_ALIASES.items():
+            labels.setdefault(name, label)
+        raise ValueError(f"필수 머리글이 없습니다: {', '.join(labels[f] for f in missing)}")
+
+    group, group_key = [], None
+    for row_no, values in enumerate(rows, start=2):
+        record = {f: v for f, v in zip(fields, values) if f}
+        if not any(_text(v) for v in record.values()):
+            continue  # 빈 행
+        key = _text(record.get('source_id')) or (
+            _text(record.get('approval_date')), _text(record.get('title')), _text(record.get('author'))
+        )
+        if group and key != group_key:
+            yield group[0][0], group
+            group = []
+        group_key = key
+        group.append((row_no, record))
+    if group:
+        yield group[0][0], group
+
+def _build_report(group, result: ImportResult):
+    """묶음을 검사/정규화해 (마스터 dict, 상세 튜플 목록) 을 반환합니다. 오류가 있으면 None."""
+    first = group[0][1]
+    master, details, ok = {}, [], True
+    try:
+        master['approval_date'] = normalize_date(first.get('approval_date'))
+    except ValueError as e:
+        result.add_error(group[0][0], str(e))
+        ok = False
+    for name in ('title', 'author'):
+        master[name] = _text(first.get(name))
+        if not master[name]:
+            result.add_error(group[0][0], f"{'품의제목' if name == 'title' else '기안자'}이(가) 비어 있습니다.")
+            ok = False
+    master['position'] = _text(first.get('position'))
+    master['note_text'] = _text(first.get('note_text'))
+
+    for row_no, record in group:
+        try:
+            amount = normalize_amount(record.get('amount'))
+        except ValueError as e:
+            result.add_error(row_no, str(e))
+            ok = False
+            continue
+        summary = _text(record.get('summary'))
+        if summary or amount > 0:
+            details.append((summary, normalize_detail_date(record.get('date')), amount,
+                            _text(record.get('method')), _text(record.get('note'))))
+    if ok and not details:
+        result.add_error(group[0][0], "상세 내역(적요/금액)이 없습니다.")
+        ok = False
+    return (master, details) if ok else None
+
+def report_key(group, master, details):
+    """
+    결의서의 가져오기 기록 키 (source, group_key).
+    문서번호가 있으면 문서번호, 없으면 정규화한 마스터/상세 내용의 해시라서 파일이 바뀌어도(행 추가/수정) 같은 결의서는 같은 키입니다.
+    """
+    source_id = _text(group[0][1].get('source_id'))
+    if source_id:
+        return SOURCE_DOC_NUMBER, source_id
+    content = json.dumps([master, details], ensure_ascii=False, sort_keys=True)
+    return SOURCE_CONTENT, hashlib.sha256(content.encode('utf-8')).hexdigest()
+
+# ==========================================
+# 저장
+# ==========================================
+
+_IMPORTED_KEYS_SQL = "SELECT group_key FROM expense_import_log WHERE source = ? AND group_key IN (SELECT value FROM json_each(?))"
+
+def _save_batch(batch, result: ImportResult):
+    """
+    결의서 묶음을 한 트랜잭션으로 저장합니다. (번호 일괄 발급 -> 마스터/상세/기록 executemany)
+    이전 가져오기에서 이미 등록된 결의서는 같은 트랜잭션 안에서 걸러 건너뜁니다.
+    """
+    now = datetime.now().strftime('%Y-%m-%d %H:%M:%S')
+    with db.transaction() as conn:
+        imported = set()
+        for source in {item[0] for item in batch}:
+            keys = [item[1] for item in batch if item[0] == source]
+            imported.update((source, r[0]) for r in conn.execute(_IMPORTED_KEYS_SQL, (source, json.dumps(keys))).fetchall())
+        result.skipped += sum(1 for item in batch if item[:2] in imported)
+        batch = [item for item in batch if item[:2] not in imported]
+        if not batch:
+            return
+        first_seq = db.reserve_sequence(conn, EXPENSE_SEQUENCE, len(batch))
+        masters, details, logs = [], [], []
+        for offset, (source, group_key, master, detail_rows) in enumerate(batch):
+            seq = first_seq + offset
+            master_id = format_master_id(seq)
+            total = sum(d[2] for d in detail_rows)
+            masters.append((master_id, seq, master['title'], master['author'], master['position'], master['approval_date'],
+                            total, to_korean_amount(total), master['note_text'], '', now))
+            details.extend((master_id,) + d for d in detail_rows)
+            logs.append((source, group_key, master_id, now))
+        conn.executemany(
+            "INSERT INTO expense_masters (master_id, seq, title, author, position, approval_date, "
+            "total_amount, total_amount_kr, note_text, scan_file_path, updated_at) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)",
+            masters
+        )
+        conn.executemany(
+            "INSERT INTO expense_details (master_id, summary, date, amount, method, note) VALUES (?, ?, ?, ?, ?, ?)",
+            details
+        )
+        conn.executemany(
+            "INSERT INTO expense_import_log (source, group_key, master_id, imported_at) VALUES (?, ?, ?, ?)",
+            logs
+        )
+    result.reports += len(masters)
+    result.rows += len(details)
+
+def import_file(path: str, on_progress=None, batch_size: int = IMPORT_BATCH_SIZE) -> ImportResult:
+    """
+    CSV/XLSX 파일의 과거 결의서를 가져옵니다.
+    on_progress(처리한 행 수) 는 묶음을 저장할 때마다 호출됩니다.
+    """
+    result = ImportResult()
+    # 이번 파일에서 이미 나온 키 (문서번호 중복 검사, 내용이 같은 결의서가 여러 번 있으면 순번을 붙여 구분)
+    seen = {}
+
+    batch, processed = [], 0
+    for first_row, group in iter_report_groups(path):
+        processed = group[-1][0]
+        report = _build_report(group, result)
+        if report is None:
+            result.failed += 1
+            continue
+        source, group_key = report_key(group, *report)
+        occurrence = seen.get((source, group_key), 0)
+        seen[(source, group_key)] = occurrence + 1
+        if occurrence and source == SOURCE_DOC_NUMBER:
+            result.add_error(first_row, f"문서번호가 파일 안에서 중복됩니다: {group_key}")
+            result.failed += 1
+            continue
+        if occurrence:
+            group_key = f"{group_key}#{occurrence + 1}"
+        batch.append((source, group_key) + report)
+        if len(batch) >= batch_size:
+            _save_batch(batch, result)
+            batch = []
+            if on_progress:
+                on_progress(processed)
+    if batch:
+        _save_batch(batch, result)
+    if on_progress:
+        on_progress(processed)
+    return result
+
+def is_supported_file(filename: str) -> bool:
+    ext = os.path.splitext(filename)[1].lower()
+    return ext == '.csv' or (ext in ('.xlsx', '.xlsm') and load_workbook is not None)
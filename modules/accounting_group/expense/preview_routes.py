@@ -0,0 +1,173 @@
+"""
+preview_routes.py - 지출품의서 미리보기 HTTP 엔드포인트
+iframe 과 인쇄 버튼이 base64 data URI 대신 URL 로 문서를 불러오도록 합니다.
+ETag/Last-Modified 로 바뀌지 않은 문서는 304 로 응답하고, 브라우저가 지원하면 gzip 으로 압축합니다.
+"""
+
+import gzip
+import hashlib
+import secrets
+import threading
+import time
+from collections import OrderedDict
+from datetime import datetime
+from email.utils import formatdate, parsedate_to_datetime
+
+from fastapi import Request
+from fastapi.responses import FileResponse, Response
+from nicegui import app
+
+from core.auth import is_authenticated
+from core.blob_store import blob_store, guess_mime
+from core.scan_store import ranged_file_response
+from core.thumbnails import generate_thumbnail
+from modules.accounting_group.expense.doc_cache import document_cache
+from modules.accounting_group.expense.expense_repo import get_report_version, get_scan_path, load_report
+from modules.accounting_group.expense.template import generate_print_html
+
+# 작성 중인 문서(초안) 미리보기 보관 개수 (가장 오래된 것부터 제거)
+DRAFT_LIMIT = 200
+# 이 크기 미만의 응답은 압축하지 않습니다.
+GZIP_MIN_BYTES = 1024
+
+_drafts = OrderedDict()  # token -> (html, etag, last_modified)
+_drafts_lock = threading.Lock()
+
+def new_draft_token() -> str:
+    """작성 화면마다 하나씩 발급하는 초안 미리보기 토큰을 만듭니다."""
+    return secrets.token_urlsafe(16)
+
+def make_etag(html: str) -> str:
+    return '"' + hashlib.sha1(html.encode('utf-8')).hexdigest() + '"'
+
+def publish_draft(token: str, html: str) -> str:
+    """초안 HTML 을 보관하고 iframe 에 넣을 URL 을 반환합니다. (내용이 바뀌면 URL 도 바뀜)"""
+    etag = make_etag(html)
+    with _drafts_lock:
+        _drafts[token] = (html, etag, time.time())
+        _drafts.move_to_end(token)
+        while len(_drafts) > DRAFT_LIMIT:
+            _drafts.popitem(last=False)
+    return f"/expense/draft/{token}?v={etag.strip(chr(34))[:12]}"
+
+def discard_draft(token: str):
+    with _drafts_lock:
+        _drafts.pop(token, None)
+
+def report_preview_url(master_id: str) -> str:
+    return f"/expense/preview/{master_id}"
+
+def scan_url(master_id: str) -> str:
+    return f"/expense/scans/{master_id}"
+
+def scan_thumbnail_url(master_id: str, checksum: str = None) -> str:
+    # 체크섬을 쿼리에 붙여 스캔 파일이 바뀌면 브라우저 캐시 대신 새 썸네일을 받게 합니다.
+    return f"/expense/scans/{master_id}/thumbnail" + (f"?v={checksum[:12]}" if checksum else "")
+
+def _not_modified(request: Request, etag: str, last_modified: float) -> bool:
+    """조건부 요청 헤더를 확인합니다. (If-None-Match 가 있으면 우선 적용)"""
+    if_none_match = request.headers.get('if-none-match')
+    if if_none_match is not None:
+        return etag in [t.strip() for t in if_none_match.split(',')]
+    if_modified_since = request.headers.get('if-modified-since')
+    if if_modified_since and last_modified:
+        try:
+            return int(last_modified) <= parsedate_to_datetime(if_modified_since).timestamp()
+        except (TypeError, ValueError):
+            return False
+    return False
+
+def html_response(request: Request, html: str, etag: str, last_modified: float) -> Response:
+    """ETag/Last-Modified/gzip 을 적용한 HTML 응답을 만듭니다."""
+    headers = {
+        'ETag': etag,
+        'Cache-Control': 'private, no-cache',  # 매번 재검증하되, 바뀌지 않았으면 304
+        'Vary': 'Accept-Encoding',
+    }
+    if last_modified:
+        headers['Last-Modified'] = formatdate(last_modified, usegmt=True)
+
+    if _not_modified(request, etag, last_modified):
+        return Response(status_code=304, headers=headers)
+
+    body = html.encode('utf-8')
+    if len(body) >= GZIP_MIN_BYTES and 'gzip' in request.headers.get('accept-encoding', ''):
+        body = gzip.compress(body, compresslevel=6)
+        headers['Content-Encoding'] = 'gzip'
+    return Response(content=body, media_type='text/html; charset=utf-8', headers=headers)
+
+def _parse_timestamp(value) -> float:
+    try:
+        return datetime.strptime(str(value), '%Y-%m-%d %H:%M:%S').timestamp()
+    except (TypeError, ValueError):
+        return 0.0
+
+# ==========================================
+# 라우트 (동기 함수로 선언해 FastAPI 스레드 풀에서 DB 조회/렌더링을 수행)
+# ==========================================
+
+@app.get('/expense/preview/{master_id}')
+def expense_preview(master_id: str, request: Request):
+    """저장된 지출결의서 문서를 HTML 로 반환합니다."""
+    if not is_authenticated():
+        return Response(status_code=401)
+    not_found = Response('해당 문서를 찾을 수 없습니다.', status_code=404, media_type='text/plain; charset=utf-8')
+    version = get_report_version(master_id)
+    if version is None:
+        return not_found
+
+    # 같은 버전의 문서는 캐시에서 바로 응답합니다. (행 버전 조회 1회 + 메모리 조회)
+    cached = document_cache.get(master_id, version)
+    if cached is None:
+        report = load_report(master_id)
+        if not report:
+            return not_found
+        html = generate_print_html(report, report.get('details', []), hide_btn=True)
+        cached = (html, make_etag(html), _parse_timestamp(report.get('updated_at')))
+        document_cache.put(master_id, report.get('row_version', version), cached)
+    return html_response(request, *cached)
+
+@app.get('/expense/attachments/{blob_hash}')
+def expense_attachment(blob_hash: str, request: Request):
+    """비고 첨부 이미지를 반환합니다. 내용 해시가 곧 이름이므로 브라우저가 영구 캐시해도 안전합니다."""
+    if not is_authenticated():
+        return Response(status_code=401)
+    if not all(c in '0123456789abcdef' for c in blob_hash) or len(blob_hash) != 64 or not blob_store.exists(blob_hash):
+        return Response(status_code=404)
+    etag = f'"{blob_hash}"'
+    if request.headers.get('if-none-match') == etag:
+        return Response(status_code=304, headers={'ETag': etag})
+    data = blob_store.read(blob_hash)
+    return Response(content=data, media_type=guess_mime(data), headers={
+        'ETag': etag,
+        'Cache-Control': 'private, max-age=31536000, immutable',
+    })
+
+@app.get('/expense/scans/{master_id}')
+def expense_scan(master_id: str, request: Request):
+    """문서에 첨부된 스캔 파일을 Range 요청을 지원하며 스트리밍합니다."""
+    if not is_authenticated():
+        return Response(status_code=401)
+    return ranged_file_response(request, get_scan_path(master_id))
+
+@app.get('/expense/scans/{master_id}/thumbnail')
+def expense_scan_thumbnail(master_id: str, request: Request):
+    """스캔 파일의 썸네일(JPEG)을 반환합니다. 백그라운드 생성이 아직 끝나지 않았다면 여기서 만듭니다."""
+    if not is_authenticated():
+        return Response(status_code=401)
+    thumb = generate_thumbnail(get_scan_path(master_id))
+    if thumb is None:
+        return Response(status_code=404)
+    return FileResponse(thumb, media_type='image/jpeg', headers={'Cache-Control': 'private, max-age=86400'})
+
+@app.get('/expense/draft/{token}')
+def expense_draft_preview(token: str, request: Request):
+    """작성 중인 문서의 최신 미리보기를 반환합니다."""
+    if not is_authenticated():
+        return Response(status_code=401)
+    with _drafts_lock:
+        draft = _drafts.get(token)
+    if draft is None:
+        return Response('미리보기가 만료되었습니다. 내용을 다시 입력해 주세요.', status_code=404, media_type='text/plain; charset=utf-8')
+    html, etag, last_modified = draft
+    return html_response(request, html, etag, last_modified)
@@ -1,7 +1,44 @@
 
 import datetime
 import os
-from jinja2 import Template
+import time
+from jinja2 import Environment, FileSystemLoader, FileSystemBytecodeCache, TemplateNotFound
+from config import Config
+
+TEMPLATE_DIR = os.path.join(os.path.dirname(__file__), 'templates')
+TEMPLATE_NAME = 'expense_report_template.html'
+
+# 비고 첨부 이미지 URL (preview_routes.py 의 첨부 파일 라우트와 동일한 경로)
+ATTACHMENT_URL = '/expense/attachments/{}'
+
+def _create_environment():
+    """
+    모듈 전역에서 공유하는 Jinja2 환경을 만듭니다.
+    컴파일된 템플릿은 환경 내부 캐시에 보관되며, auto_reload=True 이므로
+    템플릿 파일의 수정 시각(mtime)이 바뀐 경우에만 다시 읽어 컴파일합니다.
+    """
+    bytecode_cache = None
+    if Config.TEMPLATE_CACHE_DIR:
+        # 바이트코드를 디스크에 보관하면 앱 재시작 후 첫 렌더링의 컴파일 비용도 줄어듭니다.
+        os.makedirs(Config.TEMPLATE_CACHE_DIR, exist_ok=True)
+        bytecode_cache = FileSystemBytecodeCache(Config.TEMPLATE_CACHE_DIR)
+    return Environment(
+        loader=FileSystemLoader(TEMPLATE_DIR, encoding='utf-8'),
+        auto_reload=True,
+        cache_size=50,
+        bytecode_cache=bytecode_cache,
+    )
+
+_env = _create_environment()
+
+# 렌더링 횟수 및 누적 시간 (성능 확인용)
+render_stats = {'count': 0, 'total_ms': 0.0, 'last_ms': 0.0}
+
+def get_render_stats():
+    """렌더링 통계를 반환합니다. (평균 시간 포함)"""
+    stats = dict(render_stats)
+    stats['avg_ms'] = stats['total_ms'] / stats['count'] if stats['count'] else 0.0
+    return stats
 
 def clean(val):
     if val is None or str(val).lower() == "none" or val == "None":
@@ -12,14 +49,13 @@ def generate_print_html(master_data, details_data, auto_print=False, hide_btn=Fa
     """
     지출품의서 출력을 위한 HTML을 생성합니다 (별도 파일 템플릿 사용).
     """
-    # 1. 템플릿 파일 로드
-    template_path = os.path.join(os.path.dirname(__file__), 'templates', 'expense_report_template.html')
-    if not os.path.exists(template_path):
+    # 1. 컴파일된 템플릿 가져오기 (파일이 바뀌지 않았다면 캐시에서 바로 반환)
+    started = time.perf_counter()
+    try:
+        template = _env.get_template(TEMPLATE_NAME)
+    except TemplateNotFound:
         # 템플릿 파일이 없을 경우 대비 (안전장치)
-        return "템플릿 파일을 찾을 수 없습니다: " + template_path
-        
-    with open(template_path, 'r', encoding='utf-8') as f:
-        template_content = f.read()
+        return "템플릿 파일을 찾을 수 없습니다: " + os.path.join(TEMPLATE_DIR, TEMPLATE_NAME)
 
     # 2. 렌더링을 위한 데이터 가공
     date_str = clean(master_data.get('approval_date', ''))
@@ -66,6 +102,7 @@ def generate_print_html(master_data, details_data, auto_print=False, hide_btn=Fa
         '품의총금액': f"{total_amount_kr} ({total_amount_formatted})",
         '합계금액': total_amount_formatted,
         '문서비고': clean(master_data.get('note_text', '')),
+        '비고이미지': ATTACHMENT_URL.format(master_data['note_image_hash']) if master_data.get('note_image_hash') else '',
         '작성년도': year,
         '작성월': month,
         '작성일': day,
@@ -92,9 +129,13 @@ def generate_print_html(master_data, details_data, auto_print=False, hide_btn=Fa
             context[f'항목비고_{i}'] = ""
 
     # 3. Jinja2를 이용한 렌더링
-    template = Template(template_content)
     rendered_html = template.render(context)
 
+    elapsed_ms = (time.perf_counter() - started) * 1000
+    render_stats['count'] += 1
+    render_stats['total_ms'] += elapsed_ms
+    render_stats['last_ms'] = elapsed_ms
+
     # 4. 자동 인쇄 스크립트 추가
     if auto_print:
         print_script = "<script>window.onload = function() { window.print(); };</script>"
@@ -3,15 +3,18 @@ dashboard_page.py - 메인 대시보드 화면
 """
 from nicegui import ui
 from core.ui_components import page_title, stat_card, card_container
+from core.summary_repo import get_dashboard_stats
 
 def render_page():
     """기본 대시보드 화면을 렌더링합니다."""
     page_title('비즈니스 대시보드', icon='analytics')
     
+    # 집계 테이블(stat_counters)에서 기본키 조회로 읽으므로 데이터가 많아져도 비용이 일정합니다.
+    stats = get_dashboard_stats()
     with ui.row().classes('w-full gap-6'):
-        stat_card('전체 강사 수', '12명', color='blue', icon='group')
-        stat_card('이번 달 강의', '24건', color='green', icon='event')
-        stat_card('미지급 및 처리 대기', '5건', color='orange', icon='pending_actions')
+        stat_card('전체 강사 수', f"{stats['instructors']:,}명", color='blue', icon='group')
+        stat_card('이번 달 강의', f"{stats['lectures_this_month']:,}건", color='green', icon='event')
+        stat_card('미지급 및 처리 대기', f"{stats['pending_payments']:,}건", color='orange', icon='pending_actions')
 
     with card_container().classes('w-full mt-8'):
         with ui.row().classes('items-center gap-2 mb-2'):
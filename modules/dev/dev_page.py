@@ -8,39 +8,13 @@ import pandas as pd
 from datetime import datetime
 from core.db_manager import db
 
-# 데이터베이스 테이블 초기화 (테이블이 없으면 생성)
-def init_dev_table():
-    db.execute("""
-        CREATE TABLE IF NOT EXISTS dev_tasks (
-            id INTEGER PRIMARY KEY AUTOINCREMENT,
-            category TEXT,
-            title TEXT,
-            content TEXT,
-            status TEXT DEFAULT '대기중',
-            priority TEXT DEFAULT '보통',
-            created_at TEXT
-        )
-    """)
-
 def render_dev_page():
-    """개발 관리 페이지를 렌더링합니다."""
-    init_dev_table()
-    
+    """개발 관리 페이지를 렌더링합니다. (dev_tasks 테이블은 core/migrations.py 에서 생성)"""
     ui.label('🛠️ 개발 및 시스템 관리').classes('text-3xl font-bold mb-4')
     
     # --- 데이터 로딩 및 요약 ---
-    def get_tasks():
-        return db.get_df('dev_tasks')
-
-    def refresh_ui():
-        df = get_tasks()
-        # 요약 카드 업데이트
-        todo_count.set_text(str(len(df[df['status'] != '완료'])))
-        bug_count.set_text(str(len(df[df['category'] == '에러 보고'])))
-        feature_count.set_text(str(len(df[df['category'] == '기능 추가'])))
-        # 리스트 업데이트
-        grid.options['rowData'] = df.to_dict('records')
-        grid.update()
+    async def get_tasks():
+        return await db.aget_df('dev_tasks')
 
     with ui.row().classes('w-full gap-4 mb-6'):
         with ui.card().classes('flex-1 p-4 bg-orange-50'):
@@ -73,11 +47,11 @@ def render_dev_page():
             datetime.now().strftime('%Y-%m-%d %H:%M')
         )
         
-        if db.execute(query, params):
+        if await db.aexecute(query, params) != -1:
             ui.notify('새로운 작업이 등록되었습니다!', type='positive')
             title_input.value = ''
             content_input.value = ''
-            refresh_ui()
+            await refresh_ui()
         else:
             ui.notify('저장 중 오류가 발생했습니다.', type='negative')
 
@@ -123,22 +97,22 @@ def render_dev_page():
         </q-td>
     """)
 
-    def update_status(row):
+    async def update_status(row):
         new_status = '진행중' if row['status'] == '대기중' else ('완료' if row['status'] == '진행중' else '대기중')
-        db.execute("UPDATE dev_tasks SET status = ? WHERE id = ?", (new_status, row['id']))
+        await db.aexecute("UPDATE dev_tasks SET status = ? WHERE id = ?", (new_status, row['id']))
         ui.notify(f'상태가 [{new_status}]로 변경되었습니다.')
-        refresh_ui()
+        await refresh_ui()
 
-    def delete_row(row):
-        db.execute("DELETE FROM dev_tasks WHERE id = ?", (row['id'],))
+    async def delete_row(row):
+        await db.aexecute("DELETE FROM dev_tasks WHERE id = ?", (row['id'],))
         ui.notify('항목이 삭제되었습니다.')
-        refresh_ui()
+        await refresh_ui()
 
     table.on('status_click', lambda msg: update_status(msg.args))
     table.on('delete_click', lambda msg: delete_row(msg.args))
 
-    def refresh_ui():
-        df = get_tasks()
+    async def refresh_ui():
+        df = await get_tasks()
         # 요약 카드 업데이트 (todo_count 등이 페이지 렌더링 시점에 정의되어 있어야 함)
         todo_count.set_text(str(len(df[df['status'] != '완료'])))
         bug_count.set_text(str(len(df[df['category'] == '에러 보고'])))
@@ -4,9 +4,12 @@ instructor_page.py - 강사/강의/지급 통합 관리 시스템
 """
 
 from nicegui import ui
-import pandas as pd
 from datetime import datetime
 from core.db_manager import db
+from modules.instructor_group.instructor.instructor_repo import (
+    INSTRUCTOR_PAGE_SIZE, PAYMENT_STATUSES, get_instructor_lectures, next_payment_status, search_instructors,
+    set_payment_status, set_payment_statuses,
+)
 import os
 
 def render_instructor_page():
@@ -21,21 +24,35 @@ def render_instructor_page():
             
             columns = [
                 {'name': '이름', 'label': '이름', 'field': '이름', 'align': 'left', 'sortable': True},
-                {'name': '전화번호', 'label': '연락처', 'field': '전화번호', 'align': 'left'},
+                {'name': '전화번호', 'label': '연락처', 'field': '전화번호', 'align': 'left', 'sortable': True},
             ]
-            
-            # 강사 데이터 로드
-            df_ins = db.get_df('instructors')
-            rows = df_ins.to_dict('records') if not df_ins.empty else []
-            
+
+            search = ui.input('이름 또는 연락처 검색', on_change=lambda: load_page({'page': 1})).classes('w-full').props('dense outlined clearable debounce=300')
+
+            # 강사 데이터는 화면에 보이는 한 페이지만 로드합니다. (정렬/검색/페이지 이동은 서버에서 처리)
+            # rowsNumber 를 지정하면 Quasar 테이블이 페이지를 바꿀 때마다 'request' 이벤트를 보냅니다.
+            rows, total = search_instructors()
+            pagination = {'page': 1, 'rowsPerPage': INSTRUCTOR_PAGE_SIZE, 'sortBy': '이름', 'descending': False, 'rowsNumber': total}
+
             # 테이블 클릭 시 호출될 함수
-            def on_row_click(e):
+            async def on_row_click(e):
                 row = e.args[1]
-                render_details(row['id'], row['이름'])
+                await render_details(row['id'], row['이름'])
 
             table_ins = ui.table(
-                columns=columns, rows=rows, row_key='id', pagination=15
+                columns=columns, rows=rows, row_key='id', pagination=pagination
             ).classes('w-full mt-2 cursor-pointer')
+            table_ins.props(':rows-per-page-options="[15, 30, 50]"')
+
+            async def load_page(new_pagination):
+                """요청된 페이지/정렬로 강사 목록을 다시 조회합니다."""
+                p = dict(table_ins.pagination, **new_pagination)
+                rows, total = await db.arun(search_instructors, search.value, p.get('page'), p.get('rowsPerPage'),
+                                            p.get('sortBy'), p.get('descending'))
+                table_ins.rows = rows
+                table_ins.pagination = dict(p, rowsNumber=total)
+
+            table_ins.on('request', lambda e: load_page(e.args['pagination']), ['pagination'])
             
             # Quasar의 row-click 이벤트 연결
             table_ins.on('row-click', on_row_click)
@@ -47,8 +64,11 @@ def render_instructor_page():
         with details_area:
             ui.label('강사 목록에서 한 명을 클릭해 주세요.').classes('text-gray-400 mt-20 text-center w-full')
 
-    def render_details(ins_id, ins_name):
+    async def render_details(ins_id, ins_name):
         """선택된 강사의 상세 내용을 우측 영역에 수동으로 렌더링합니다."""
+        # 해당 강사의 강의와 현재 지급 상태만 DB 스레드 풀에서 한 번에 조회한 뒤 화면을 다시 그립니다.
+        lectures = await db.arun(get_instructor_lectures, ins_id)
+
         details_area.clear()
         with details_area:
             # A. 강의 내역 카드
@@ -57,11 +77,6 @@ def render_instructor_page():
                     ui.label(f'📅 [{ins_name}] 강사님 강의 내역').classes('text-xl font-bold text-primary')
                     ui.button('새 강의 등록', icon='add', on_click=lambda: open_add_dialog(ins_id, ins_name)).classes('bg-primary text-white')
 
-                # 강의 데이터 필터링 조회
-                df_lec = db.get_df('lectures')
-                if not df_lec.empty and 'instructor_id' in df_lec.columns:
-                    df_lec = df_lec[df_lec['instructor_id'] == ins_id]
-                
                 lec_columns = [
                     {'name': 'lecture_date', 'label': '날짜', 'field': 'lecture_date', 'width': 120},
                     {'name': 'title', 'label': '강의명', 'field': 'title', 'align': 'left'},
@@ -70,18 +85,9 @@ def render_instructor_page():
                     {'name': 'actions', 'label': '관리', 'field': 'id'},
                 ]
 
-                # 지급 정보 병합
-                lec_rows = []
-                if not df_lec.empty:
-                    df_pay = db.get_df('payments')
-                    for _, lec in df_lec.iterrows():
-                        row = lec.to_dict()
-                        p = df_pay[df_pay['lecture_id'] == lec['id']] if not df_pay.empty else pd.DataFrame()
-                        row['status'] = p.iloc[0]['status'] if not p.empty else '대기'
-                        row['total_fee'] = f"{int(lec['total_fee'] or 0):,}원"
-                        lec_rows.append(row)
-
-                lec_table = ui.table(columns=lec_columns, rows=lec_rows, row_key='id').classes('w-full')
+                lec_rows = [dict(lec, total_fee=f"{int(lec['total_fee'] or 0):,}원") for lec in lectures]
+
+                lec_table = ui.table(columns=lec_columns, rows=lec_rows, row_key='id', selection='multiple').classes('w-full')
                 
                 # 상태 변경 칩
                 lec_table.add_slot('body-cell-status', """
@@ -93,15 +99,40 @@ def render_instructor_page():
                     </q-td>
                 """)
 
-                def update_pay(row):
-                    new_s = '지급중' if row['status'] == '대기' else ('완료' if row['status'] == '지급중' else '대기')
-                    db.execute("INSERT OR REPLACE INTO payments (lecture_id, status, updated_at) VALUES (?, ?, ?)",
-                               (row['id'], new_s, datetime.now().strftime('%Y-%m-%d %H:%M')))
+                def apply_status(lecture_ids, status):
+                    """바뀐 강의 행의 상태만 화면 표에 반영합니다. (강의 목록을 다시 조회하지 않음)"""
+                    changed = set(lecture_ids)
+                    for r in lec_table.rows:
+                        if r['id'] in changed:
+                            r['status'] = status
+                    lec_table.selected = []
+                    lec_table.update()
+
+                async def update_pay(row):
+                    new_s = next_payment_status(row['status'])
+                    await db.arun(set_payment_status, row['id'], new_s)
+                    apply_status([row['id']], new_s)
                     ui.notify(f'[{new_s}] 상태로 변경됨')
-                    render_details(ins_id, ins_name)
+
+                async def update_selected(status):
+                    if not lec_table.selected:
+                        ui.notify('상태를 바꿀 강의를 먼저 선택해 주세요.', type='warning')
+                        return
+                    ids = await db.arun(set_payment_statuses, [r['id'] for r in lec_table.selected], status)
+                    apply_status(ids, status)
+                    if not ids:
+                        ui.notify(f'선택한 강의가 모두 이미 [{status}] 상태입니다.', type='info')
+                        return
+                    ui.notify(f'{len(ids)}건을 [{status}] 상태로 변경했습니다.', type='positive')
 
                 lec_table.on('status_click', lambda msg: update_pay(msg.args))
 
+                # 선택한 강의를 한 번에 처리 (월말 일괄 지급)
+                with ui.row().classes('w-full justify-end items-center gap-2 mt-2'):
+                    ui.label('선택 항목 일괄 변경:').classes('text-sm text-gray-500')
+                    for status in PAYMENT_STATUSES:
+                        ui.button(status, on_click=lambda s=status: update_selected(s)).props('outline dense')
+
     def open_add_dialog(ins_id, ins_name):
         """강의 추가용 다이얼로그를 생성하고 엽니다."""
         with ui.dialog() as dialog, ui.card().classes('p-6 w-[400px]'):
@@ -112,11 +143,11 @@ def render_instructor_page():
             
             async def save():
                 if not ti.value: return
-                db.execute("INSERT INTO lectures (instructor_id, title, lecture_date, total_fee) VALUES (?, ?, ?, ?)",
-                           (ins_id, ti.value, dt.value, int(fe.value)))
+                await db.aexecute("INSERT INTO lectures (instructor_id, title, lecture_date, total_fee) VALUES (?, ?, ?, ?)",
+                                  (ins_id, ti.value, dt.value, int(fe.value)))
                 ui.notify('등록되었습니다.')
                 dialog.close()
-                render_details(ins_id, ins_name)
+                await render_details(ins_id, ins_name)
 
             with ui.row().classes('w-full justify-end mt-4'):
                 ui.button('취소', on_click=dialog.close).props('flat')
@@ -0,0 +1,96 @@
+"""
+instructor_repo.py - 강사/강의/지급 데이터베이스 처리 계층 (Repository)
+화면에서 테이블 전체를 읽어 pandas 로 거르지 않고, 필요한 행만 인덱스로 조회합니다.
+"""
+
+import json
+from datetime import datetime
+from core.db_manager import db
+
+# 강사 목록 한 페이지의 행 수
+INSTRUCTOR_PAGE_SIZE = 15
+# 목록 정렬에 허용하는 컬럼 (화면에서 받은 정렬 키를 그대로 SQL 에 넣지 않도록 여기서만 매핑)
+INSTRUCTOR_SORT_COLUMNS = {'이름': '"이름"', '전화번호': '"전화번호"'}
+
+def _build_instructor_filter(keyword):
+    """검색어가 숫자(와 '-')뿐이면 연락처 부분 일치, 아니면 이름 앞글자 일치(인덱스 범위 조건)로 거릅니다."""
+    keyword = (keyword or '').strip()
+    if not keyword:
+        return '', ()
+    digits = keyword.replace('-', '')
+    if digits.isdigit():
+        return " WHERE replace(\"전화번호\", '-', '') LIKE ?", (f'%{digits}%',)
+    return ' WHERE "이름" >= ? AND "이름" < ?', (keyword, keyword + '\uffff')
+
+def search_instructors(keyword='', page=1, rows_per_page=INSTRUCTOR_PAGE_SIZE, sort_by='이름', descending=False):
+    """
+    강사 목록의 한 페이지와 전체 일치 건수를 반환합니다. (정렬/페이지 나눔은 DB 에서 처리)
+    화면에 표시하는 id, 이름, 연락처만 조회하며 주민번호/계좌번호 등 개인정보 컬럼은 읽지 않습니다.
+    반환값: (행 리스트, 전체 일치 건수)
+    """
+    clause, params = _build_instructor_filter(keyword)
+    order = INSTRUCTOR_SORT_COLUMNS.get(sort_by, '"이름"')
+    direction = 'DESC' if descending else 'ASC'
+    page, rows_per_page = max(int(page or 1), 1), max(int(rows_per_page or INSTRUCTOR_PAGE_SIZE), 1)
+    rows = db.fetch_all(
+        f'SELECT id, "이름", "전화번호" FROM instructors{clause} ORDER BY {order} {direction}, id {direction} LIMIT ? OFFSET ?',
+        params + (rows_per_page, (page - 1) * rows_per_page)
+    )
+    count = db.fetch_all(f"SELECT COUNT(*) AS cnt FROM instructors{clause}", params)
+    return rows, (count[0]['cnt'] if count else 0)
+
+def get_instructor_lectures(instructor_id):
+    """
+    강사 1명의 강의 목록을 현재 지급 상태와 함께 최신 강의부터 반환합니다.
+    lectures(instructor_id, lecture_date) 인덱스와 payments(lecture_id) 고유 인덱스를 쓰는 LEFT JOIN 한 번으로 조회하므로
+    전체 강의/지급 건수와 관계없이 해당 강사의 강의 수만큼만 읽습니다.
+    """
+    return db.fetch_all("""
+        SELECT l.id, l.lecture_date, l.title, l.total_fee, COALESCE(p.status, '대기') AS status
+        FROM lectures l
+        LEFT JOIN payments p ON p.lecture_id = l.id
+        WHERE l.instructor_id = ?
+        ORDER BY l.lecture_date DESC, l.id DESC
+    """, (instructor_id,))
+
+# 지급 상태 순서 (칩을 누를 때마다 다음 상태로 바뀜)
+PAYMENT_STATUSES = ('대기', '지급중', '완료')
+
+def next_payment_status(status):
+    return PAYMENT_STATUSES[(PAYMENT_STATUSES.index(status) + 1) % len(PAYMENT_STATUSES)] if status in PAYMENT_STATUSES else PAYMENT_STATUSES[0]
+
+# 같은 상태로 다시 저장하면 행을 건드리지 않으므로 이력도 남지 않습니다.
+_UPSERT_PAYMENT_SQL = """
+    INSERT INTO payments (lecture_id, status, updated_at) VALUES (?, ?, ?)
+    ON CONFLICT(lecture_id) DO UPDATE SET status = excluded.status, updated_at = excluded.updated_at
+    WHERE payments.status IS NOT excluded.status
+"""
+
+# 요청한 강의 중 실제로 있는 강의의 현재 지급 상태 (payments 행이 없으면 '대기')
+_CURRENT_PAYMENT_SQL = """
+    SELECT l.id AS id, coalesce(p.status, '대기') AS status
+    FROM lectures l
+    LEFT JOIN payments p ON p.lecture_id = l.id
+    WHERE l.id IN (SELECT value FROM json_each(?))
+"""
+
+def set_payment_statuses(lecture_ids, status):
+    """
+    여러 강의의 지급 상태를 한 트랜잭션 안에서 executemany UPSERT 로 한 번에 바꿉니다. (월말 일괄 지급 처리)
+    payments 는 강의당 1행(lecture_id UNIQUE)이며, 상태 변경 이력은 트리거가 payment_history 에 추가합니다.
+    이미 같은 상태인 강의와 없는 강의는 건너뜁니다.
+    반환값: 상태가 실제로 바뀐 강의 id 리스트
+    """
+    if status not in PAYMENT_STATUSES:
+        raise ValueError(f"알 수 없는 지급 상태입니다: {status}")
+    lecture_ids = list(dict.fromkeys(lecture_ids))
+    now = datetime.now().strftime('%Y-%m-%d %H:%M')
+    with db.transaction() as conn:
+        current = dict(conn.execute(_CURRENT_PAYMENT_SQL, (json.dumps(lecture_ids),)).fetchall())
+        changed = [lecture_id for lecture_id in lecture_ids if lecture_id in current and current[lecture_id] != status]
+        conn.executemany(_UPSERT_PAYMENT_SQL, [(lecture_id, status, now) for lecture_id in changed])
+    return changed
+
+def set_payment_status(lecture_id, status):
+    """강의 1건의 지급 상태를 바꿉니다."""
+    return set_payment_statuses([lecture_id], status)
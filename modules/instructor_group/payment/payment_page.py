@@ -1,8 +1,87 @@
 """
-payment_page.py - 자동 생성된 모듈
+payment_page.py - 강사료 지급 확인
+월을 고르면 해당 월 강의를 강사별로 합산해 원천징수세액(3.3%)과 실지급액을 보여주고,
+은행 대량이체 등록용 파일을 내려받습니다.
 """
-from nicegui import ui
 
-def render_page():
-    ui.label("payment 페이지가 생성되었습니다.").classes("text-2xl font-bold")
-    ui.notify("코드를 수정하여 기능을 완성해 주세요.")
+from nicegui import run, ui
+from core.summary_repo import current_period
+from modules.instructor_group.payment.payroll import PAYROLL_COLUMNS, compute_payroll, get_payroll_periods, missing_account_names, payroll_totals, transfer_csv, transfer_lines
+
+# 금액 컬럼 (천 단위 구분 + '원')
+MONEY_COLUMNS = ('gross', 'income_tax', 'local_tax', 'withholding', 'net')
+
+def mask_account(account: str) -> str:
+    """화면 표시용 계좌번호 (끝 4자리만 표시, 전체 번호는 이체 파일에만 포함)"""
+    account = account or ''
+    return ('*' * max(len(account) - 4, 0)) + account[-4:]
+
+def render_payment_page():
+    """강사료 월별 지급 확인 페이지를 렌더링합니다."""
+    periods = get_payroll_periods()
+    state = {'period': periods[0] if periods else current_period(), 'payroll': None}
+
+    ui.label('💸 강사료 지급 확인').classes('text-3xl font-bold mb-6')
+
+    @ui.refreshable
+    def render_summary():
+        payroll = state['payroll']
+        totals = payroll_totals(payroll) if payroll is not None else {'instructors': 0, 'lectures': 0, 'gross': 0, 'withholding': 0, 'net': 0}
+        with ui.row().classes('w-full gap-6'):
+            for title, value, color in [
+                ('지급 대상', f"{totals['instructors']:,}명 / 강의 {totals['lectures']:,}건", 'border-gray-500'),
+                ('지급액 합계', f"{totals['gross']:,}원", 'border-blue-500'),
+                ('원천징수 합계', f"{totals['withholding']:,}원", 'border-red-500'),
+                ('실지급액 합계', f"{totals['net']:,}원", 'border-green-500'),
+            ]:
+                with ui.card().classes(f'flex-1 p-4 border-l-8 {color} shadow'):
+                    ui.label(title).classes('text-sm text-gray-500')
+                    ui.label(value).classes('text-2xl font-bold')
+
+    async def refresh():
+        # 해당 월 강의를 한 번에 읽어 강사별로 계산합니다. (DB 조회와 계산은 작업 스레드에서)
+        payroll = await run.io_bound(compute_payroll, state['period'])
+        if payroll is None:  # 앱 종료 중
+            return
+        state['payroll'] = payroll
+        rows = []
+        for row in payroll.to_dict('records'):
+            display = {c: row[c] for c, _ in PAYROLL_COLUMNS}
+            display.update({c: f"{int(row[c]):,}원" for c in MONEY_COLUMNS})
+            display['name'] = row['name'] or '(미등록 강사)'
+            display['account'] = mask_account(row['account'])
+            display['instructor_id'] = row['instructor_id']
+            rows.append(display)
+        payroll_table.rows = rows
+        render_summary.refresh()
+
+    def download_transfer():
+        payroll = state['payroll']
+        if payroll is None or payroll.empty:
+            ui.notify('해당 월에 지급할 강사료가 없습니다.', type='warning')
+            return
+        missing = missing_account_names(payroll)
+        if not transfer_lines(payroll, state['period']):
+            if missing:
+                ui.notify(f"은행/계좌번호가 등록된 지급 대상 강사가 없어 이체 파일을 만들 수 없습니다: {', '.join(missing)}", type='negative', multi_line=True)
+            else:
+                ui.notify('해당 월에 지급할 강사료가 없습니다.', type='warning')
+            return
+        if missing:
+            ui.notify(f"은행/계좌번호가 없는 강사는 이체 파일에서 제외했습니다: {', '.join(missing)}", type='warning', multi_line=True)
+        ui.download(transfer_csv(payroll, state['period']), f"강사료_이체_{state['period']}.csv", 'text/csv')
+
+    with ui.row().classes('w-full items-center gap-4 mb-4'):
+        ui.select(periods or [state['period']], label='지급 월', on_change=refresh) \
+            .bind_value(state, 'period').classes('w-40').props('dense outlined')
+        ui.button('이체 파일 내려받기', icon='download', on_click=download_transfer).props('outline')
+
+    render_summary()
+
+    columns = [
+        {'name': c, 'label': label, 'field': c, 'align': 'left' if c in ('name', 'bank', 'account') else 'right'}
+        for c, label in PAYROLL_COLUMNS
+    ]
+    payroll_table = ui.table(columns=columns, rows=[], row_key='instructor_id').classes('w-full mt-6').props('dense flat')
+
+    ui.timer(0.1, refresh, once=True)
@@ -0,0 +1,134 @@
+"""
+payroll.py - 강사료 월별 지급 계산 계층
+해당 월의 강의를 강사 계좌 정보, 지급 상태와 함께 쿼리 한 번으로 읽어 열 지향 DataFrame 으로 만들고,
+강사별 합계/원천징수세액/실지급액을 벡터화된 groupby 와 열 연산으로 한 번에 계산합니다. (강사별 반복 조회 없음)
+
+원천징수 (사업소득 3.3%)
+- 소득세: 월 지급액 x PAYROLL_INCOME_TAX_RATE, 10원 미만 절사. 1,000원 미만이면 징수하지 않습니다. (소액부징수)
+- 지방소득세: 소득세 x PAYROLL_LOCAL_TAX_RATE, 10원 미만 절사
+"""
+
+import csv
+import io
+import numpy as np
+import pandas as pd
+from config import Config
+from core.db_manager import db
+
+# 소득세가 이 금액 미만이면 원천징수하지 않습니다.
+MIN_WITHHOLDING_TAX = 1000
+
+# 강의 1건 = 1행. 기간 조건은 lectures(lecture_date) 인덱스 범위로 읽습니다.
+PAYROLL_SQL = """
+    SELECT l.instructor_id AS instructor_id,
+           coalesce(i."이름", '') AS name,
+           coalesce(i."계좌은행", '') AS bank,
+           coalesce(i."계좌번호", '') AS account,
+           coalesce(l.total_fee, 0) AS fee,
+           coalesce(p.status, '대기') AS status
+    FROM lectures l
+    LEFT JOIN instructors i ON i.id = l.instructor_id
+    LEFT JOIN payments p ON p.lecture_id = l.id
+    WHERE l.lecture_date >= ? AND l.lecture_date < ?
+"""
+
+# 계산 결과 컬럼 (컬럼, 머리글)
+PAYROLL_COLUMNS = [
+    ('name', '강사'),
+    ('lectures', '강의 수'),
+    ('paid_lectures', '지급 완료'),
+    ('gross', '지급액'),
+    ('income_tax', '소득세'),
+    ('local_tax', '지방소득세'),
+    ('withholding', '원천징수 합계'),
+    ('net', '실지급액'),
+    ('bank', '은행'),
+    ('account', '계좌번호'),
+]
+
+def next_period(period: str) -> str:
+    """다음 달 기간 키 (예: 2024-12 -> 2025-01)"""
+    year, month = map(int, period.split('-'))
+    return f"{year + month // 12:04d}-{month % 12 + 1:02d}"
+
+def get_payroll_periods():
+    """강의가 있는 월 목록을 최신 월부터 반환합니다. (강의 트리거가 갱신하는 월별 카운터에서 조회)"""
+    rows = db.fetch_all(
+        "SELECT period FROM stat_counters WHERE name = 'lectures_month' AND period != '' AND value > 0 ORDER BY period DESC"
+    )
+    return [r['period'] for r in rows]
+
+def load_lecture_fees(period: str) -> pd.DataFrame:
+    """해당 월(YYYY-MM)의 강의별 강의료/강사 계좌/지급 상태를 DataFrame 으로 읽습니다."""
+    rows = db.get_connection().execute(PAYROLL_SQL, (period, next_period(period))).fetchall()
+    df = pd.DataFrame.from_records(rows, columns=['instructor_id', 'name', 'bank', 'account', 'fee', 'status'])
+    df['fee'] = pd.to_numeric(df['fee'], errors='coerce').fillna(0).astype('int64')
+    return df
+
+def _truncate_won(values: pd.Series) -> pd.Series:
+    """10원 미만 절사 (부동소수 오차로 한 단위 아래로 내려가지 않도록 먼저 반올림)"""
+    return (np.floor(values.round(6) / 10) * 10).astype('int64')
+
+def compute_payroll(period: str, income_tax_rate: float = None, local_tax_rate: float = None) -> pd.DataFrame:
+    """
+    해당 월의 강사별 지급액, 원천징수세액, 실지급액을 계산합니다.
+    강사가 지정되지 않은 강의(instructor_id 가 NULL)는 지급 대상이 아니므로 합산하지 않습니다.
+    반환: PAYROLL_COLUMNS 컬럼과 instructor_id 를 가진 DataFrame (강사 1명 = 1행, 이름순)
+    """
+    income_tax_rate = Config.PAYROLL_INCOME_TAX_RATE if income_tax_rate is None else income_tax_rate
+    local_tax_rate = Config.PAYROLL_LOCAL_TAX_RATE if local_tax_rate is None else local_tax_rate
+
+    df = load_lecture_fees(period)
+    df['paid'] = (df['status'] == '완료').astype('int64')
+    payroll = df.groupby('instructor_id', sort=False, dropna=True).agg(
+        name=('name', 'first'),
+        bank=('bank', 'first'),
+        account=('account', 'first'),
+        lectures=('fee', 'size'),
+        paid_lectures=('paid', 'sum'),
+        gross=('fee', 'sum'),
+    )
+    income_tax = _truncate_won(payroll['gross'] * income_tax_rate)
+    payroll['income_tax'] = income_tax.where(income_tax >= MIN_WITHHOLDING_TAX, 0)
+    payroll['local_tax'] = _truncate_won(payroll['income_tax'] * local_tax_rate)
+    payroll['withholding'] = payroll['income_tax'] + payroll['local_tax']
+    payroll['net'] = payroll['gross'] - payroll['withholding']
+    payroll = payroll.reset_index().sort_values(['name', 'instructor_id'], ignore_index=True)
+    return payroll[['instructor_id'] + [c for c, _ in PAYROLL_COLUMNS]]
+
+def payroll_totals(payroll: pd.DataFrame) -> dict:
+    """화면 요약 카드용 합계"""
+    sums = payroll[['lectures', 'gross', 'withholding', 'net']].sum()
+    return {'instructors': len(payroll), **{k: int(v) for k, v in sums.items()}}
+
+# 이체 파일 머리글 (은행 대량이체 양식 기준)
+TRANSFER_HEADER = ['입금은행', '입금계좌번호', '예금주', '이체금액', '받는분 통장 표시']
+
+def _payable(payroll: pd.DataFrame, has_account: bool) -> pd.DataFrame:
+    """실지급액이 있는 강사 중 은행과 계좌번호가 모두 있는(has_account=True) 또는 하나라도 없는 행"""
+    account_ok = (payroll['bank'].str.strip() != '') & (payroll['account'].str.strip() != '')
+    return payroll[(payroll['net'] > 0) & (account_ok == has_account)]
+
+def transfer_lines(payroll: pd.DataFrame, period: str):
+    """
+    실지급액이 있는 강사별 이체 행 목록을 반환합니다. (은행, 계좌번호, 예금주, 금액, 통장 표시)
+    은행이나 계좌번호가 비어 있는 강사는 이체 파일에 넣지 않습니다. (missing_account_names 로 따로 확인)
+    """
+    memo = f"{int(period[5:7])}월 강사료"
+    payable = _payable(payroll, has_account=True)
+    return [
+        [bank, account, name, int(net), memo]
+        for bank, account, name, net in payable[['bank', 'account', 'name', 'net']].itertuples(index=False)
+    ]
+
+def missing_account_names(payroll: pd.DataFrame):
+    """실지급액이 있지만 은행이나 계좌번호가 없어 이체 파일에서 빠지는 강사 이름 목록"""
+    return [name or instructor_id for instructor_id, name in _payable(payroll, has_account=False)[['instructor_id', 'name']].itertuples(index=False)]
+
+def transfer_csv(payroll: pd.DataFrame, period: str) -> bytes:
+    """대량이체 등록용 CSV (엑셀에서 한글이 깨지지 않도록 BOM 포함)"""
+    buf = io.StringIO()
+    writer = csv.writer(buf)
+    writer.writerow(TRANSFER_HEADER)
+    writer.writerows(transfer_lines(payroll, period))
+    return buf.getvalue().encode('utf-8-sig')
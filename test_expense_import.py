@@ -0,0 +1,63 @@
+"""
+오류 행을 고쳐 같은 파일을 다시 가져올 때 이미 등록된 지출결의서가 중복 등록되지 않는지 점검합니다.
+임시 DB 파일에 스키마를 만들고 오류 행이 있는 CSV 를 가져온 뒤, 오류를 고친 CSV 를 다시 가져와 결의서 수를 비교합니다.
+(문서번호가 있는 파일과 없는 파일을 모두 확인)
+
+실행: python test_expense_import.py
+"""
+
+import os
+import sys
+import tempfile
+
+tmp_dir = tempfile.mkdtemp(prefix='gsc_test_')
+os.environ['DATABASE_PATH'] = os.path.join(tmp_dir, 'test.db')
+
+from core.db_manager import db
+from modules.accounting_group.expense.importer import import_file
+
+def check(label, actual, expected):
+    ok = actual == expected
+    print(f"{'✅' if ok else '❌'} {label}: {actual} (기대값 {expected})")
+    return ok
+
+def write_csv(name, lines):
+    path = os.path.join(tmp_dir, name)
+    with open(path, 'w', encoding='utf-8-sig', newline='') as f:
+        f.write('\n'.join(lines) + '\n')
+    return path
+
+def report_count():
+    return db.fetch_all("SELECT COUNT(*) AS cnt FROM expense_masters")[0]['cnt']
+
+results = []
+
+# 1) 문서번호가 있는 파일: 두 번째 결의서의 금액이 잘못됨
+header = '문서번호,결재일자,품의제목,기안자,적요,금액'
+broken = write_csv('doc_broken.csv', [header, 'A-1,2024-03-05,토너 구매,홍길동,토너,10000', 'A-2,2024-03-06,출장비,김철수,교통비,삼만원'])
+fixed = write_csv('doc_fixed.csv', [header, 'A-1,2024-03-05,토너 구매,홍길동,토너,10000', 'A-2,2024-03-06,출장비,김철수,교통비,30000'])
+result = import_file(broken)
+results.append(check("문서번호 파일 첫 가져오기 등록/오류", (result.reports, result.failed), (1, 1)))
+result = import_file(fixed)
+results.append(check("고친 파일 다시 가져오기 등록/건너뜀", (result.reports, result.skipped), (1, 1)))
+results.append(check("문서번호 파일 결의서 수", report_count(), 2))
+
+# 2) 문서번호가 없는 파일: 앞에 행이 추가되어 행 번호가 바뀌어도 같은 결의서는 건너뜀
+header = '결재일자,품의제목,기안자,적요,금액'
+before = report_count()
+broken = write_csv('plain_broken.csv', [header, '2024-04-01,사무용품,이영희,볼펜,5000', '2024-04-02,간식,박민수,과자,abc'])
+fixed = write_csv('plain_fixed.csv', [header, '2024-04-03,우편료,이영희,등기,4000', '2024-04-01,사무용품,이영희,볼펜,5000', '2024-04-02,간식,박민수,과자,7000'])
+result = import_file(broken)
+results.append(check("내용 해시 파일 첫 가져오기 등록/오류", (result.reports, result.failed), (1, 1)))
+result = import_file(fixed)
+results.append(check("고친 파일 다시 가져오기 등록/건너뜀", (result.reports, result.skipped), (2, 1)))
+results.append(check("내용 해시 파일 결의서 수", report_count() - before, 3))
+
+# 3) 같은 파일을 한 번 더 가져오면 아무것도 등록되지 않음
+result = import_file(fixed)
+results.append(check("같은 파일 재가져오기 등록/건너뜀", (result.reports, result.skipped), (0, 3)))
+
+db.close_all()
+if not all(results):
+    sys.exit(1)
+print("\n지출결의서 가져오기 중복 점검 완료.")
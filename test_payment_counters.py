@@ -0,0 +1,58 @@
+"""
+지급 상태 변경(상태 칩 클릭)이 대시보드 카운터(stat_counters)를 올바르게 갱신하는지 점검합니다.
+임시 DB 파일에 스키마를 만들고 강의 2건의 상태를 바꾼 뒤, payments_done 값과 실제 '완료' 건수를 비교합니다.
+
+실행: python test_payment_counters.py
+"""
+
+import os
+import sys
+import tempfile
+
+tmp_dir = tempfile.mkdtemp(prefix='gsc_test_')
+os.environ['DATABASE_PATH'] = os.path.join(tmp_dir, 'test.db')
+
+from core.db_manager import db
+from core.summary_repo import get_counter, get_dashboard_stats
+from modules.instructor_group.instructor.instructor_repo import next_payment_status, set_payment_status, set_payment_statuses
+
+def check(label, actual, expected):
+    ok = actual == expected
+    print(f"{'✅' if ok else '❌'} {label}: {actual} (기대값 {expected})")
+    return ok
+
+def done_count():
+    return db.fetch_all("SELECT COUNT(*) AS cnt FROM payments WHERE status = '완료'")[0]['cnt']
+
+def click(lecture_id):
+    """강사 화면의 상태 칩 클릭과 같은 동작 (대기 -> 지급중 -> 완료 -> 대기)"""
+    rows = db.fetch_all("SELECT status FROM payments WHERE lecture_id = ?", (lecture_id,))
+    set_payment_status(lecture_id, next_payment_status(rows[0]['status'] if rows else '대기'))
+
+results = []
+db.execute("INSERT INTO instructors (id, \"이름\") VALUES ('INS_TEST', '테스트강사')")
+for title in ('강의A', '강의B'):
+    db.execute("INSERT INTO lectures (instructor_id, title, lecture_date, total_fee) VALUES ('INS_TEST', ?, '2026-01-10', 100000)", (title,))
+lecture_ids = [r['id'] for r in db.fetch_all("SELECT id FROM lectures ORDER BY id")]
+
+# 두 강의를 모두 '완료'까지 클릭 (대기 -> 지급중 -> 완료)
+for lecture_id in lecture_ids:
+    click(lecture_id)
+    click(lecture_id)
+results.append(check("완료 2건 후 payments_done", get_counter('payments_done'), done_count()))
+results.append(check("완료 2건 후 처리 대기", get_dashboard_stats()['pending_payments'], 0))
+
+# 한 번 더 클릭하면 '대기'로 돌아감
+click(lecture_ids[0])
+results.append(check("1건 되돌린 후 payments_done", get_counter('payments_done'), done_count()))
+results.append(check("1건 되돌린 후 처리 대기", get_dashboard_stats()['pending_payments'], 1))
+
+# 일괄 '완료' 처리: 이미 완료인 강의와 없는 강의는 건너뛰고 실제로 바뀐 강의만 반환
+changed = set_payment_statuses(lecture_ids + [999999], '완료')
+results.append(check("일괄 완료 시 바뀐 강의", changed, [lecture_ids[0]]))
+results.append(check("일괄 완료 후 payments_done", get_counter('payments_done'), 2))
+
+db.close_all()
+if not all(results):
+    sys.exit(1)
+print("\n지급 상태 카운터 점검 완료.")